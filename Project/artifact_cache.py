@@ -0,0 +1,124 @@
+# artifact_cache.py
+# On-disk cache of the artifacts every entry point loads, in forms that need
+# neither sklearn nor torch: the RF scaler's statistics and the exported PPO
+# actor (ppo_export.NumpyPolicy). Entries are keyed by the SHA-1 of the source
+# file, so a retrained model or refitted scaler is picked up automatically.
+# Usage (from the Project folder): python artifact_cache.py [--clear]
+
+import hashlib
+import os
+import numpy as np
+
+_fingerprints = {}
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), 'artifact_cache')
+
+
+def file_fingerprint(path):
+    """First 16 hex digits of the file's SHA-1 (memoized per (path, size, mtime))."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _fingerprints:
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        _fingerprints[key] = h.hexdigest()[:16]
+    return _fingerprints[key]
+
+
+def _entry_path(kind, source_path, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    return os.path.join(cache_dir, f'{kind}_{file_fingerprint(source_path)}.npz')
+
+
+def _atomic_savez(path, **arrays):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + f'.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+class ScalerStats:
+    """StandardScaler statistics with the same transform() arithmetic as sklearn."""
+
+    def __init__(self, mean_, scale_, var_):
+        self.mean_ = mean_
+        self.scale_ = scale_
+        self.var_ = var_
+        self.n_features_in_ = len(mean_)
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float32 if np.asarray(X).dtype == np.float32 else np.float64)
+        X -= self.mean_.astype(X.dtype)
+        X /= self.scale_.astype(X.dtype)
+        return X
+
+
+def load_scaler(rf_scaler_path, cache_dir=None):
+    """ScalerStats of a pickled StandardScaler; sklearn is only imported on a cache miss."""
+    path = _entry_path('scaler', rf_scaler_path, cache_dir)
+    if not os.path.exists(path):
+        import joblib
+        scaler = joblib.load(rf_scaler_path)
+        _atomic_savez(path, mean_=scaler.mean_, scale_=scaler.scale_, var_=scaler.var_)
+    with np.load(path) as d:
+        return ScalerStats(d['mean_'], d['scale_'], d['var_'])
+
+
+def load_actor(model_path='ppo_mimo_anti_jamming', cache_dir=None):
+    """NumpyPolicy exported from an SB3 PPO zip; SB3/torch are only imported on a cache miss."""
+    from ppo_export import NumpyPolicy, export_ppo
+
+    zip_path = model_path if model_path.endswith('.zip') else model_path + '.zip'
+    path = _entry_path('actor', zip_path, cache_dir)
+    if not os.path.exists(path):
+        from stable_baselines3 import PPO
+        actor = export_ppo(PPO.load(zip_path))
+        tmp_path = path + f'.{os.getpid()}.tmp.npz'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        actor.save(tmp_path)
+        os.replace(tmp_path, path)
+    return NumpyPolicy.load(path)
+
+
+def warm(model_path='ppo_mimo_anti_jamming', rf_model_path='rf_model.pkl', rf_scaler_path='rf_scaler.pkl',
+         data_csv_path='balanced_dataset_20000.csv'):
+    """Fill every cache the entry points use (this one, dataset_cache/ and the compiled forest)."""
+    from dataset_cache import default_cache_dir as dataset_cache_dir, load_dataset, scaled_features
+    from rf_compiled import load_compiled_rf
+    from rf_incremental import active_rf_paths
+
+    load_actor(model_path)
+    cache_dir = default_cache_dir(rf_scaler_path)
+    rf_model_path, rf_scaler_path = active_rf_paths(rf_model_path, rf_scaler_path)
+    scaler = load_scaler(rf_scaler_path, cache_dir)
+    features, _, _ = load_dataset(data_csv_path)
+    scaled_features(features, scaler, dataset_cache_dir(data_csv_path))
+    load_compiled_rf(rf_model_path)
+
+
+def main(argv=None):
+    import argparse
+    import shutil
+
+    parser = argparse.ArgumentParser(description='Fill or clear the artifact cache')
+    parser.add_argument('--model', default='ppo_mimo_anti_jamming')
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args(argv)
+
+    cache_dir = default_cache_dir('rf_scaler.pkl')
+    if args.clear:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f"[INFO] Removed {cache_dir}")
+        return
+    warm(args.model)
+    for name in sorted(os.listdir(cache_dir)):
+        print(f"[INFO] {name} ({os.path.getsize(os.path.join(cache_dir, name))} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_env_step.py
+# Microbenchmark: env steps/second with per-step rf_scaler.transform (before)
+# vs. the precomputed scaled feature matrix (after)
+# Run from the Project folder: python benchmarks/bench_env_step.py
+
+import os
+import sys
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ppo_env import MIMOAIAntiJammingEnv
+
+
+class PerStepScalingEnv(MIMOAIAntiJammingEnv):
+    """Original behaviour: rescale the current row on every reset/step."""
+
+    def _scaled_row(self, idx):
+        return self.rf_scaler.transform(self.features[idx].reshape(1, -1)).flatten()
+
+
+def steps_per_second(env, n_steps, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 3, size=(n_steps, 3))
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def observations_match(before, after, n_resets=200):
+    for seed in range(n_resets):
+        obs_before, _ = before.reset(seed=seed)
+        obs_after, _ = after.reset(seed=seed)
+        if not np.array_equal(obs_before, obs_after):
+            return False
+        action = before.action_space.sample()
+        if not np.array_equal(before.step(action)[0], after.step(action)[0]):
+            return False
+    return True
+
+
+def main(n_steps=5000):
+    # The scaler was fitted on a DataFrame; silence the per-call feature-name warning
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    paths = ('balanced_dataset_20000.csv', 'rf_model.pkl', 'rf_scaler.pkl')
+
+    before = PerStepScalingEnv(*paths)
+    after = MIMOAIAntiJammingEnv(*paths)
+
+    print("[INFO] Observations identical:", observations_match(before, after))
+    sps_before = steps_per_second(before, n_steps)
+    sps_after = steps_per_second(after, n_steps)
+    print(f"Before (per-step transform): {sps_before:10.0f} steps/s")
+    print(f"After  (precomputed matrix): {sps_after:10.0f} steps/s")
+    print(f"Speed-up: {sps_after / sps_before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+# run_benchmarks.py
+# Performance suite: env reset/step rate, SINR/BER backends, RF inference,
+# PPO predict latency and short-run training throughput.
+# Results are written as JSON with machine metadata and compared with a stored
+# baseline; the exit code is 1 when any metric regressed beyond --tolerance,
+# failed or is missing. A benchmark that raises is recorded with its error and
+# the rest of the suite still runs.
+# The committed baseline.json was recorded in a 1-CPU x86_64 container; the
+# comparison is refused (exit code 2) on a machine with a different CPU count
+# or processor unless --force is given. Store a local baseline first with
+# --save-baseline (optionally --baseline <path>).
+#
+# Run from the Project folder:
+#   python benchmarks/run_benchmarks.py                  # run + compare with benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --save-baseline  # run + store as the new baseline
+#   python benchmarks/run_benchmarks.py --only env rf    # subset by name prefix
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+ENV_PATHS = ('balanced_dataset_20000.csv', 'rf_model.pkl', 'rf_scaler.pkl')
+DEFAULT_BASELINE = os.path.join(PROJECT_DIR, 'benchmarks', 'baseline.json')
+
+BENCHMARKS = []
+
+
+def benchmark(name, unit, higher_is_better=True):
+    """Register a function returning one measured value."""
+    def register(fn):
+        BENCHMARKS.append({'name': name, 'unit': unit, 'higher_is_better': higher_is_better, 'fn': fn})
+        return fn
+    return register
+
+
+def best_time(fn, number, repeat=5):
+    """Best-of-`repeat` seconds per call, averaged over `number` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def _make_env(**kwargs):
+    from ppo_env import MIMOAIAntiJammingEnv
+    return MIMOAIAntiJammingEnv(*ENV_PATHS, **kwargs)
+
+
+def _make_vec_env(n, **kwargs):
+    from ppo_vec_env import MIMOAIAntiJammingVecEnv
+    return MIMOAIAntiJammingVecEnv(n, *ENV_PATHS, **kwargs)
+
+
+# --- Environment -------------------------------------------------------------
+
+@benchmark('env.construct', 'ms', higher_is_better=False)
+def bench_env_construct():
+    _make_env()  # warm the dataset cache
+    return best_time(_make_env, 5) * 1e3
+
+
+@benchmark('env.reset', 'resets/s')
+def bench_env_reset():
+    env = _make_env()
+    env.reset(seed=0)
+    return 1 / best_time(env.reset, 2000)
+
+
+def _env_step_rate(**kwargs):
+    env = _make_env(**kwargs)
+    env.reset(seed=0)
+    actions = iter(np.random.default_rng(0).integers(0, 3, size=(10**6, 3)))
+
+    def step():
+        if env.step(next(actions))[2]:
+            env.reset()
+    return 1 / best_time(step, 2000)
+
+
+@benchmark('env.step.analytic', 'steps/s')
+def bench_env_step_analytic():
+    return _env_step_rate()
+
+
+@benchmark('env.step.table', 'steps/s')
+def bench_env_step_table():
+    return _env_step_rate(backend='table')
+
+
+@benchmark('env.step.montecarlo', 'steps/s')
+def bench_env_step_montecarlo():
+    return _env_step_rate(backend='montecarlo')
+
+
+@benchmark('vec_env.step.analytic.n256', 'steps/s')
+def bench_vec_env_step():
+    env = _make_vec_env(256)
+    env.seed(0)
+    env.reset()
+    actions = np.random.default_rng(0).integers(0, 3, size=(256, 3))
+    return 256 / best_time(lambda: env.step(actions), 200)
+
+
+# --- SINR / BER --------------------------------------------------------------
+
+@benchmark('sim.analytic.scalar', 'us/call', higher_is_better=False)
+def bench_sim_analytic_scalar():
+    env = _make_env()
+    feat = env.features_scaled[0]
+    return best_time(lambda: env.simulate_ber(env.simulate_sinr(1, 1, 1, feat, 1), 1), 5000) * 1e6
+
+
+@benchmark('sim.analytic.vec.n4096', 'ns/sample', higher_is_better=False)
+def bench_sim_analytic_vec():
+    env = _make_vec_env(1)
+    rng = np.random.default_rng(0)
+    mod, pwr, null = rng.integers(0, 3, size=(3, 4096))
+    feats = env.features_scaled[:4096]
+    labels = env.labels[:4096]
+    return best_time(lambda: env.simulate_ber(env.simulate_sinr(mod, pwr, null, feats, labels), mod), 200) / 4096 * 1e9
+
+
+@benchmark('sim.montecarlo.batch64', 'us/realization', higher_is_better=False)
+def bench_sim_montecarlo():
+    from mimo_link_sim import MIMOLinkSimulator
+    sim = MIMOLinkSimulator(seed=0)
+    mod, pwr, null, label = np.random.default_rng(0).integers(0, 3, size=(4, 64)) % [[3], [3], [3], [2]]
+    return best_time(lambda: sim.simulate(mod, pwr, null, label), 5) / 64 * 1e6
+
+
+@benchmark('sim.table.scalar', 'us/call', higher_is_better=False)
+def bench_sim_table():
+    from link_table import load_link_table
+    table = load_link_table(seed=0, verbose=False)
+    return best_time(lambda: table.simulate(1, 1, 1, 1, noise_factor=0.5), 5000) * 1e6
+
+
+# --- RF inference ------------------------------------------------------------
+
+def _rf_inputs(n):
+    env = _make_env()
+    return np.ascontiguousarray(env.features_scaled[:n])
+
+
+@benchmark('rf.sklearn.single', 'us/sample', higher_is_better=False)
+def bench_rf_sklearn_single():
+    import joblib
+    model = joblib.load('rf_model.pkl')
+    X = _rf_inputs(1)
+    return best_time(lambda: model.predict_proba(X), 50) * 1e6
+
+
+@benchmark('rf.compiled.single', 'us/sample', higher_is_better=False)
+def bench_rf_compiled_single():
+    from rf_compiled import load_compiled_rf
+    forest = load_compiled_rf('rf_model.pkl')
+    X = _rf_inputs(1)
+    return best_time(lambda: forest.predict_proba(X), 500) * 1e6
+
+
+@benchmark('rf.compiled.batch4096', 'us/sample', higher_is_better=False)
+def bench_rf_compiled_batch():
+    from rf_compiled import load_compiled_rf
+    forest = load_compiled_rf('rf_model.pkl')
+    X = _rf_inputs(4096)
+    return best_time(lambda: forest.predict_proba(X), 10) / 4096 * 1e6
+
+
+# --- PPO inference -----------------------------------------------------------
+
+def _ppo_obs(n):
+    env = _make_env()
+    return np.hstack([env.features_scaled[:n], env.labels[:n, None]]).astype(np.float32)
+
+
+@benchmark('ppo.sb3.single', 'us/decision', higher_is_better=False)
+def bench_ppo_sb3_single():
+    from stable_baselines3 import PPO
+    model = PPO.load('ppo_mimo_anti_jamming')
+    obs = _ppo_obs(1)[0]
+    return best_time(lambda: model.predict(obs, deterministic=True), 200) * 1e6
+
+
+@benchmark('ppo.sb3.batch1024', 'us/decision', higher_is_better=False)
+def bench_ppo_sb3_batch():
+    from stable_baselines3 import PPO
+    model = PPO.load('ppo_mimo_anti_jamming')
+    obs = _ppo_obs(1024)
+    return best_time(lambda: model.predict(obs, deterministic=True), 20) / 1024 * 1e6
+
+
+@benchmark('ppo.numpy.single', 'us/decision', higher_is_better=False)
+def bench_ppo_numpy_single():
+    from ppo_export import NumpyPolicy
+    actor = NumpyPolicy.load('ppo_actor.npz')
+    obs = _ppo_obs(1)[0]
+    return best_time(lambda: actor.act(obs), 2000) * 1e6
+
+
+@benchmark('ppo.numpy.batch1024', 'us/decision', higher_is_better=False)
+def bench_ppo_numpy_batch():
+    from ppo_export import NumpyPolicy
+    actor = NumpyPolicy.load('ppo_actor.npz')
+    obs = _ppo_obs(1024)
+    return best_time(lambda: actor.act(obs), 50) / 1024 * 1e6
+
+
+# --- Training ----------------------------------------------------------------
+
+def _train_rate(env):
+    from stable_baselines3 import PPO
+    model = PPO('MlpPolicy', env, n_steps=512, batch_size=64, n_epochs=2, seed=0, verbose=0)
+    model.learn(total_timesteps=2048)  # warm-up (torch init, first rollout)
+    start = time.perf_counter()
+    model.learn(total_timesteps=8192, reset_num_timesteps=False)
+    return 8192 / (time.perf_counter() - start)
+
+
+@benchmark('train.ppo.scalar', 'steps/s')
+def bench_train_scalar():
+    from stable_baselines3.common.monitor import Monitor
+    return _train_rate(Monitor(_make_env()))
+
+
+@benchmark('train.ppo.batched.n8', 'steps/s')
+def bench_train_batched():
+    from stable_baselines3.common.vec_env import VecMonitor
+    return _train_rate(VecMonitor(_make_vec_env(8)))
+
+
+# --- Runner ------------------------------------------------------------------
+
+def machine_metadata():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=PROJECT_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': version('numpy'),
+        'sklearn': version('sklearn'),
+        'torch': version('torch'),
+        'stable_baselines3': version('stable_baselines3'),
+        'git_commit': commit,
+    }
+
+
+# Machine fields that must match for timings to be comparable
+MACHINE_KEYS = ('cpu_count', 'processor')
+
+
+def selected(name, only=None):
+    return not only or any(name.startswith(prefix) for prefix in only)
+
+
+def run_suite(only=None):
+    """Run the selected benchmarks; one that raises is recorded with value None and its error."""
+    results = {}
+    for bench in BENCHMARKS:
+        if not selected(bench['name'], only):
+            continue
+        result = {'value': None, 'unit': bench['unit'], 'higher_is_better': bench['higher_is_better']}
+        try:
+            result['value'] = float(bench['fn']())
+            print(f"{bench['name']:32s} {result['value']:14.2f} {bench['unit']}")
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+            print(f"{bench['name']:32s} {'FAILED':>14s} {result['error']}")
+        results[bench['name']] = result
+    return results
+
+
+def machine_mismatch(machine, baseline_machine):
+    """MACHINE_KEYS fields that differ between two machine_metadata() dicts, as (key, current, baseline)."""
+    return [(key, machine.get(key), baseline_machine.get(key)) for key in MACHINE_KEYS
+            if machine.get(key) != baseline_machine.get(key)]
+
+
+def compare(results, baseline, tolerance, only=None):
+    """
+    Names of metrics that are worse than the baseline by more than `tolerance`
+    (fraction), failed, or are in the baseline (and selected by `only`) but
+    were not run.
+    """
+    regressions = []
+    print(f"\n[INFO] Comparison with baseline from {baseline['machine'].get('timestamp')} "
+          f"({baseline['machine'].get('git_commit')}):")
+    for name in baseline['results']:
+        if selected(name, only) and name not in results:
+            regressions.append(name)
+            print(f"  {name:32s} {'':18s}  MISSING")
+    for name, result in results.items():
+        if name not in baseline['results']:
+            continue
+        if result['value'] is None:
+            regressions.append(name)
+            print(f"  {name:32s} {'':18s}  FAILED")
+            continue
+        base = baseline['results'][name]['value']
+        if base is None:
+            continue
+        ratio = result['value'] / base if result['higher_is_better'] else base / result['value']
+        status = 'REGRESSION' if ratio < 1 - tolerance else 'ok'
+        if status == 'REGRESSION':
+            regressions.append(name)
+        print(f"  {name:32s} {ratio:6.2f}x of baseline  {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the performance benchmark suite')
+    parser.add_argument('--only', nargs='*', help='benchmark name prefixes to run')
+    parser.add_argument('--output', default=os.path.join(PROJECT_DIR, 'benchmarks', 'results',
+                                                         datetime.now().strftime('%Y%m%d_%H%M%S') + '.json'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed slowdown before a metric counts as a regression (fraction)')
+    parser.add_argument('--force', action='store_true',
+                        help='compare even if the baseline was recorded on a different machine')
+    args = parser.parse_args(argv)
+
+    os.chdir(PROJECT_DIR)
+    warnings.filterwarnings('ignore')
+
+    report = {'machine': machine_metadata(), 'results': run_suite(args.only)}
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[INFO] Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("[WARN] No baseline found; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatch = machine_mismatch(report['machine'], baseline['machine'])
+    if mismatch:
+        details = ', '.join(f"{key} {current} vs {base}" for key, current, base in mismatch)
+        if not args.force:
+            print(f"[FAIL] Baseline was recorded on a different machine ({details}); "
+                  f"store a local baseline with --save-baseline or compare anyway with --force")
+            return 2
+        print(f"[WARN] Comparing with a baseline from a different machine ({details})")
+    regressions = compare(report['results'], baseline, args.tolerance, args.only)
+    if regressions:
+        print(f"[FAIL] {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("[INFO] No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
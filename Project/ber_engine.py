@@ -0,0 +1,210 @@
+# ber_engine.py
+# Adaptive-stopping BER / SJNR estimation for Gray QPSK/16QAM/64QAM behind the
+# ZF receiver of plot_constellation_ber.m (every Tx antenna sends the same
+# symbol, pinv(H) filter, antenna outputs averaged, broadband Gaussian jammer).
+# Each point is simulated in vectorized blocks until enough errors are seen and
+# the confidence interval is narrow enough; deep low-BER points switch to
+# importance sampling (scaled post-filter noise with likelihood-ratio weights).
+# Usage (from the Project folder):
+#   python ber_engine.py --jsr -10 0 10 20 30 --snr 20
+#   python ber_engine.py --channel awgn --snr 4 8 12 16 20 --jsr -100   (checks against closed form)
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy import stats
+from mimo_link_sim import MOD_ORDERS, bit_errors, gray_qam_constellation, qam_ber_awgn, qam_demodulate
+
+CHANNELS = ('awgn', 'rayleigh')
+IMPORTANCE_MODES = ('off', 'on', 'auto')
+
+# Post-filter noise variance targeted by importance sampling. Decision
+# boundaries of the odd-integer QAM grid are 1 away from every point, so this
+# puts roughly 10% of the biased symbols across a boundary.
+IS_NOISE_VAR = 0.6
+
+
+def post_filter_noise_var(rng, n_channels, channel, snr_db, jsr_db, Es, Nt=2, Nr=2):
+    """
+    Variance of the complex noise + jammer term left on the averaged ZF output
+    for n_channels channel realizations. As in sjnr_sweep.py, noise and jammer
+    powers are set relative to the received signal power of each realization.
+    """
+    snr = 10 ** (snr_db / 10)
+    jsr = 10 ** (jsr_db / 10)
+    if channel == 'awgn':
+        return np.full(n_channels, Es * (1/snr + jsr))
+    H = (rng.standard_normal((n_channels, Nr, Nt)) + 1j*rng.standard_normal((n_channels, Nr, Nt))) / np.sqrt(2)
+    sig_pow = Es * np.mean(np.abs(H.sum(axis=2))**2, axis=1)
+    a = np.linalg.pinv(H).mean(axis=1)                  # (n, Nr) row average of the ZF filter
+    return np.sum(np.abs(a)**2, axis=1) * sig_pow * (1/snr + jsr)
+
+
+def simulate_block(rng, M, noise_var, symbols_per_channel, is_noise_var=None):
+    """
+    One block: symbols_per_channel symbols through every channel realization.
+    Returns (weighted bit errors per bit, per symbol; raw bit errors). With
+    is_noise_var, each realization's noise variance is raised to at least
+    is_noise_var and the samples carry the Gaussian likelihood ratio p(w)/q(w)
+    as weight, which keeps the BER estimate unbiased.
+    """
+    k = int(np.log2(M))
+    var = np.repeat(noise_var, symbols_per_channel)
+    scale = np.ones_like(var) if is_noise_var is None else np.maximum(1.0, is_noise_var / var)
+    q_var = var * scale
+    w = np.sqrt(q_var / 2) * (rng.standard_normal(len(var)) + 1j*rng.standard_normal(len(var)))
+    weight = scale * np.exp(-np.abs(w)**2 * (1 - 1/scale) / var)
+
+    tx = rng.integers(0, M, len(var))
+    rx = qam_demodulate(gray_qam_constellation(M)[tx] + w, M)
+    errors = bit_errors(tx[:, None], rx[:, None], M)
+    return errors * weight / k, int(errors.sum())
+
+
+class _Accumulator:
+    """Running sums for the mean and standard error of a stream of samples."""
+
+    def __init__(self):
+        self.n = 0
+        self.s = 0.0
+        self.s2 = 0.0
+
+    def add(self, x):
+        self.n += len(x)
+        self.s += float(x.sum())
+        self.s2 += float(np.dot(x, x))
+
+    @property
+    def mean(self):
+        return self.s / self.n
+
+    @property
+    def stderr(self):
+        var = max(self.s2 / self.n - self.mean**2, 0.0)
+        return np.sqrt(var / max(self.n - 1, 1))
+
+
+def estimate_ber(modulation, snr_db, jsr_db, channel='rayleigh', Nt=2, Nr=2, target_errors=100, rel_ci=0.1,
+                 level=0.95, block_symbols=65536, symbols_per_channel=64, max_symbols=10**8,
+                 importance='auto', rng=None):
+    """
+    BER and post-filter SJNR of one (modulation, SNR, JSR) point (the SJNR is
+    averaged in dB over channel realizations, as in sjnr_sweep.py). Blocks are
+    simulated until at least target_errors bit errors were observed and the
+    BER confidence interval half-width is below rel_ci * BER, or max_symbols
+    is reached. importance='auto' switches to importance sampling when the
+    first plain block sees fewer than target_errors / 10 errors.
+    """
+    rng = rng or np.random.default_rng()
+    M = MOD_ORDERS[modulation]
+    Es = np.mean(np.abs(gray_qam_constellation(M))**2)
+    z = stats.norm.ppf(0.5 + level/2)
+    n_channels = max(block_symbols // symbols_per_channel, 1)
+
+    ber, sjnr, raw_errors = _Accumulator(), _Accumulator(), 0
+    use_is = importance == 'on'
+    start = time.perf_counter()
+    while True:
+        var = post_filter_noise_var(rng, n_channels, channel, snr_db, jsr_db, Es, Nt, Nr)
+        e, raw = simulate_block(rng, M, var, symbols_per_channel, IS_NOISE_VAR if use_is else None)
+        if importance == 'auto' and not use_is and ber.n == 0 and raw < target_errors / 10:
+            use_is = True       # the plain pilot block is discarded
+            continue
+        ber.add(e)
+        sjnr.add(10*np.log10(Es / var))
+        raw_errors += raw
+        half_width = z * ber.stderr
+        if raw_errors >= target_errors and half_width <= rel_ci * ber.mean:
+            break
+        if ber.n >= max_symbols:
+            break
+
+    return {
+        'modulation': {4: 'QPSK', 16: '16QAM', 64: '64QAM'}[M],
+        'snr_db': snr_db,
+        'jsr_db': jsr_db,
+        'ber': ber.mean,
+        'ber_lo': max(ber.mean - half_width, 0.0),
+        'ber_hi': ber.mean + half_width,
+        'sjnr_db': sjnr.mean,
+        'sjnr_ci_db': z * sjnr.stderr,
+        'symbols': ber.n,
+        'bit_errors': raw_errors,
+        'importance': use_is,
+        'converged': raw_errors >= target_errors and half_width <= rel_ci * ber.mean,
+        'time_s': time.perf_counter() - start,
+    }
+
+
+def ber_curves(modulations, snr_db, jsr_db, seed=0, **kwargs):
+    """estimate_ber over the modulation x SNR x JSR grid; one independent stream per point."""
+    points = [(m, s, j) for m in modulations for s in snr_db for j in jsr_db]
+    seeds = np.random.SeedSequence(seed).spawn(len(points))
+    rows = [estimate_ber(m, s, j, rng=np.random.default_rng(ss), **kwargs) for (m, s, j), ss in zip(points, seeds)]
+    return pd.DataFrame(rows)
+
+
+def plot_curves(df, x, path):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for name, group in df.groupby('modulation', sort=False):
+        err = np.vstack([group['ber'] - group['ber_lo'], group['ber_hi'] - group['ber']])
+        ax.errorbar(group[x], group['ber'], yerr=err, marker='o', capsize=3, label=name)
+        if 'ber_theory' in group:
+            ax.plot(group[x], group['ber_theory'], 'k--', linewidth=0.8)
+    ax.set_yscale('log')
+    ax.set_xlabel('JSR (dB)' if x == 'jsr_db' else 'SNR (dB)')
+    ax.set_ylabel('BER')
+    ax.set_title('BER with 95% confidence intervals')
+    ax.grid(True, which='both', alpha=0.4)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=300)
+    plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Adaptive-stopping BER/SJNR curves')
+    parser.add_argument('--modulations', nargs='+', choices=['qpsk', '16qam', '64qam'],
+                        default=['qpsk', '16qam', '64qam'])
+    parser.add_argument('--snr', type=float, nargs='+', default=[20])
+    parser.add_argument('--jsr', type=float, nargs='+', default=[-20, -10, 0, 10, 20])
+    parser.add_argument('--channel', choices=CHANNELS, default='rayleigh')
+    parser.add_argument('--nt', type=int, default=2)
+    parser.add_argument('--nr', type=int, default=2)
+    parser.add_argument('--target-errors', type=int, default=100)
+    parser.add_argument('--rel-ci', type=float, default=0.1, help='CI half-width relative to the BER')
+    parser.add_argument('--max-symbols', type=float, default=1e8)
+    parser.add_argument('--importance', choices=IMPORTANCE_MODES, default='auto')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='results/ber_curves.csv')
+    args = parser.parse_args(argv)
+
+    modulations = [['qpsk', '16qam', '64qam'].index(m) for m in args.modulations]
+    start = time.perf_counter()
+    df = ber_curves(modulations, args.snr, args.jsr, seed=args.seed, channel=args.channel, Nt=args.nt,
+                    Nr=args.nr, target_errors=args.target_errors, rel_ci=args.rel_ci,
+                    max_symbols=int(args.max_symbols), importance=args.importance)
+    if args.channel == 'awgn':
+        # exact for QPSK, nearest-neighbour approximation otherwise
+        sjnr_db = -10*np.log10(10**(-df['snr_db']/10) + 10**(df['jsr_db']/10))
+        M = df['modulation'].map({'QPSK': 4, '16QAM': 16, '64QAM': 64})
+        df['ber_theory'] = [qam_ber_awgn(s - 10*np.log10(np.log2(m)), m) for s, m in zip(sjnr_db, M)]
+    print(f"[INFO] {len(df)} points, {df['symbols'].sum():.3g} symbols in {time.perf_counter() - start:.1f} s")
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    df.to_csv(args.out, index=False)
+    x = 'jsr_db' if len(args.jsr) > 1 else 'snr_db'
+    plot_path = os.path.splitext(args.out)[0] + '.png'
+    plot_curves(df, x, plot_path)
+    cols = ['modulation', 'snr_db', 'jsr_db', 'ber', 'ber_lo', 'ber_hi', 'sjnr_db', 'symbols', 'importance']
+    print(df[cols + (['ber_theory'] if 'ber_theory' in df else [])]
+          .to_string(index=False))
+    print(f"[INFO] Saved {args.out} and {plot_path}")
+
+
+if __name__ == "__main__":
+    main()
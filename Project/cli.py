@@ -0,0 +1,67 @@
+# cli.py
+# Single entry point for the Project scripts. Each subcommand imports its
+# script (and the heavy libraries behind it) only when it runs, and eval /
+# compare / demo use the NumPy actor and scaler statistics kept in
+# artifact_cache/, so they start without loading torch or sklearn.
+# Usage (from the Project folder):
+#   python cli.py eval [--episodes 100]
+#   python cli.py compare [--episodes 1000 --workers 4]
+#   python cli.py demo [--gui] [--cache table]
+#   python cli.py plot {policy,reward,training}
+#   python cli.py train [--n-envs 8 --vec-env batched ...]
+#   python cli.py profile [--episodes 100 --baseline results/profile.json]
+#   python cli.py cache [--clear]
+# Options after the subcommand are passed through to the script (see its --help).
+
+import argparse
+import importlib
+import sys
+import time
+
+# subcommand: (module, help, arguments prepended unless the user sets them)
+COMMANDS = {
+    'train': ('train_and_evaluate_ppo', 'train PPO (train_and_evaluate_ppo.py)', {}),
+    'eval': ('evaluate_trained_ppo', 'evaluate the trained agent (evaluate_trained_ppo.py)', {'--actor': 'numpy'}),
+    'compare': ('compare_policies', 'PPO vs baselines and oracle (compare_policies.py)', {'--actor': 'numpy'}),
+    'demo': ('live_ppo', 'live SINR/BER plot (live_ppo.py, or live_demo.py with --gui)', {}),
+    'plot': (None, 'plot saved results (plot_policy_results.py / plot_ppo_reward_curve.py / log_aggregator.py)', {}),
+    'profile': ('instrumentation', 'per-stage env/policy latency profile (instrumentation.py)', {}),
+    'cache': ('artifact_cache', 'fill or clear artifact_cache/ (artifact_cache.py)', {}),
+}
+PLOTS = {'policy': 'plot_policy_results', 'reward': 'plot_ppo_reward_curve', 'training': 'log_aggregator'}
+
+
+def with_defaults(argv, defaults):
+    extra = []
+    for option, value in defaults.items():
+        if not any(a == option or a.startswith(option + '=') for a in argv):
+            extra += [option, value]
+    return extra + argv
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description='MIMO anti-jamming project tools')
+    parser.add_argument('--time', action='store_true', help='print the wall time of the command')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text, _) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_text, add_help=False)
+        if name == 'plot':
+            p.add_argument('which', choices=list(PLOTS))
+        if name == 'demo':
+            p.add_argument('--gui', action='store_true', help='interactive demo with manual control')
+    args, rest = parser.parse_known_args(argv)
+
+    start = time.perf_counter()
+    module, _, defaults = COMMANDS[args.command]
+    if args.command == 'plot':
+        module = PLOTS[args.which]
+    elif args.command == 'demo' and args.gui:
+        module = 'live_demo'
+    importlib.import_module(module).main(with_defaults(rest, defaults))
+    if args.time:
+        print(f"[INFO] {args.command} took {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
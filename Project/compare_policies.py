@@ -1,79 +1,62 @@
 # compare_policies.py
-# Compare PPO agent with static baseline strategies: fixed QPSK, 16QAM, random
+# Compare PPO agent with static baseline strategies: fixed QPSK, 16QAM, random,
+# and the oracle upper bound (oracle.py)
 
+import argparse
+import os
 import numpy as np
-import pandas as pd
-from ppo_env import MIMOAIAntiJammingEnv
-from stable_baselines3 import PPO
-
-# Load environment
-env = MIMOAIAntiJammingEnv(
-    data_csv_path='balanced_dataset_20000.csv',
-    rf_model_path='rf_model.pkl',
-    rf_scaler_path='rf_scaler.pkl'
-)
-
-# Load PPO model
-ppo_model = PPO.load('ppo_mimo_anti_jamming')
-
-strategies = {
-    'Fixed QPSK': lambda obs: [0, 1, 0],           # QPSK, medium power, no null
-    'Fixed 16-QAM': lambda obs: [1, 1, 0],         # 16-QAM, medium power
-    'Random': lambda obs: env.action_space.sample(),
-    'PPO Agent': lambda obs: ppo_model.predict(obs, deterministic=True)[0]
-}
-
-results = []
-n_episodes = 100
-
-for name, policy in strategies.items():
-    sinrs = []
-    bers = []
-    rewards = []
-    print(f"[INFO] Evaluating: {name}")
-    for _ in range(n_episodes):
-        obs, _ = env.reset()
-        total_reward = 0
-        total_sinr = 0
-        total_ber = 0
-        done = False
-        step = 0
-        while not done:
-            action = policy(obs)
-            obs, reward, terminated, truncated, info = env.step(action)
-            done = terminated or truncated
-            total_reward += reward
-            total_sinr += info['sinr']
-            total_ber += info['ber']
-            step += 1
-
-        avg_sinr = total_sinr / step
-        avg_ber = total_ber / step
-        sinrs.append(avg_sinr)
-        bers.append(avg_ber)
-        rewards.append(total_reward)
-
-    results.append({
-        'Policy': name,
-        'Avg SINR': np.mean(sinrs),
-        'Avg BER': np.mean(bers),
-        'Avg Reward': np.mean(rewards)
-    })
-
-# Save and print
-df = pd.DataFrame(results)
-df.to_csv('results/policy_comparison.csv', index=False)
-print("\n[INFO] Policy comparison complete:\n")
-print(df)
-
-# Optional plot
-import matplotlib.pyplot as plt
-
-plt.figure(figsize=(8, 5))
-plt.bar(df['Policy'], df['Avg SINR'], color='skyblue')
-plt.ylabel('Avg SINR (dB)')
-plt.title('Post-filter SINR by Policy')
-plt.grid(axis='y')
-plt.tight_layout()
-plt.savefig('results/policy_comparison_sinr.png', dpi=300)
-plt.show()
+from policy_eval import ENV_PATHS, FixedPolicy, RandomPolicy, PPOPolicy, evaluate_policies
+from oracle import build_oracle
+from artifact_cache import load_actor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare PPO with baseline policies')
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0, help='shared seed (common random numbers)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (1 = serial)')
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic')
+    parser.add_argument('--model', default='ppo_mimo_anti_jamming')
+    parser.add_argument('--actor', choices=['sb3', 'numpy'], default='sb3',
+                        help='numpy: cached NumPy export of the PPO actor (fast startup)')
+    parser.add_argument('--record', default=None, metavar='DIR',
+                        help='log every step of every policy under DIR (see trajectory_recorder.py)')
+    parser.add_argument('--no-show', action='store_true')
+    args = parser.parse_args(argv)
+
+    strategies = {
+        'Fixed QPSK': FixedPolicy([0, 1, 0]),           # QPSK, medium power, no null
+        'Fixed 16-QAM': FixedPolicy([1, 1, 0]),         # 16-QAM, medium power
+        'Random': RandomPolicy(seed=args.seed),
+        'PPO Agent': PPOPolicy(args.model) if args.actor == 'sb3' else load_actor(args.model),
+    }
+    if args.backend == 'analytic':
+        # upper bound: reward-optimal action lookup (exact for the analytic model only)
+        strategies['Oracle'] = build_oracle(ENV_PATHS['data_csv_path'], ENV_PATHS['rf_scaler_path']).policy()
+
+    df, episodes = evaluate_policies(strategies, n_episodes=args.episodes, seed=args.seed,
+                                     n_workers=args.workers, env_kwargs={'backend': args.backend},
+                                     record_dir=args.record)
+
+    # Save and print
+    os.makedirs('results', exist_ok=True)
+    df.to_csv('results/policy_comparison.csv', index=False)
+    np.savez_compressed('results/policy_comparison_episodes.npz',
+                        **{f'{name}/{key}': values for name, ep in episodes.items() for key, values in ep.items()})
+    print("\n[INFO] Policy comparison complete:\n")
+    print(df)
+
+    # Optional plot
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 5))
+    plt.bar(df['Policy'], df['Avg SINR'], yerr=df['SINR CI'], capsize=4, color='skyblue')
+    plt.ylabel('Avg SINR (dB)')
+    plt.title('Post-filter SINR by Policy')
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig('results/policy_comparison_sinr.png', dpi=300)
+    if not args.no_show:
+        plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# control_service.py
+# Headless asyncio anti-jamming control loop: observation frames come in through a
+# bounded queue (local CSV replay or a TCP socket), the policy emits
+# [modulation, power, nulling] decisions, and decision latency (p50/p99) and
+# dropped frames are tracked and streamed to metrics subscribers. Decisions go
+# through decision_cache.py (--cache off|lru|table).
+# Usage (from the Project folder):
+#   python control_service.py --rate 2000 --duration 10                  # CSV replay
+#   python control_service.py --source tcp --frame-port 8765 --metrics-port 8766
+#   python metrics_viewer.py --port 8766                                 # optional viewer
+# TCP frames are JSON lines {"seq": 1, "obs": [9 floats]}; each is answered with
+# {"seq": 1, "action": [m, p, n], "latency_ms": ...}; malformed frames (not 9
+# finite numbers) and frames the policy fails on get {"seq": 1, "error": "..."}.
+
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+import numpy as np
+from decision_cache import add_cache_arguments, cached_policy
+
+Frame = namedtuple('Frame', ['seq', 'obs', 't_arrival', 'idx', 'reply'])
+Decision = namedtuple('Decision', ['seq', 'action', 'latency', 'idx', 'reply'])
+OBS_SHAPE = (9,)
+
+
+class LatencyRecorder:
+    """Fixed-size ring buffer of latencies (seconds); percentiles over the last `window` samples."""
+
+    def __init__(self, window=10000):
+        self.values = np.zeros(window)
+        self.count = 0
+
+    def record(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def percentiles(self, q=(50, 99)):
+        if self.count == 0:
+            return [float('nan')] * len(q)
+        return np.percentile(self.values[:min(self.count, len(self.values))], q).tolist()
+
+
+class ControlService:
+    """
+    Decision loop over a bounded frame queue. When the queue is full the oldest
+    frame is dropped (stale observations are worth less than fresh ones), and
+    frames that waited longer than deadline_ms are dropped at dequeue.
+    `policy` maps a (9,) observation to a length-3 action (e.g. NumpyPolicy.act).
+    Decisions go to every callable in self.sinks; frames the policy raises on
+    are counted as failed and passed with the exception to self.error_sinks,
+    so one bad frame never stops the loop.
+    """
+
+    def __init__(self, policy, queue_size=64, deadline_ms=None, latency_window=10000):
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.deadline = None if deadline_ms is None else deadline_ms / 1e3
+        self.sinks = []
+        self.error_sinks = []
+        self.subscribers = []
+        self.decision_latency = LatencyRecorder(latency_window)
+        self.inference_latency = LatencyRecorder(latency_window)
+        self.frames_in = 0
+        self.decided = 0
+        self.dropped_overflow = 0
+        self.dropped_late = 0
+        self.rejected = 0
+        self.failed = 0
+        self.stopping = False
+        self.started = time.perf_counter()
+
+    def submit(self, seq, obs, idx=None, reply=None):
+        """
+        Enqueue a frame without blocking the producer. Raises ValueError (and
+        counts the frame as rejected) unless obs is 9 finite numbers, or once
+        stop() was called: an overflow eviction could otherwise drop the stop
+        sentinel and leave run() waiting forever.
+        """
+        self.frames_in += 1
+        if self.stopping:
+            self.rejected += 1
+            raise ValueError("service is stopping")
+        try:
+            obs = np.asarray(obs, dtype=np.float32)
+        except (TypeError, ValueError):
+            obs = None
+        if obs is None or obs.shape != OBS_SHAPE or not np.all(np.isfinite(obs)):
+            self.rejected += 1
+            raise ValueError(f"obs must be {OBS_SHAPE[0]} finite numbers")
+        frame = Frame(seq, obs, time.perf_counter(), idx, reply)
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped_overflow += 1
+        self.queue.put_nowait(frame)
+
+    async def run(self):
+        """Decide on frames until a None sentinel is queued."""
+        self.started = time.perf_counter()
+        while True:
+            frame = await self.queue.get()
+            if frame is None:
+                break
+            start = time.perf_counter()
+            if self.deadline is not None and start - frame.t_arrival > self.deadline:
+                self.dropped_late += 1
+                continue
+            try:
+                action = np.asarray(self.policy(frame.obs)).reshape(3)
+            except Exception as e:
+                self.failed += 1
+                for sink in self.error_sinks:
+                    sink(frame, e)
+                continue
+            end = time.perf_counter()
+            self.inference_latency.record(end - start)
+            self.decision_latency.record(end - frame.t_arrival)
+            self.decided += 1
+            decision = Decision(frame.seq, action, end - frame.t_arrival, frame.idx, frame.reply)
+            for sink in self.sinks:
+                sink(decision)
+
+    async def stop(self):
+        self.stopping = True
+        await self.queue.put(None)
+
+    def metrics(self):
+        p50, p99 = self.decision_latency.percentiles()
+        i50, i99 = self.inference_latency.percentiles()
+        elapsed = time.perf_counter() - self.started
+        return {
+            'time': time.time(),
+            'frames_in': self.frames_in,
+            'decided': self.decided,
+            'dropped_overflow': self.dropped_overflow,
+            'dropped_late': self.dropped_late,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'queue_depth': self.queue.qsize(),
+            'decisions_per_s': self.decided / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': p50 * 1e3,
+            'latency_p99_ms': p99 * 1e3,
+            'inference_p50_us': i50 * 1e6,
+            'inference_p99_us': i99 * 1e6,
+        }
+
+    def subscribe(self, maxsize=100):
+        """Queue that receives every published metrics snapshot (oldest dropped when full)."""
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.subscribers.append(queue)
+        return queue
+
+    async def publish_metrics(self, interval=1.0, extra=None):
+        while True:
+            await asyncio.sleep(interval)
+            snapshot = self.metrics()
+            if extra is not None:
+                snapshot.update(extra())
+            for queue in self.subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(snapshot)
+
+
+class ReplaySource:
+    """
+    Local frame source built from the CSV dataset: like an env episode, a
+    random row is held for `hold` frames, and frames are emitted at rate_hz
+    on an absolute schedule. SINR/BER of each decision on its row can be
+    scored with score() (outside the timed decision path).
+    """
+
+    def __init__(self, env, rate_hz=1000.0, hold=100, seed=None):
+        self.env = env
+        self.obs = np.hstack([env.features_scaled, env.obs_labels[:, None]]).astype(np.float32)
+        self.period = 1.0 / rate_hz
+        self.hold = hold
+        self.rng = np.random.default_rng(seed)
+        self.sinr_sum = 0.0
+        self.ber_sum = 0.0
+        self.scored = 0
+
+    async def run(self, service, n_frames=None, duration=None):
+        next_t = time.perf_counter()
+        end = None if duration is None else next_t + duration
+        seq = 0
+        idx = int(self.rng.integers(0, len(self.obs)))
+        while (n_frames is None or seq < n_frames) and (end is None or next_t < end):
+            if seq % self.hold == 0:
+                idx = int(self.rng.integers(0, len(self.obs)))
+            service.submit(seq, self.obs[idx], idx=idx)
+            seq += 1
+            next_t += self.period
+            await asyncio.sleep(max(0.0, next_t - time.perf_counter()))
+
+    def score(self, decision):
+        modulation, power_level, nulling = (int(a) for a in decision.action)
+        feat = self.env.features_scaled[decision.idx]
+        sinr = self.env.simulate_sinr(modulation, power_level, nulling, feat, self.env.labels[decision.idx])
+        self.sinr_sum += sinr
+        self.ber_sum += self.env.simulate_ber(sinr, modulation)
+        self.scored += 1
+
+    def stats(self):
+        n = max(self.scored, 1)
+        return {'avg_sinr': self.sinr_sum / n, 'avg_ber': self.ber_sum / n}
+
+
+async def serve_frames(service, host='127.0.0.1', port=8765):
+    """
+    TCP frame source: JSON lines in, one JSON decision line out per decided
+    frame. Dropped frames (overflow or late) get no reply; malformed frames
+    and policy failures get an error line.
+    """
+
+    def reply_error(writer, seq, error):
+        if not writer.is_closing():
+            writer.write((json.dumps({'seq': seq, 'error': error}) + '\n').encode())
+
+    async def handle(reader, writer):
+        try:
+            async for line in reader:
+                seq = None
+                try:
+                    msg = json.loads(line)
+                    if not isinstance(msg, dict):
+                        raise ValueError("frame must be a JSON object")
+                    seq = msg['seq']
+                    service.submit(seq, msg['obs'], reply=writer)
+                except KeyError as e:
+                    reply_error(writer, seq, f"missing field {e}")
+                except ValueError as e:
+                    reply_error(writer, seq, str(e))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def reply(decision):
+        if decision.reply is not None and not decision.reply.is_closing():
+            decision.reply.write((json.dumps({
+                'seq': decision.seq, 'action': [int(a) for a in decision.action],
+                'latency_ms': decision.latency * 1e3,
+            }) + '\n').encode())
+
+    def reply_failure(frame, error):
+        if frame.reply is not None:
+            reply_error(frame.reply, frame.seq, f"policy failed: {error}")
+
+    service.sinks.append(reply)
+    service.error_sinks.append(reply_failure)
+    return await asyncio.start_server(handle, host, port)
+
+
+async def serve_metrics(service, host='127.0.0.1', port=8766):
+    """Metrics stream: every connected client gets each snapshot as a JSON line."""
+
+    async def handle(reader, writer):
+        queue = service.subscribe()
+        try:
+            while True:
+                snapshot = await queue.get()
+                writer.write((json.dumps(snapshot) + '\n').encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            service.subscribers.remove(queue)
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def load_policy(kind='numpy', model_path='ppo_mimo_anti_jamming', actor_path=None):
+    """
+    Observation -> action callable: the exported NumPy actor (actor_path, or the
+    export of model_path kept in artifact_cache/), or SB3 PPO.
+    """
+    if kind == 'numpy':
+        from ppo_export import NumpyPolicy
+        from artifact_cache import load_actor
+        return (NumpyPolicy.load(actor_path) if actor_path else load_actor(model_path)).act
+    from stable_baselines3 import PPO
+    model = PPO.load(model_path)
+    return lambda obs: model.predict(obs, deterministic=True)[0]
+
+
+def format_metrics(m):
+    return (f"decided {m['decided']}/{m['frames_in']} ({m['decisions_per_s']:.0f}/s), "
+            f"dropped {m['dropped_overflow']} overflow + {m['dropped_late']} late, "
+            f"{m['rejected']} rejected, {m['failed']} failed, "
+            f"latency p50 {m['latency_p50_ms']:.3f} ms p99 {m['latency_p99_ms']:.3f} ms, "
+            f"inference p50 {m['inference_p50_us']:.1f} us")
+
+
+async def run_service(args):
+    from ppo_env import MIMOAIAntiJammingEnv
+
+    # The replay env doubles as the dataset the decision table covers
+    env = None
+    if args.source == 'replay' or args.cache == 'table':
+        env = MIMOAIAntiJammingEnv('balanced_dataset_20000.csv', 'rf_model.pkl', 'rf_scaler.pkl',
+                                   backend=args.backend, detector=args.detector)
+    policy = cached_policy(load_policy(args.policy), args.cache, env, args.cache_size, args.cache_bins)
+    service = ControlService(policy, queue_size=args.queue_size, deadline_ms=args.deadline_ms)
+    servers = []
+    extra = None
+    if args.metrics_port:
+        servers.append(await serve_metrics(service, args.host, args.metrics_port))
+        print(f"[INFO] Metrics stream on {args.host}:{args.metrics_port}")
+
+    if args.source == 'replay':
+        source = ReplaySource(env, rate_hz=args.rate, seed=args.seed)
+        service.sinks.append(source.score)
+        extra = source.stats
+        producer = source.run(service, n_frames=args.frames, duration=args.duration)
+    else:
+        servers.append(await serve_frames(service, args.host, args.frame_port))
+        print(f"[INFO] Accepting frames on {args.host}:{args.frame_port}")
+        producer = asyncio.sleep(args.duration if args.duration is not None else float('inf'))
+
+    loop_task = asyncio.create_task(service.run())
+    metrics_task = asyncio.create_task(service.publish_metrics(args.metrics_interval, extra))
+    log_queue = service.subscribe()
+
+    async def log_metrics():
+        while True:
+            print(f"[INFO] {format_metrics(await log_queue.get())}")
+
+    log_task = asyncio.create_task(log_metrics())
+    try:
+        await producer
+    finally:
+        await service.stop()
+        await loop_task
+        for task in (metrics_task, log_task):
+            task.cancel()
+        for server in servers:
+            server.close()
+
+    final = service.metrics()
+    if extra is not None:
+        final.update(extra())
+    print(f"[INFO] Final: {format_metrics(final)}")
+    if 'avg_sinr' in final:
+        print(f"[INFO] Replay score: avg SINR {final['avg_sinr']:.2f} dB, avg BER {final['avg_ber']:.4f}")
+    if args.cache != 'off':
+        print(f"[INFO] {policy.format_stats()}")
+    return final
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless asyncio anti-jamming control loop')
+    parser.add_argument('--source', choices=['replay', 'tcp'], default='replay')
+    parser.add_argument('--policy', choices=['numpy', 'sb3'], default='numpy',
+                        help='numpy: exported ppo_actor.npz; sb3: ppo_mimo_anti_jamming.zip')
+    parser.add_argument('--rate', type=float, default=1000.0, help='replay frame rate (Hz)')
+    parser.add_argument('--frames', type=int, default=None, help='replay frame count')
+    parser.add_argument('--duration', type=float, default=None, help='run time (s)')
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--deadline-ms', type=float, default=None, help='drop frames older than this')
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic',
+                        help='replay scoring backend')
+    parser.add_argument('--detector', choices=['label', 'proba'], default=None,
+                        help='replay jammer observation from the RF detector')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--frame-port', type=int, default=8765)
+    parser.add_argument('--metrics-port', type=int, default=0, help='0 disables the metrics stream')
+    parser.add_argument('--metrics-interval', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.source == 'replay' and args.frames is None and args.duration is None:
+        args.duration = 10.0
+    return asyncio.run(run_service(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# dataset_cache.py
+# One-time conversion of the jamming dataset CSV to memory-mappable .npy files,
+# plus the cached scaled feature matrix used by the envs.
+# Convert ahead of time from the Project folder: python dataset_cache.py
+
+import hashlib
+import json
+import os
+import numpy as np
+
+
+def default_cache_dir(data_csv_path):
+    return os.path.join(os.path.dirname(os.path.abspath(data_csv_path)), 'dataset_cache')
+
+
+def _atomic_save(path, array):
+    tmp_path = path + f'.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _csv_stamp(data_csv_path):
+    st = os.stat(data_csv_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def convert_dataset(data_csv_path, cache_dir=None):
+    """
+    Parse the CSV once with pandas and store <name>.features.npy (float32),
+    <name>.labels.npy (int64) and <name>.meta.json (column names + CSV stamp).
+    """
+    import pandas as pd
+
+    cache_dir = cache_dir or default_cache_dir(data_csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.join(cache_dir, os.path.splitext(os.path.basename(data_csv_path))[0])
+
+    df = pd.read_csv(data_csv_path)
+    features = df.drop(columns=['label'])
+    _atomic_save(stem + '.features.npy', np.ascontiguousarray(features.values, dtype=np.float32))
+    _atomic_save(stem + '.labels.npy', df['label'].values.astype(np.int64))
+
+    meta = {'feature_names': list(features.columns), 'csv': _csv_stamp(data_csv_path)}
+    tmp_path = stem + f'.meta.json.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, stem + '.meta.json')
+    return stem
+
+
+def load_dataset(data_csv_path, cache_dir=None):
+    """
+    Return (features, labels, feature_names) memory-mapped read-only from the
+    .npy conversion of data_csv_path, converting first if it is missing or the
+    CSV changed. All processes mapping the same files share one physical copy.
+    """
+    cache_dir = cache_dir or default_cache_dir(data_csv_path)
+    stem = os.path.join(cache_dir, os.path.splitext(os.path.basename(data_csv_path))[0])
+
+    meta = None
+    if os.path.exists(stem + '.meta.json'):
+        with open(stem + '.meta.json') as f:
+            meta = json.load(f)
+    if meta is None or meta['csv'] != _csv_stamp(data_csv_path):
+        convert_dataset(data_csv_path, cache_dir)
+        with open(stem + '.meta.json') as f:
+            meta = json.load(f)
+
+    # np.asarray drops the np.memmap subclass (cheaper indexing) but keeps the mapping
+    features = np.asarray(np.load(stem + '.features.npy', mmap_mode='r'))
+    labels = np.asarray(np.load(stem + '.labels.npy', mmap_mode='r'))
+    return features, labels, meta['feature_names']
+
+
+def scaler_hash(rf_scaler, features):
+    """Hash of the scaler statistics and the raw feature matrix."""
+    h = hashlib.sha1()
+    for attr in ('mean_', 'scale_', 'var_'):
+        value = getattr(rf_scaler, attr, None)
+        if value is not None:
+            h.update(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(features).tobytes())
+    return h.hexdigest()[:16]
+
+
+def scaled_features(features, rf_scaler, cache_dir=None):
+    """
+    Return rf_scaler.transform(features) as a contiguous float32 matrix.
+    With cache_dir set, the matrix is stored as scaled_<hash>.npy and later
+    calls with the same scaler and dataset memory-map it instead of re-scaling.
+    """
+    if cache_dir is None:
+        return np.ascontiguousarray(rf_scaler.transform(features), dtype=np.float32)
+
+    path = os.path.join(cache_dir, f'scaled_{scaler_hash(rf_scaler, features)}.npy')
+    if not os.path.exists(path):
+        scaled = np.ascontiguousarray(rf_scaler.transform(features), dtype=np.float32)
+        os.makedirs(cache_dir, exist_ok=True)
+        _atomic_save(path, scaled)
+    return np.asarray(np.load(path, mmap_mode='r'))
+
+
+if __name__ == "__main__":
+    stem = convert_dataset('balanced_dataset_20000.csv')
+    print(f"[INFO] Dataset converted to {stem}.features.npy / .labels.npy")
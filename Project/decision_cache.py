@@ -0,0 +1,229 @@
+# decision_cache.py
+# Decision cache in front of a deterministic policy (NumpyPolicy.act or the SB3
+# predict wrapper from control_service.load_policy). Within an episode the
+# observation never changes, so most queries repeat: decisions are kept in a
+# bounded LRU dict keyed on the observation bytes, either exact (lossless) or
+# with the 8 features quantized to `bins`-wide cells (near-identical radio
+# conditions share one decision; the jammer entry is always kept exact). Table mode precomputes the decision of every dataset row in one
+# batched call; lookups outside the table fall back to the LRU.
+# Usage (from the Project folder):
+#   python decision_cache.py --episodes 100 [--mode table] [--bins 0.05]
+
+from collections import OrderedDict
+import numpy as np
+
+MODES = ('off', 'lru', 'table')
+
+
+def quantize(obs, bins):
+    """Cell indices of the 8 features (last axis) followed by the exact jammer entry, as int64."""
+    cells = np.empty(obs.shape, dtype=np.int64)
+    cells[..., :8] = np.rint(obs[..., :8] / bins)
+    # the label (0/1) or P(active) entry is kept exact, so jammed and clean rows never share a cell
+    cells[..., 8:] = obs[..., 8:].view(np.int32)
+    return cells
+
+
+def observation_keys(obs, bins=None):
+    """One hashable key per row of a (N, 9) observation batch (exact bytes, or quantized cell indices)."""
+    obs = np.asarray(obs, dtype=np.float32)
+    if bins is not None:
+        obs = quantize(obs, bins)
+    return [row.tobytes() for row in obs]
+
+
+def table_observations(env):
+    """(n_samples, 9) observation of every dataset row of a MIMOAIAntiJammingEnv / Batch."""
+    obs = np.empty((env.n_samples, 9), dtype=np.float32)
+    obs[:, :8] = env.features_scaled
+    obs[:, 8] = env.obs_labels
+    return obs
+
+
+class DecisionCache:
+    """
+    Callable obs -> action (single (9,) observation or (N, 9) batch) that only
+    calls `policy` on observations it has not seen; misses of a batch are
+    decided in one policy call. With bins, the cached decision of a cell is the
+    policy's decision for the first observation seen in it (bins only applies
+    to the 8 features). Returned decisions are read-only. maxsize bounds the
+    LRU (least recently used entries are evicted); `table` (see build_table) is
+    a fixed key -> action dict consulted first.
+    """
+
+    def __init__(self, policy, maxsize=4096, bins=None, table=None):
+        self.policy = policy
+        self.maxsize = maxsize
+        self.bins = None if bins is None else np.asarray(bins, dtype=np.float32)
+        self.table = table or {}
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.table_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def build_table(self, observations, batch_size=65536):
+        """
+        Precompute decisions for `observations` (e.g. table_observations(env)).
+        Returns the number of rows whose decision differs from the one already
+        stored for their cell (always 0 without bins).
+        """
+        conflicts = 0
+        for start in range(0, len(observations), batch_size):
+            batch = observations[start:start + batch_size]
+            actions = self._frozen(np.asarray(self.policy(batch)).reshape(len(batch), -1))
+            for key, action in zip(observation_keys(batch, self.bins), actions):
+                if key in self.table:
+                    conflicts += not np.array_equal(self.table[key], action)
+                else:
+                    self.table[key] = action
+        return conflicts
+
+    @staticmethod
+    def _frozen(action):
+        # cached decisions are shared by every caller, so nobody may modify them in place
+        action = np.array(action)
+        action.flags.writeable = False
+        return action
+
+    def _lookup(self, key):
+        action = self.table.get(key)
+        if action is not None:
+            self.table_hits += 1
+            return action
+        action = self.entries.get(key)
+        if action is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return action
+
+    def _insert(self, key, action):
+        self.entries[key] = action
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __call__(self, obs):
+        obs = np.asarray(obs, dtype=np.float32)
+        if obs.ndim == 1:
+            key = (obs if self.bins is None else quantize(obs, self.bins)).tobytes()
+            action = self._lookup(key)
+            if action is None:
+                self.misses += 1
+                action = self._frozen(self.policy(obs))
+                self._insert(key, action)
+            return action
+
+        keys = observation_keys(obs, self.bins)
+        found = [self._lookup(key) for key in keys]
+        missing = [i for i, a in enumerate(found) if a is None]
+        if missing:
+            self.misses += len(missing)
+            actions = self._frozen(np.asarray(self.policy(obs[missing])).reshape(len(missing), -1))
+            for i, action in zip(missing, actions):
+                found[i] = action
+                self._insert(keys[i], action)
+        return np.stack(found)
+
+    act = __call__
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Drop-in for SB3 predict(obs, deterministic=True); only deterministic decisions are cached."""
+        if not deterministic:
+            raise ValueError("DecisionCache only serves deterministic decisions")
+        return self(obs), state
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.table_hits + self.misses
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'table_hits': self.table_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'table_size': len(self.table),
+            'hit_rate': (self.hits + self.table_hits) / lookups if lookups else 0.0,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"decision cache: {s['hit_rate']:.1%} hit rate over {s['lookups']} lookups "
+                f"({s['table_hits']} table, {s['hits']} LRU, {s['misses']} policy calls, "
+                f"{s['evictions']} evictions)")
+
+
+def cached_policy(policy, mode='lru', env=None, maxsize=4096, bins=None):
+    """`policy` behind a DecisionCache ('lru', or 'table' built from env's dataset); 'off' returns it as is."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown cache mode: {mode}")
+    if mode == 'off':
+        return policy
+    cache = DecisionCache(policy, maxsize=maxsize, bins=bins)
+    if mode == 'table':
+        if env is None:
+            raise ValueError("Table mode needs the env whose dataset it covers")
+        conflicts = cache.build_table(table_observations(env.unwrapped if hasattr(env, 'unwrapped') else env))
+        if conflicts:
+            print(f"[INFO] Decision table: {conflicts} rows disagree with the decision stored for their cell")
+    return cache
+
+
+def add_cache_arguments(parser, default='lru'):
+    parser.add_argument('--cache', choices=MODES, default=default,
+                        help='decision cache in front of the policy (table: precompute every dataset row)')
+    parser.add_argument('--cache-bins', type=float, default=None,
+                        help='quantize observations to cells of this width (default: exact match)')
+    parser.add_argument('--cache-size', type=int, default=4096, help='LRU entries')
+
+
+def main(argv=None):
+    import argparse
+    import time
+    from control_service import load_policy
+    from policy_eval import ENV_PATHS
+    from ppo_env import MIMOAIAntiJammingEnv
+
+    parser = argparse.ArgumentParser(description='Decision-cache hit rate and agreement on env episodes')
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--policy', choices=['numpy', 'sb3'], default='numpy')
+    parser.add_argument('--mode', choices=MODES[1:], default='lru')
+    parser.add_argument('--bins', type=float, default=None)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = MIMOAIAntiJammingEnv(**ENV_PATHS)
+    policy = load_policy(args.policy)
+    start = time.perf_counter()
+    cache = cached_policy(policy, args.mode, env, args.size, args.bins)
+    build_s = time.perf_counter() - start
+
+    agree = steps = 0
+    cached_s = direct_s = 0.0
+    for episode in range(args.episodes):
+        obs, _ = env.reset(seed=args.seed + episode)
+        terminated = truncated = False
+        while not (terminated or truncated):
+            t0 = time.perf_counter()
+            action = cache(obs)
+            t1 = time.perf_counter()
+            reference = policy(obs)
+            direct_s += time.perf_counter() - t1
+            cached_s += t1 - t0
+            agree += np.array_equal(action, reference)
+            steps += 1
+            obs, _, terminated, truncated, _ = env.step(action)
+
+    print(f"[INFO] {cache.format_stats()}")
+    if args.mode == 'table':
+        print(f"[INFO] Table of {cache.stats()['table_size']} cells built in {build_s:.2f} s")
+    print(f"[INFO] {agree / steps:.2%} of cached decisions equal the policy's; "
+          f"{cached_s / steps * 1e6:.1f} us per cached decision vs {direct_s / steps * 1e6:.1f} us per policy call")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,75 @@
 # evaluate_trained_ppo.py
 # Evaluate trained PPO agent and log performance metrics
 
-from stable_baselines3 import PPO
-from ppo_env import MIMOAIAntiJammingEnv
+import argparse
+import os
 import numpy as np
-import pandas as pd
-
-# Load environment and model
-env = MIMOAIAntiJammingEnv(
-    data_csv_path='balanced_dataset_20000.csv',
-    rf_model_path='rf_model.pkl',
-    rf_scaler_path='rf_scaler.pkl'
-)
-model = PPO.load("ppo_mimo_anti_jamming")
-
-# Evaluation settings
-num_episodes = 100
-metrics = []
-
-for ep in range(num_episodes):
-    obs, _ = env.reset()
-    total_reward = 0
-    ep_sinr, ep_ber = [], []
-
-    for step in range(env.max_steps):
-        action, _states = model.predict(obs, deterministic=True)
-        obs, reward, terminated, truncated, info = env.step(action)
-
-        total_reward += reward
-        ep_sinr.append(info['sinr'])
-        ep_ber.append(info['ber'])
-
-        if terminated or truncated:
-            break
-
-    metrics.append({
-        'episode': ep + 1,
-        'avg_sinr': np.mean(ep_sinr),
-        'avg_ber': np.mean(ep_ber),
-        'total_reward': total_reward
-    })
-
-# Save to CSV
-results_df = pd.DataFrame(metrics)
-results_df.to_csv('results/ppo_evaluation_log.csv', index=False)
-print("[INFO] Evaluation complete. Saved to results/ppo_evaluation_log.csv")
-
-# Summary
-print("\nAverage over", num_episodes, "episodes:")
-print("Avg SINR:", results_df['avg_sinr'].mean())
-print("Avg BER:", results_df['avg_ber'].mean())
-print("Avg Reward:", results_df['total_reward'].mean())
+
+TRAJECTORY_DIR = 'results/trajectories/ppo_evaluation'
+
+def load_model(model_path, actor='sb3'):
+    """SB3 PPO model, or its NumPy export from artifact_cache/ (same predict(); no torch import)."""
+    if actor == 'numpy':
+        from artifact_cache import load_actor
+        return load_actor(model_path)
+    from stable_baselines3 import PPO
+    return PPO.load(model_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate the trained PPO agent')
+    parser.add_argument('--model', default='ppo_mimo_anti_jamming')
+    parser.add_argument('--actor', choices=['sb3', 'numpy'], default='sb3',
+                        help='numpy: cached NumPy export of the actor (fast startup)')
+    parser.add_argument('--episodes', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    from ppo_env import MIMOAIAntiJammingEnv
+    from trajectory_recorder import RecordTrajectory, TrajectoryWriter, TrajectoryReader
+    from oracle import build_oracle
+
+    # Load environment and model; every step is logged to TRAJECTORY_DIR
+    env = MIMOAIAntiJammingEnv(
+        data_csv_path='balanced_dataset_20000.csv',
+        rf_model_path='rf_model.pkl',
+        rf_scaler_path='rf_scaler.pkl'
+    )
+    env = RecordTrajectory(env, TrajectoryWriter(TRAJECTORY_DIR))
+    model = load_model(args.model, args.actor)
+
+    # Evaluation settings
+    num_episodes = args.episodes
+
+    for ep in range(num_episodes):
+        obs, _ = env.reset()
+
+        for step in range(env.unwrapped.max_steps):
+            action, _states = model.predict(obs, deterministic=True)
+            obs, reward, terminated, truncated, info = env.step(action)
+
+            if terminated or truncated:
+                break
+
+    env.close()
+    print(f"[INFO] Step log saved to {TRAJECTORY_DIR}")
+
+    # Per-episode means from the step log, plus the gap to the optimal action of every step
+    reader = TrajectoryReader(TRAJECTORY_DIR)
+    results_df = reader.episode_summary()
+    oracle = build_oracle()
+    step_regret = oracle.regret(reader.column('idx'), reader.column('action'))
+    episode = np.unique(reader.column('episode'), return_inverse=True)[1]
+    results_df['regret'] = np.bincount(episode, weights=step_regret)
+    os.makedirs('results', exist_ok=True)
+    results_df.to_csv('results/ppo_evaluation_log.csv', index=False)
+    print("[INFO] Evaluation complete. Saved to results/ppo_evaluation_log.csv")
+
+    # Summary
+    print("\nAverage over", num_episodes, "episodes:")
+    print("Avg SINR:", results_df['avg_sinr'].mean())
+    print("Avg BER:", results_df['avg_ber'].mean())
+    print("Avg Reward:", results_df['total_reward'].mean())
+    print("Avg Regret (vs oracle):", results_df['regret'].mean())
+    print("Optimal actions: {:.1%}".format(np.mean(step_regret <= 1e-9)))
+
+if __name__ == "__main__":
+    main()
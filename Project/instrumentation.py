@@ -0,0 +1,424 @@
+# instrumentation.py
+# Opt-in per-stage timing of the decision hot path: an env wrapper (row fetch,
+# simulate_sinr, simulate_ber, reward/observation assembly, reset), the same
+# stages for the batched env, and a policy wrapper (predict / act / __call__).
+# Latencies go into fixed-size log-bucket histograms, so long training or live
+# runs cost no memory per sample; nothing is timed unless an object is wrapped.
+# Profiles are exported as JSON, as Prometheus text and (during training, see
+# ProfilerCallback) as scalars + histograms in the ppo_tensorboard/ logs.
+# Usage (from the Project folder):
+#   python instrumentation.py --episodes 100 [--policy sb3] [--backend montecarlo]
+#   python instrumentation.py --episodes 100 --baseline results/profile.json   (p50 ratios vs an older profile)
+#   python train_and_evaluate_ppo.py --vec-env dummy --profile       (also times rollouts and PPO updates)
+
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from time import perf_counter
+import gymnasium as gym
+import numpy as np
+
+# Upper bucket edges in seconds: 100 ns .. 10 s, 8 buckets per decade (+1 overflow bucket)
+BUCKET_LIMITS = np.logspace(-7, 1, 65).tolist()
+
+ENV_STAGES = {'_scaled_row': 'row_fetch', 'simulate_sinr': 'simulate_sinr', 'simulate_ber': 'simulate_ber'}
+BATCH_STAGES = {'simulate_sinr': 'simulate_sinr', 'simulate_ber': 'simulate_ber'}
+
+
+class Histogram:
+    """Latency histogram (seconds) over BUCKET_LIMITS with exact count/sum/min/max."""
+
+    __slots__ = ('counts', 'n', 'total', 'total_sq', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_LIMITS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, x):
+        self.counts[bisect_left(BUCKET_LIMITS, x)] += 1
+        self.n += 1
+        self.total += x
+        self.total_sq += x * x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def percentile(self, q):
+        """q-th percentile, interpolated linearly inside its bucket."""
+        if self.n == 0:
+            return math.nan
+        rank = q / 100 * self.n
+        cum = 0
+        for i, c in enumerate(self.counts):
+            if c and cum + c >= rank:
+                lo = BUCKET_LIMITS[i - 1] if i else 0.0
+                hi = BUCKET_LIMITS[i] if i < len(BUCKET_LIMITS) else self.max
+                return min(max(lo + (hi - lo) * (rank - cum) / c, self.min), self.max)
+            cum += c
+        return self.max
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def state(self):
+        return {'counts': list(self.counts), 'n': self.n, 'total': self.total, 'total_sq': self.total_sq,
+                'min': self.min if self.n else None, 'max': self.max}
+
+    @classmethod
+    def from_state(cls, state):
+        hist = cls()
+        hist.counts = list(state['counts'])
+        hist.n = state['n']
+        hist.total = state['total']
+        hist.total_sq = state['total_sq']
+        hist.min = math.inf if state['min'] is None else state['min']
+        hist.max = state['max']
+        return hist
+
+
+class Profiler:
+    """Named stage histograms plus event counters; state() is plain data for merging across processes."""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    def histogram(self, stage):
+        if stage not in self.stages:
+            self.stages[stage] = Histogram()
+        return self.stages[stage]
+
+    def record(self, stage, seconds):
+        self.histogram(stage).record(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def state(self):
+        return {'stages': {name: h.state() for name, h in self.stages.items()}, 'counters': dict(self.counters)}
+
+    def merge_state(self, state):
+        for name, h in state['stages'].items():
+            self.histogram(name).merge(Histogram.from_state(h))
+        for name, n in state['counters'].items():
+            self.count(name, n)
+
+    @classmethod
+    def merged(cls, states):
+        profiler = cls()
+        for state in states:
+            profiler.merge_state(state)
+        return profiler
+
+    def summary(self):
+        """{stage: count, mean/p50/p90/p99/max in microseconds, share of the 'step' stage's time}."""
+        step_total = self.stages['step'].total if 'step' in self.stages else 0.0
+        out = {}
+        for name, h in self.stages.items():
+            out[name] = {
+                'count': h.n,
+                'mean_us': h.total / h.n * 1e6 if h.n else math.nan,
+                'p50_us': h.percentile(50) * 1e6,
+                'p90_us': h.percentile(90) * 1e6,
+                'p99_us': h.percentile(99) * 1e6,
+                'max_us': h.max * 1e6,
+                'total_s': h.total,
+                'step_share': h.total / step_total if step_total else math.nan,
+            }
+        return out
+
+    def report(self):
+        lines = [f"{'stage':<16}{'count':>10}{'mean us':>13}{'p50 us':>13}{'p99 us':>13}{'max us':>13}{'% step':>8}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<16}{s['count']:>10}{s['mean_us']:>13.2f}{s['p50_us']:>13.2f}{s['p99_us']:>13.2f}"
+                         f"{s['max_us']:>13.1f}{100 * s['step_share']:>8.1f}")
+        if self.counters:
+            lines.append('  '.join(f"{k}={v}" for k, v in self.counters.items()))
+        return '\n'.join(lines)
+
+    def to_json(self, path):
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'time': time.time(), 'bucket_limits_s': BUCKET_LIMITS, 'summary': self.summary(),
+                       **self.state()}, f, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.merged([json.load(f)])
+
+    def prometheus_text(self, prefix='mimo'):
+        """Prometheus text exposition: one `<prefix>_stage_seconds` histogram per stage plus counters."""
+        lines = [f'# HELP {prefix}_stage_seconds Hot-path stage latency.', f'# TYPE {prefix}_stage_seconds histogram']
+        for name, h in self.stages.items():
+            cum = 0
+            for limit, c in zip(BUCKET_LIMITS, h.counts):
+                cum += c
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{limit:.6g}"}} {cum}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.n}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.total!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.n}')
+        lines += [f'# HELP {prefix}_events_total Hot-path event counters.', f'# TYPE {prefix}_events_total counter']
+        lines += [f'{prefix}_events_total{{name="{k}"}} {v}' for k, v in self.counters.items()]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, stem):
+        """<stem>.json and <stem>.prom (each written atomically)."""
+        os.makedirs(os.path.dirname(stem) or '.', exist_ok=True)
+        self.to_json(stem + '.json')
+        tmp_path = stem + f'.prom.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, stem + '.prom')
+
+    def log_tensorboard(self, writer, step, prefix='perf'):
+        """p50/p99/mean scalars and the bucket histogram (microseconds) of every stage on a SummaryWriter."""
+        for name, s in self.summary().items():
+            for key in ('mean_us', 'p50_us', 'p99_us'):
+                writer.add_scalar(f'{prefix}/{name}_{key}', s[key], step)
+            h = self.stages[name]
+            used = [i for i, c in enumerate(h.counts) if c]
+            if not used:
+                continue
+            lo, hi = used[0], used[-1] + 1
+            limits = [l * 1e6 for l in BUCKET_LIMITS] + [max(h.max, BUCKET_LIMITS[-1]) * 1e6]
+            writer.add_histogram_raw(f'{prefix}/{name}_us', h.min * 1e6, h.max * 1e6, h.n, h.total * 1e6,
+                                     h.total_sq * 1e12, limits[lo:hi], h.counts[lo:hi], step)
+        for name, n in self.counters.items():
+            writer.add_scalar(f'{prefix}/{name}', n, step)
+
+
+def _timed(fn, hist, inner):
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        out = fn(*args, **kwargs)
+        elapsed = perf_counter() - start
+        hist.record(elapsed)
+        inner[0] += elapsed
+        return out
+    return timed
+
+
+def instrument_stages(obj, profiler, stages, inner=None):
+    """
+    Shadow obj.<method> with a timed version for every method: stage pair
+    (instance attributes, so other instances and the class are untouched).
+    inner[0] accumulates the time spent in these stages.
+    """
+    inner = inner if inner is not None else [0.0]
+    for method, stage in stages.items():
+        setattr(obj, method, _timed(getattr(obj, method), profiler.histogram(stage), inner))
+    return inner
+
+
+class InstrumentedEnv(gym.Wrapper):
+    """
+    Times every stage of MIMOAIAntiJammingEnv.step (ENV_STAGES, plus
+    'reward_obs' for the rest of step and 'step' for the whole call) and
+    reset. Wrap the env after clone(): the stage timers are bound to this
+    env's instance.
+    """
+
+    def __init__(self, env, profiler=None):
+        super().__init__(env)
+        self.profiler = profiler if profiler is not None else Profiler()
+        self._inner = instrument_stages(env.unwrapped, self.profiler, ENV_STAGES)
+        self._step_hist = self.profiler.histogram('step')
+        self._rest_hist = self.profiler.histogram('reward_obs')
+        self._reset_hist = self.profiler.histogram('reset')
+
+    def reset(self, **kwargs):
+        start = perf_counter()
+        out = self.env.reset(**kwargs)
+        self._reset_hist.record(perf_counter() - start)
+        self.profiler.count('episodes')
+        return out
+
+    def step(self, action):
+        self._inner[0] = 0.0
+        start = perf_counter()
+        out = self.env.step(action)
+        elapsed = perf_counter() - start
+        self._step_hist.record(elapsed)
+        self._rest_hist.record(max(elapsed - self._inner[0], 0.0))
+        self.profiler.count('steps')
+        return out
+
+    def profile_state(self):
+        return self.profiler.state()
+
+
+def instrument_batch(batch, profiler=None):
+    """
+    The same stages for a MIMOAIAntiJammingBatch / VecEnv (one sample per
+    batched step_wait; 'reward_obs' also covers the row gather and auto-resets).
+    """
+    profiler = profiler if profiler is not None else Profiler()
+    inner = instrument_stages(batch, profiler, BATCH_STAGES)
+    step_wait, step_hist, rest_hist = batch.step_wait, profiler.histogram('step'), profiler.histogram('reward_obs')
+
+    def timed_step_wait():
+        inner[0] = 0.0
+        start = perf_counter()
+        out = step_wait()
+        elapsed = perf_counter() - start
+        step_hist.record(elapsed)
+        rest_hist.record(max(elapsed - inner[0], 0.0))
+        profiler.count('steps')
+        profiler.count('env_steps', batch.num_envs)
+        return out
+
+    batch.step_wait = timed_step_wait
+    return profiler
+
+
+class InstrumentedPolicy:
+    """
+    Times a policy's __call__ / predict / act as one stage and counts calls
+    and observation rows; any other attribute is passed through.
+    """
+
+    def __init__(self, policy, profiler=None, stage='policy'):
+        self.policy = policy
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.stage = stage
+        self._hist = self.profiler.histogram(stage)
+
+    def _timed_call(self, fn, obs, *args, **kwargs):
+        start = perf_counter()
+        out = fn(obs, *args, **kwargs)
+        self._hist.record(perf_counter() - start)
+        self.profiler.count(f'{self.stage}_calls')
+        self.profiler.count(f'{self.stage}_rows', len(obs) if np.ndim(obs) == 2 else 1)
+        return out
+
+    def __call__(self, obs):
+        return self._timed_call(self.policy, obs)
+
+    def predict(self, obs, *args, **kwargs):
+        return self._timed_call(self.policy.predict, obs, *args, **kwargs)
+
+    def act(self, obs):
+        return self._timed_call(self.policy.act, obs)
+
+    def __getattr__(self, name):
+        if name == 'policy':
+            raise AttributeError(name)
+        return getattr(self.policy, name)
+
+
+def __getattr__(name):
+    # Defined on first access so that importing this module does not import SB3/torch
+    if name != 'ProfilerCallback':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from stable_baselines3.common.callbacks import BaseCallback
+    from stable_baselines3.common.logger import TensorBoardOutputFormat
+
+    class ProfilerCallback(BaseCallback):
+        """
+        After every rollout, writes the profile returned by `source()` (a
+        Profiler, e.g. merged from the training envs) to the run's TensorBoard
+        log; at the end of training also to <stem>.json / <stem>.prom. With
+        `profiler`, the wall time of each rollout collection and of each PPO
+        update (rollout end to next rollout start) is recorded there.
+        """
+
+        def __init__(self, source, stem=None, profiler=None):
+            super().__init__()
+            self.source = source
+            self.stem = stem
+            self.profiler = profiler
+            self.rollout_start = self.rollout_end = None
+
+        def _on_step(self):
+            return True
+
+        def _record_update(self):
+            if self.profiler is not None and self.rollout_end is not None:
+                self.profiler.record('ppo_update', perf_counter() - self.rollout_end)
+                self.rollout_end = None
+
+        def _on_rollout_start(self):
+            self._record_update()
+            self.rollout_start = perf_counter()
+
+        def _on_rollout_end(self):
+            self.rollout_end = perf_counter()
+            if self.profiler is not None:
+                self.profiler.record('rollout', self.rollout_end - self.rollout_start)
+            for fmt in self.logger.output_formats:
+                if isinstance(fmt, TensorBoardOutputFormat):
+                    self.source().log_tensorboard(fmt.writer, self.num_timesteps)
+
+        def _on_training_end(self):
+            self._record_update()
+            if self.stem is not None:
+                self.source().write(self.stem)
+
+    ProfilerCallback.__qualname__ = name
+    globals()[name] = ProfilerCallback
+    return ProfilerCallback
+
+
+def profile_rollout(policy, n_episodes=100, seed=0, env_kwargs=None):
+    """Profiler of n_episodes of `policy` on an instrumented MIMOAIAntiJammingEnv."""
+    from policy_eval import ENV_PATHS
+    from ppo_env import MIMOAIAntiJammingEnv
+
+    profiler = Profiler()
+    env = InstrumentedEnv(MIMOAIAntiJammingEnv(**ENV_PATHS, **(env_kwargs or {})), profiler)
+    policy = InstrumentedPolicy(policy, profiler)
+    for episode in range(n_episodes):
+        obs, _ = env.reset(seed=seed + episode)
+        terminated = truncated = False
+        while not (terminated or truncated):
+            obs, _, terminated, truncated, _ = env.step(policy(obs))
+    return profiler
+
+
+def main(argv=None):
+    import argparse
+    from control_service import load_policy
+
+    parser = argparse.ArgumentParser(description='Per-stage latency profile of env steps and policy calls')
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--policy', choices=['numpy', 'sb3'], default='numpy')
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='results/profile', help='writes <out>.json and <out>.prom')
+    parser.add_argument('--baseline', default=None, help='profile JSON to compare p50 latencies against')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='p50 ratio reported as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = Profiler.load(args.baseline).summary() if args.baseline else None
+    profiler = profile_rollout(load_policy(args.policy), args.episodes, args.seed, {'backend': args.backend})
+    print(profiler.report())
+    profiler.write(args.out)
+    print(f"[INFO] Profile saved to {args.out}.json and {args.out}.prom")
+
+    if baseline is not None:
+        regressions = 0
+        for name, s in profiler.summary().items():
+            if name in baseline:
+                ratio = s['p50_us'] / baseline[name]['p50_us']
+                regressions += ratio > args.tolerance
+                print(f"{name:<16} p50 {baseline[name]['p50_us']:.2f} -> {s['p50_us']:.2f} us (x{ratio:.2f})"
+                      + ('  REGRESSION' if ratio > args.tolerance else ''))
+        print(f"[INFO] {regressions} stage(s) slower than x{args.tolerance} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# link_table.py
+# Precompute SINR/BER statistics of the Monte-Carlo link simulator over the
+# discrete action grid so the env can sample them in O(1) per step.
+# Run from the Project folder to (re)build the cache: python link_table.py
+
+import hashlib
+import json
+import os
+import numpy as np
+from mimo_link_sim import MIMOLinkSimulator, MOD_ORDERS, TX_POWERS, NULLING_MODES
+
+# Binned noise factor (same range the env clips sum(features)/1000 to)
+NOISE_FACTOR_BINS = np.linspace(0.5, 1.5, 11)
+TABLE_VERSION = 1
+
+
+class LinkTable:
+    """
+    Mean/variance tables of SINR (dB) and BER, indexed by
+    [modulation, power_level, nulling, jammer_label, noise_bin].
+    simulate() mirrors MIMOLinkSimulator.simulate for one realization: it
+    interpolates the statistics linearly over the noise factor and draws a
+    Gaussian sample (BER clipped to [0, 0.5]). The table only covers the
+    broadband jammer, so any other jammer_type is rejected.
+    """
+
+    def __init__(self, sinr_mean, sinr_var, ber_mean, ber_var, noise_bins, seed=None):
+        self.sinr_mean = sinr_mean
+        self.sinr_std = np.sqrt(sinr_var)
+        self.ber_mean = ber_mean
+        self.ber_std = np.sqrt(ber_var)
+        self.noise_bins = noise_bins
+        self.rng = np.random.default_rng(seed)
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def _interp(self, table, modulation, power_level, nulling, jammer_label, noise_factor):
+        lo, hi = self.noise_bins[0], self.noise_bins[-1]
+        pos = (np.clip(noise_factor, lo, hi) - lo) / (hi - lo) * (len(self.noise_bins) - 1)
+        i0 = np.minimum(pos.astype(np.int64), len(self.noise_bins) - 2)
+        w = pos - i0
+        cell = (modulation, power_level, nulling, jammer_label)
+        return (1 - w) * table[cell + (i0,)] + w * table[cell + (i0 + 1,)]
+
+    def lookup(self, modulation, power_level, nulling, jammer_label, noise_factor=1.0):
+        """Interpolated (sinr_mean, sinr_std, ber_mean, ber_std) for each configuration."""
+        args = np.broadcast_arrays(np.atleast_1d(modulation), np.atleast_1d(power_level),
+                                   np.atleast_1d(nulling), np.atleast_1d(jammer_label),
+                                   np.atleast_1d(np.asarray(noise_factor, dtype=float)))
+        return tuple(self._interp(t, *args) for t in
+                     (self.sinr_mean, self.sinr_std, self.ber_mean, self.ber_std))
+
+    def simulate(self, modulation, power_level, nulling, jammer_label, n_realizations=1, noise_factor=1.0,
+                 jammer_type=None):
+        if jammer_type is not None and (jammer_type != 'broadband' if isinstance(jammer_type, str)
+                                        else np.any(np.asarray(jammer_type) != 'broadband')):
+            raise ValueError("The link table only covers the broadband jammer; "
+                             "use backend='montecarlo' for other jammer types")
+        sinr_mean, sinr_std, ber_mean, ber_std = self.lookup(
+            modulation, power_level, nulling, jammer_label, noise_factor)
+        shape = (len(sinr_mean), n_realizations)
+        sinr = sinr_mean[:, None] + sinr_std[:, None] * self.rng.standard_normal(shape)
+        ber = np.clip(ber_mean[:, None] + ber_std[:, None] * self.rng.standard_normal(shape), 0.0, 0.5)
+        return sinr, ber
+
+    def save(self, path):
+        np.savez_compressed(path, sinr_mean=self.sinr_mean, sinr_var=self.sinr_std**2,
+                            ber_mean=self.ber_mean, ber_var=self.ber_std**2, noise_bins=self.noise_bins)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        with np.load(path) as data:
+            return cls(data['sinr_mean'], data['sinr_var'], data['ber_mean'], data['ber_var'],
+                       data['noise_bins'], seed=seed)
+
+
+def table_params(Nt=4, Nr=4, num_symbols=1000, n_realizations=200, noise_bins=NOISE_FACTOR_BINS, sweep_seed=0):
+    return {
+        'version': TABLE_VERSION, 'Nt': Nt, 'Nr': Nr, 'num_symbols': num_symbols,
+        'n_realizations': n_realizations, 'noise_bins': [float(b) for b in noise_bins],
+        'sweep_seed': sweep_seed,
+    }
+
+
+def params_hash(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def build_link_table(params, verbose=True):
+    """Sweep every (modulation, power, nulling, jammer label, noise bin) through the simulator."""
+    sim = MIMOLinkSimulator(Nt=params['Nt'], Nr=params['Nr'], num_symbols=params['num_symbols'],
+                            seed=params['sweep_seed'])
+    noise_bins = np.asarray(params['noise_bins'])
+    shape = (len(MOD_ORDERS), len(TX_POWERS), len(NULLING_MODES), 2, len(noise_bins))
+    grid = np.stack(np.meshgrid(*[np.arange(n) for n in shape], indexing='ij'), axis=-1).reshape(-1, 5)
+
+    stats = {k: np.empty(len(grid)) for k in ('sinr_mean', 'sinr_var', 'ber_mean', 'ber_var')}
+    # One configuration per call keeps peak memory at n_realizations channel draws
+    for i, (mod, pwr, null, label, nb) in enumerate(grid):
+        sinr, ber = sim.simulate(mod, pwr, null, label, params['n_realizations'], noise_bins[nb])
+        stats['sinr_mean'][i], stats['sinr_var'][i] = sinr.mean(), sinr.var()
+        stats['ber_mean'][i], stats['ber_var'][i] = ber.mean(), ber.var()
+        if verbose and (i + 1) % (len(grid) // len(MOD_ORDERS)) == 0:
+            print(f"[INFO] Link table: {i + 1}/{len(grid)} configurations")
+
+    return LinkTable(*(stats[k].reshape(shape) for k in ('sinr_mean', 'sinr_var', 'ber_mean', 'ber_var')),
+                     noise_bins)
+
+
+def load_link_table(cache_dir='link_tables', seed=None, verbose=True, **kwargs):
+    """Load the cached table for these simulator parameters, building it on a cache miss."""
+    params = table_params(**kwargs)
+    path = os.path.join(cache_dir, f'link_table_{params_hash(params)}.npz')
+    if not os.path.exists(path):
+        table = build_link_table(params, verbose=verbose)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + f'.{os.getpid()}.tmp.npz'
+        table.save(tmp_path)
+        os.replace(tmp_path, path)
+        if verbose:
+            print(f"[INFO] Link table saved to {path}")
+    return LinkTable.load(path, seed=seed)
+
+
+if __name__ == "__main__":
+    load_link_table()
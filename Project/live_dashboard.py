@@ -0,0 +1,230 @@
+# live_dashboard.py
+# Constant-cost live SINR/BER views: telemetry goes into fixed-size NumPy ring
+# buffers from a decision thread, and the plot is redrawn with matplotlib
+# blitting from a GUI timer, so frame time does not grow with run length.
+
+import threading
+import time
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Last `capacity` (x, values) samples of n_series series in preallocated
+    arrays. Written by the decision thread, read by the render thread.
+    """
+
+    def __init__(self, capacity, n_series):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros((n_series, capacity))
+        self.count = 0          # samples appended since the last clear()
+        self.generation = 0     # incremented by clear()
+        self.lock = threading.Lock()
+
+    def append(self, x, values):
+        with self.lock:
+            i = self.count % self.capacity
+            self.x[i] = x
+            self.y[:, i] = values
+            self.count += 1
+
+    def clear(self):
+        with self.lock:
+            self.count = 0
+            self.generation += 1
+
+    def snapshot(self, since=0):
+        """
+        (count, x, y) in time order: the whole window, or only the samples
+        appended after `since` (at most one window).
+        """
+        with self.lock:
+            count = self.count
+            n = min(count - since if since <= count else count, self.capacity)
+            order = np.arange(count - n, count) % self.capacity
+            return count, self.x[order], self.y[:, order]
+
+
+class LiveDashboard:
+    """
+    Blitted line plot of a RingBuffer. The static parts (axes, grid, legend,
+    ticks) are cached as a background image; each frame restores it and draws
+    only the lines. Full redraws happen only when the x window pages forward
+    or the y range has to grow (or shrink, checked once per window).
+    """
+
+    def __init__(self, ax, buffer, labels, colors, title='', xlabel='Step', min_ylim=(0, 25),
+                 headroom=5):
+        self.ax = ax
+        self.fig = ax.figure
+        self.canvas = self.fig.canvas
+        self.buffer = buffer
+        self.min_ylim = min_ylim
+        self.headroom = headroom
+        self.lines = [ax.plot([], [], label=label, color=color, animated=True)[0]
+                      for label, color in zip(labels, colors)]
+        ax.set_xlim(0, buffer.capacity)
+        ax.set_ylim(*min_ylim)
+        ax.set_xlabel(xlabel)
+        ax.set_title(title)
+        ax.legend(handles=self.lines)
+        ax.grid(True)
+
+        self.seen = 0
+        self.generation = buffer.generation
+        self.ymin, self.ymax = np.inf, -np.inf
+        self.last_rescan = 0
+        self.background = None
+        self.frame_times = np.zeros(256)
+        self.frames = 0
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        # cache everything except the animated lines after every full draw
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    def _full_redraw(self):
+        self.canvas.draw()
+
+    def _update_limits(self, count, x, new_y):
+        """Grow limits from the new samples only; rescan the window once per `capacity` samples."""
+        redraw = False
+        if new_y.size:
+            self.ymin = min(self.ymin, new_y.min())
+            self.ymax = max(self.ymax, new_y.max())
+        if count - self.last_rescan >= self.buffer.capacity:
+            _, _, window = self.buffer.snapshot()
+            self.ymin, self.ymax = window.min(), window.max()
+            self.last_rescan = count
+
+        lo, hi = self.min_ylim
+        if np.isfinite(self.ymin) and self.ymin < lo:
+            lo = self.ymin - self.headroom
+        if np.isfinite(self.ymax):
+            hi = max(hi, self.ymax + self.headroom)
+        cur_lo, cur_hi = self.ax.get_ylim()
+        # grow immediately; shrink only when the range is far too large, to avoid redraw churn
+        if lo < cur_lo or hi > cur_hi or (cur_hi - cur_lo) > 2 * (hi - lo):
+            self.ax.set_ylim(lo, hi)
+            redraw = True
+
+        if len(x):
+            x0, x1 = self.ax.get_xlim()
+            if x[-1] >= x1:
+                # page forward by half a window instead of scrolling every frame
+                start = x[-1] - self.buffer.capacity / 2
+                self.ax.set_xlim(start, start + self.buffer.capacity)
+                redraw = True
+        return redraw
+
+    def render(self):
+        """Draw the current window; called from the GUI thread (e.g. a canvas timer)."""
+        start = time.perf_counter()
+        restart = self.buffer.generation != self.generation
+        if restart:                                 # buffer was cleared (new episode)
+            self.generation = self.buffer.generation
+            self.seen = self.last_rescan = 0
+            self.ymin, self.ymax = np.inf, -np.inf
+            self.ax.set_xlim(0, self.buffer.capacity)
+        count, x_new, y_new = self.buffer.snapshot(since=self.seen)
+        redraw = self._update_limits(count, x_new, y_new) or restart
+        self.seen = count
+
+        _, x, y = self.buffer.snapshot()
+        for line, values in zip(self.lines, y):
+            line.set_data(x, values)
+
+        if redraw or self.background is None or not self.canvas.supports_blit:
+            self._full_redraw()
+        else:
+            self.canvas.restore_region(self.background)
+            for line in self.lines:
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+        self.frame_times[self.frames % len(self.frame_times)] = time.perf_counter() - start
+        self.frames += 1
+
+    def frame_time_ms(self):
+        """Median render time over the last 256 frames."""
+        n = min(self.frames, len(self.frame_times))
+        return float(np.median(self.frame_times[:n]) * 1e3) if n else float('nan')
+
+    def start(self, fps=30):
+        timer = self.canvas.new_timer(interval=int(1000 / fps))
+        timer.add_callback(self.render)
+        timer.start()
+        return timer
+
+
+class DecisionThread(threading.Thread):
+    """
+    Runs policy -> env.step in a background thread and appends (step, SINR, BER)
+    to a RingBuffer. rate_hz=None steps as fast as possible. `action_source`,
+    when it returns something other than None, overrides the policy (manual
+    control). Episodes auto-reset unless pause_on_done is set, in which case the
+    thread waits for request_reset().
+    """
+
+    def __init__(self, env, policy, buffer, rate_hz=None, episodes=None, max_steps=None,
+                 action_source=None, pause_on_done=False, verbose=False):
+        super().__init__(daemon=True)
+        self.env = env
+        self.policy = policy
+        self.buffer = buffer
+        self.period = None if rate_hz is None else 1.0 / rate_hz
+        self.episodes = episodes
+        self.max_steps = max_steps
+        self.action_source = action_source
+        self.pause_on_done = pause_on_done
+        self.verbose = verbose
+        self.stop_event = threading.Event()
+        self.reset_event = threading.Event()
+        self.steps = 0
+
+    def request_reset(self):
+        self.reset_event.set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _wait_next(self, next_t):
+        if self.period is None:
+            return next_t
+        next_t += self.period
+        self.stop_event.wait(max(0.0, next_t - time.perf_counter()))
+        return next_t
+
+    def run(self):
+        episode = 0
+        next_t = time.perf_counter()
+        while not self.stop_event.is_set() and (self.episodes is None or episode < self.episodes):
+            obs, _ = self.env.reset()
+            self.buffer.clear()
+            self.reset_event.clear()
+            if self.verbose:
+                print(f"Starting Episode {episode+1}")
+            step = 0
+            while not self.stop_event.is_set() and not self.reset_event.is_set():
+                action = self.action_source() if self.action_source is not None else None
+                if action is None:
+                    action = self.policy(obs)
+                obs, reward, terminated, truncated, info = self.env.step(action)
+                step += 1
+                self.steps += 1
+                self.buffer.append(step, (info['sinr'], info['ber']))
+                if self.verbose:
+                    print(f"Step {step}: Action={action}, SINR={info['sinr']:.2f} dB, "
+                          f"BER={info['ber']:.4f}, Reward={reward:.2f}")
+                next_t = self._wait_next(next_t)
+                if terminated or truncated or (self.max_steps is not None and step >= self.max_steps):
+                    if self.verbose:
+                        print("Episode finished")
+                    if self.pause_on_done:
+                        while not (self.reset_event.is_set() or self.stop_event.is_set()):
+                            self.reset_event.wait(0.1)
+                    break
+            episode += 1
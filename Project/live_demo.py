@@ -1,40 +1,31 @@
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, RadioButtons
 from ppo_env import MIMOAIAntiJammingEnv
-from stable_baselines3 import PPO
-import numpy as np
+from control_service import load_policy
+from decision_cache import add_cache_arguments, cached_policy
+from live_dashboard import RingBuffer, LiveDashboard, DecisionThread
+import threading
 
 class LiveDemoGUI:
-    def __init__(self):
-        # Load environment and model
+    def __init__(self, rate_hz=10, window=500, fps=30, policy='numpy', cache='lru', cache_bins=None,
+                 cache_size=4096):
+        # Load environment and policy
         self.env = MIMOAIAntiJammingEnv(
             data_csv_path='balanced_dataset_20000.csv',
             rf_model_path='rf_model.pkl',
             rf_scaler_path='rf_scaler.pkl'
         )
-        self.model = PPO.load('ppo_mimo_anti_jamming')
-        
-        # Reset env (make sure env.reset() returns what you expect)
-        self.obs, _ = self.env.reset()
-        self.done = False
+        self.policy = cached_policy(load_policy(policy), cache, self.env, cache_size, cache_bins)
         self.auto_mode = True
 
-        # State tracking lists for plotting
-        self.sinr_vals = []
-        self.ber_vals = []
-        self.steps = []
+        # Fixed-size telemetry shared with the decision thread
+        self.buffer = RingBuffer(window, 2)
 
         # Setup figure and axis
         self.fig, self.ax = plt.subplots()
         plt.subplots_adjust(bottom=0.35)
-        self.line_sinr, = self.ax.plot([], [], label='SINR (dB)', color='blue')
-        self.line_ber, = self.ax.plot([], [], label='BER', color='red')
-        self.ax.set_xlim(0, 100)
-        self.ax.set_ylim(0, 25)
-        self.ax.set_xlabel('Step')
-        self.ax.set_title('Live SINR and BER')
-        self.ax.legend()
-        self.ax.grid(True)
+        self.dashboard = LiveDashboard(self.ax, self.buffer, ['SINR (dB)', 'BER'], ['blue', 'red'],
+                                       title='Live SINR and BER')
 
         # Reset Environment Button
         ax_reset = plt.axes([0.7, 0.15, 0.1, 0.075])
@@ -64,21 +55,25 @@ class LiveDemoGUI:
         self.radio_null.on_clicked(self.manual_action_change)
         self.fig.text(0.575, 0.22, 'Nulling Strength', ha='center', fontsize=9)
 
-        # Default manual action: [modulation, power, nulling]
+        # Default manual action: [modulation, power, nulling]; read by the decision thread
         self.manual_action = [0, 1, 0]
+        self.action_lock = threading.Lock()
 
-        # Start the animation timer
+        # The env runs in a decision thread at rate_hz; the GUI timer only blits the plot
+        self.agent = DecisionThread(self.env, self.policy, self.buffer, rate_hz=rate_hz,
+                                    action_source=self.current_manual_action, pause_on_done=True)
         self.fig.canvas.mpl_connect('close_event', self.on_close)
-        self.timer = self.fig.canvas.new_timer(interval=100)
-        self.timer.add_callback(self.update)
-        self.timer.start()
+        self.timer = self.dashboard.start(fps)
+        self.agent.start()
+
+    def current_manual_action(self):
+        if self.auto_mode:
+            return None
+        with self.action_lock:
+            return list(self.manual_action)
 
     def reset_env(self, event):
-        self.obs, _ = self.env.reset()
-        self.done = False
-        self.sinr_vals.clear()
-        self.ber_vals.clear()
-        self.steps.clear()
+        self.agent.request_reset()
         print("Environment reset")
 
     def toggle_mode(self, event):
@@ -90,54 +85,30 @@ class LiveDemoGUI:
         mod_map = {'QPSK': 0, '16-QAM': 1, '64-QAM': 2}
         pow_map = {'Low': 0, 'Medium': 1, 'High': 2}
         null_map = {'None': 0, 'Partial': 1, 'Full': 2}
-        self.manual_action[0] = mod_map[self.radio_mod.value_selected]
-        self.manual_action[1] = pow_map[self.radio_pow.value_selected]
-        self.manual_action[2] = null_map[self.radio_null.value_selected]
+        with self.action_lock:
+            self.manual_action[0] = mod_map[self.radio_mod.value_selected]
+            self.manual_action[1] = pow_map[self.radio_pow.value_selected]
+            self.manual_action[2] = null_map[self.radio_null.value_selected]
         print(f"Manual action set to: {self.manual_action}")
 
-    def update(self):
-        if self.done:
-            return
-
-        if self.auto_mode:
-            # Predict action using the trained model
-            action, _ = self.model.predict(self.obs, deterministic=True)
-        else:
-            # Use manual action chosen by the user
-            action = self.manual_action
-
-        # Handle environments that use either the Gymnasium (5-tuple) or Gym (4-tuple) API.
-        result = self.env.step(action)
-        if len(result) == 5:
-            self.obs, reward, terminated, truncated, info = result
-            self.done = terminated or truncated
-        elif len(result) == 4:
-            self.obs, reward, done, info = result
-            self.done = done
-        else:
-            raise ValueError("Unexpected number of return values from env.step")
-
-        # Update logs for plotting
-        step = len(self.steps) + 1
-        self.steps.append(step)
-        self.sinr_vals.append(info['sinr'])
-        self.ber_vals.append(info['ber'])
-
-        # Update plotted data
-        self.line_sinr.set_data(self.steps, self.sinr_vals)
-        self.line_ber.set_data(self.steps, self.ber_vals)
-        self.ax.set_xlim(0, max(100, step + 10))
-        # Combine both lists to dynamically adjust the y-limit
-        current_max = max(self.sinr_vals + self.ber_vals)
-        self.ax.set_ylim(0, max(25, current_max + 5))
-        self.fig.canvas.draw_idle()
-
-        print(f"Step {step}: Action={action}, SINR={info['sinr']:.2f}, BER={info['ber']:.4f}")
-
     def on_close(self, event):
+        self.agent.stop()
         self.timer.stop()
-        print("Demo closed.")
+        print(f"Demo closed after {self.agent.steps} steps "
+              f"(median frame time {self.dashboard.frame_time_ms():.2f} ms).")
+        if hasattr(self.policy, 'format_stats'):
+            print(self.policy.format_stats())
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Interactive live anti-jamming demo')
+    parser.add_argument('--rate', type=float, default=10, help='decisions per second')
+    parser.add_argument('--policy', choices=['numpy', 'sb3'], default='numpy')
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    demo = LiveDemoGUI(rate_hz=args.rate, policy=args.policy, cache=args.cache, cache_bins=args.cache_bins,
+                       cache_size=args.cache_size)
+    plt.show()
 
 if __name__ == "__main__":
-    demo = LiveDemoGUI()
-    plt.show()
\ No newline at end of file
+    main()
@@ -1,57 +1,63 @@
-import time
 import matplotlib.pyplot as plt
 from ppo_env import MIMOAIAntiJammingEnv
-from stable_baselines3 import PPO
-import numpy as np
+from control_service import load_policy
+from decision_cache import add_cache_arguments, cached_policy
+from live_dashboard import RingBuffer, LiveDashboard, DecisionThread
 
-def live_demo(episodes=1, max_steps=100):
+def live_demo(episodes=1, max_steps=100, rate_hz=20, window=500, fps=30, policy='numpy', verbose=True,
+              profile=None, cache='lru', cache_bins=None, cache_size=4096):
     env = MIMOAIAntiJammingEnv(
         data_csv_path='balanced_dataset_20000.csv',
         rf_model_path='rf_model.pkl',
         rf_scaler_path='rf_scaler.pkl'
     )
-    model = PPO.load('ppo_mimo_anti_jamming')
-
-    plt.ion()
+    act = cached_policy(load_policy(policy), cache, env, cache_size, cache_bins)
+    if profile is not None:
+        # Per-stage step and policy latency, written to <profile>.json/.prom at the end
+        from instrumentation import InstrumentedEnv, InstrumentedPolicy, Profiler
+        profiler = Profiler()
+        env, act = InstrumentedEnv(env, profiler), InstrumentedPolicy(act, profiler)
+
+    # The agent runs in its own thread and writes into a fixed-size ring buffer;
+    # this (GUI) thread only blits the latest window at `fps`
+    buffer = RingBuffer(window, 2)
     fig, ax = plt.subplots()
-    sinr_vals, ber_vals, step_vals = [], [], []
-
-    for ep in range(episodes):
-        obs, _ = env.reset()
-        print(f"Starting Episode {ep+1}")
-
-        for step in range(max_steps):
-            action, _states = model.predict(obs, deterministic=True)
-            obs, reward, terminated, truncated, info = env.step(action)
-
-            sinr_vals.append(info['sinr'])
-            ber_vals.append(info['ber'])
-            step_vals.append(step)
-
-            # Console output
-            print(f"Step {step+1}: Action={action}, SINR={info['sinr']:.2f} dB, BER={info['ber']:.4f}, Reward={reward:.2f}")
+    dashboard = LiveDashboard(ax, buffer, ['SINR (dB)', 'BER'], ['blue', 'red'],
+                              title='Live SINR and BER During PPO Agent Episode')
+    agent = DecisionThread(env, act, buffer, rate_hz=rate_hz, episodes=episodes, max_steps=max_steps,
+                           verbose=verbose)
+
+    timer = dashboard.start(fps)
+    agent.start()
+    plt.show(block=False)
+    while agent.is_alive() and plt.fignum_exists(fig.number):
+        plt.pause(1 / fps)
+    agent.stop()
+    timer.stop()
+    dashboard.render()
+    print(f"[INFO] {agent.steps} steps, median frame time {dashboard.frame_time_ms():.2f} ms")
+    if cache != 'off':
+        print(f"[INFO] {act.format_stats()}")
+    if profile is not None:
+        print(profiler.report())
+        profiler.write(profile)
+        print(f"[INFO] Profile saved to {profile}.json and {profile}.prom")
 
-            # Plot live SINR and BER
-            ax.clear()
-            ax.plot(step_vals, sinr_vals, label='SINR (dB)', color='blue')
-            ax.plot(step_vals, ber_vals, label='BER', color='red')
-            ax.set_xlabel('Step')
-            ax.set_title('Live SINR and BER During PPO Agent Episode')
-            ax.legend()
-            ax.grid(True)
-            plt.pause(0.05)  # pause for plot update
-
-            if terminated or truncated:
-                print("Episode finished")
-                break
-
-        # Reset lists for next episode
-        sinr_vals.clear()
-        ber_vals.clear()
-        step_vals.clear()
-
-    plt.ioff()
     plt.show()
 
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Live SINR/BER plot of PPO episodes')
+    parser.add_argument('--episodes', type=int, default=1)
+    parser.add_argument('--max-steps', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=20, help='decisions per second')
+    parser.add_argument('--policy', choices=['numpy', 'sb3'], default='numpy')
+    parser.add_argument('--profile', default=None, metavar='STEM',
+                        help='time env stages and policy calls (see instrumentation.py), saved to STEM.json/.prom')
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    live_demo(episodes=args.episodes, max_steps=args.max_steps, rate_hz=args.rate, policy=args.policy,
+              profile=args.profile, cache=args.cache, cache_bins=args.cache_bins, cache_size=args.cache_size)
+
 if __name__ == "__main__":
-    live_demo(episodes=1, max_steps=100)
\ No newline at end of file
+    main()
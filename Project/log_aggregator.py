@@ -0,0 +1,384 @@
+# log_aggregator.py
+# Incremental aggregator of training logs from many runs: TensorBoard event
+# files (ppo_tensorboard/PPO_*/events.out.tfevents.*) and EvalCallback-style
+# evaluations.npz archives (logs/, sweeps/*/trial_*/). Every source is read
+# from where the previous refresh stopped (byte offset of the last complete
+# event record, number of evaluation rows), and values are downsampled into
+# fixed timestep bins in a compact per-run store. Reward / SINR / BER curves
+# are plotted as the mean over runs with a Student-t confidence band.
+# A run is one log folder, so each training must be read from one source
+# family only: train_and_evaluate_ppo.py runs from ppo_tensorboard/PPO_* (they
+# hold eval/mean_reward too; its logs/evaluations.npz would count the same
+# training twice), ppo_sweep.py trials from their evaluations.npz.
+# Usage (from the Project folder):
+#   python log_aggregator.py                                  (ppo_tensorboard/, sweeps/)
+#   python log_aggregator.py sweeps/ppo_sweep --watch 10      (refresh + re-plot every 10 s)
+#   python log_aggregator.py --self-check                     (one training -> one run)
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+import time
+import numpy as np
+
+# logs/ is left out: it repeats the eval results of the latest ppo_tensorboard run
+DEFAULT_SOURCES = ['ppo_tensorboard', 'sweeps']
+DEFAULT_STORE = 'training_index'
+
+# Plotted metric: tags tried in order (the first one a run has is used for that run)
+METRICS = {
+    'reward': ['evaluations/reward', 'eval/mean_reward', 'rollout/ep_rew_mean'],
+    'sinr': ['evaluations/sinr', 'rollout/sinr_mean'],
+    'ber': ['evaluations/ber', 'rollout/ber_mean'],
+}
+
+
+def find_sources(paths):
+    """Event files and evaluations.npz archives under `paths` (files or folders)."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            found += [os.path.join(root, f) for f in files
+                      if f.startswith('events.out.tfevents.') or f == 'evaluations.npz']
+    return sorted(found)
+
+
+def source_kind(path):
+    return 'evaluations' if os.path.basename(path) == 'evaluations.npz' else 'tfevents'
+
+
+def read_records(path, offset=0):
+    """
+    Payloads of the complete TFRecord entries after `offset` (uint64 length,
+    uint32 length CRC, payload, uint32 payload CRC) and the offset after the
+    last of them; a record still being written is left for the next call.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    records, pos = [], 0
+    while pos + 12 <= len(data):
+        (length,) = struct.unpack_from('<Q', data, pos)
+        end = pos + 16 + length
+        if end > len(data):
+            break
+        records.append(data[pos + 12:pos + 12 + length])
+        pos = end
+    return records, offset + pos
+
+
+def parse_scalars(records):
+    """(steps, tags, values) of the scalar summaries in serialized Event records."""
+    from tensorboard.compat.proto.event_pb2 import Event
+
+    steps, tags, values = [], [], []
+    for record in records:
+        event = Event.FromString(record)
+        if not event.HasField('summary'):
+            continue
+        for v in event.summary.value:
+            if v.HasField('simple_value'):
+                value = v.simple_value
+            elif v.HasField('tensor') and v.metadata.plugin_data.plugin_name == 'scalars':
+                t = v.tensor
+                value = t.float_val[0] if t.float_val else np.frombuffer(t.tensor_content, np.float32)[0]
+            else:
+                continue
+            steps.append(event.step)
+            tags.append(v.tag)
+            values.append(value)
+    return np.array(steps, dtype=np.int64), tags, np.array(values, dtype=np.float64)
+
+
+def read_evaluations(path, start_row=0):
+    """(steps, tags, values, n_rows) of evaluations.npz rows from start_row on (means over the eval episodes)."""
+    with np.load(path) as data:
+        timesteps = data['timesteps']
+        columns = {'reward': data['results'], 'ep_length': data['ep_lengths']}
+        columns.update({name: data[name] for name in ('sinr', 'ber') if name in data})
+    n_new = max(len(timesteps) - start_row, 0)
+    names = [f'evaluations/{name}' for name in columns for _ in range(n_new)]
+    steps = np.tile(timesteps[start_row:], len(columns)).astype(np.int64)
+    values = np.concatenate([c[start_row:].reshape(n_new, -1).mean(axis=1) if n_new else np.zeros(0)
+                             for c in columns.values()])
+    return steps, names, values.astype(np.float64), len(timesteps)
+
+
+class RunSeries:
+    """
+    Downsampled scalars of one run: for every (tag, step bin) the number of
+    values, their sum and the last value, as flat arrays sorted by (tag, bin).
+    `sources` holds the read position of every log file of the run, so the
+    data and the offsets are always saved together.
+    """
+
+    def __init__(self, step_bin, tags=(), tag=None, bins=None, count=None, total=None, last=None, sources=None):
+        self.step_bin = step_bin
+        self.tags = list(tags)
+        self.tag = np.zeros(0, np.int32) if tag is None else tag
+        self.bins = np.zeros(0, np.int64) if bins is None else bins
+        self.count = np.zeros(0, np.int64) if count is None else count
+        self.total = np.zeros(0) if total is None else total
+        self.last = np.zeros(0) if last is None else last
+        self.sources = sources or {}
+
+    def add(self, steps, tags, values):
+        if len(steps) == 0:
+            return
+        names, inverse = np.unique(np.asarray(tags, dtype=object), return_inverse=True)
+        self.tags += [name for name in names if name not in self.tags]
+        tag = np.array([self.tags.index(name) for name in names], dtype=np.int32)[inverse]
+        # existing entries first, new values in file order, so `last` is the most recent value of each bin
+        tag = np.concatenate([self.tag, tag])
+        bins = np.concatenate([self.bins, steps // self.step_bin])
+        count = np.concatenate([self.count, np.ones(len(steps), np.int64)])
+        total = np.concatenate([self.total, values])
+        last = np.concatenate([self.last, values])
+        keys, inverse = np.unique(tag.astype(np.int64) << 40 | bins, return_inverse=True)
+        last_pos = np.zeros(len(keys), np.int64)
+        np.maximum.at(last_pos, inverse, np.arange(len(tag)))
+        self.tag, self.bins = (keys >> 40).astype(np.int32), keys & ((1 << 40) - 1)
+        self.count = np.bincount(inverse, weights=count, minlength=len(keys)).astype(np.int64)
+        self.total = np.bincount(inverse, weights=total, minlength=len(keys))
+        self.last = last[last_pos]
+
+    def curve(self, name):
+        """(step, mean) of one tag per bin (step = bin start), or None if the run has no such tag."""
+        if name not in self.tags:
+            return None
+        rows = self.tag == self.tags.index(name)
+        return self.bins[rows] * self.step_bin, self.total[rows] / self.count[rows]
+
+    def save(self, path):
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, step_bin=self.step_bin, tags=np.array(self.tags, dtype=str), tag=self.tag, bins=self.bins,
+                     count=self.count, total=self.total, last=self.last, sources=json.dumps(self.sources))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as d:
+            return cls(int(d['step_bin']), d['tags'].tolist(), d['tag'], d['bins'], d['count'], d['total'],
+                       d['last'], json.loads(str(d['sources'])))
+
+
+class LogStore:
+    """
+    Folder of RunSeries files (runs/<hash>.npz, one run per log folder) plus
+    index.json mapping run ids to files and remembering the (size, mtime) of
+    every source, so unchanged files are skipped without being opened.
+    """
+
+    def __init__(self, path=DEFAULT_STORE, step_bin=1000):
+        self.path = path
+        os.makedirs(os.path.join(path, 'runs'), exist_ok=True)
+        index_path = os.path.join(path, 'index.json')
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {'step_bin': step_bin, 'runs': {}, 'files': {}}
+        self.step_bin = self.index['step_bin']
+
+    def _run_path(self, run_id):
+        return os.path.join(self.path, 'runs', hashlib.sha1(run_id.encode()).hexdigest()[:16] + '.npz')
+
+    def load_run(self, run_id):
+        path = self._run_path(run_id)
+        return RunSeries.load(path) if os.path.exists(path) else RunSeries(self.step_bin)
+
+    def runs(self, pattern='*'):
+        return {run_id: self.load_run(run_id) for run_id in sorted(self.index['runs'])
+                if fnmatch.fnmatch(run_id, pattern)}
+
+    def _ingest(self, run, source):
+        """Read `source` from its stored position into `run`; #values read, or None if it shrank (rewritten)."""
+        kind = source_kind(source)
+        position = run.sources.get(source, 0)
+        if kind == 'tfevents':
+            if os.path.getsize(source) < position:
+                return None
+            records, position = read_records(source, position)
+            steps, tags, values = parse_scalars(records)
+        else:
+            steps, tags, values, n_rows = read_evaluations(source, position)
+            if n_rows < position:
+                return None
+            position = n_rows
+        run.add(steps, tags, values)
+        run.sources[source] = position
+        return len(steps)
+
+    def refresh(self, paths=DEFAULT_SOURCES):
+        """Read what is new in every source under `paths`; returns (#sources read, #values read)."""
+        changed = {}
+        for source in find_sources(paths):
+            st = os.stat(source)
+            if self.index['files'].get(source) != [st.st_size, st.st_mtime_ns]:
+                changed.setdefault(os.path.dirname(source), []).append((source, [st.st_size, st.st_mtime_ns]))
+
+        n_read = 0
+        for run_id, sources in changed.items():
+            run = self.load_run(run_id)
+            for source, _ in sources:
+                n = self._ingest(run, source)
+                if n is None:
+                    # a log was replaced: rebuild the run from all of its files
+                    run = RunSeries(self.step_bin)
+                    n_read += sum(self._ingest(run, other) for other in find_sources([run_id])
+                                  if os.path.dirname(other) == run_id)
+                    break
+                n_read += n
+            run.save(self._run_path(run_id))
+            self.index['runs'][run_id] = os.path.basename(self._run_path(run_id))
+            self.index['files'].update(dict(sources))
+        self._save_index()
+        return sum(len(s) for s in changed.values()), n_read
+
+    def _save_index(self):
+        path = os.path.join(self.path, 'index.json')
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, path)
+
+
+def aggregate(runs, tags, step_bin, level=0.95):
+    """
+    Mean over runs per step bin of the first of `tags` each run has, with the
+    Student-t confidence half-width (nan where fewer than 2 runs have the bin).
+    Returns a dict of arrays: step, mean, half_width, n_runs.
+    """
+    from scipy.special import stdtrit       # Student-t quantile; much lighter import than scipy.stats
+
+    curves = []
+    for run in runs.values():
+        for name in tags:
+            curve = run.curve(name)
+            if curve is not None:
+                curves.append(curve)
+                break
+    if not curves:
+        return None
+    steps = np.unique(np.concatenate([c[0] for c in curves]))
+    grid = np.full((len(curves), len(steps)), np.nan)
+    for i, (x, y) in enumerate(curves):
+        grid[i, np.searchsorted(steps, x)] = y
+    n = np.sum(~np.isnan(grid), axis=0)
+    mean = np.nanmean(grid, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(np.nansum((grid - mean)**2, axis=0) / (n - 1))
+        half_width = np.where(n > 1, stdtrit(np.maximum(n - 1, 1), 0.5 + level/2) * std / np.sqrt(n), np.nan)
+    return {'step': steps + step_bin // 2, 'mean': mean, 'half_width': half_width, 'n_runs': n}
+
+
+def plot_curves(runs, step_bin, path, metrics=METRICS, level=0.95, show_runs=10):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    panels = {name: aggregate(runs, tags, step_bin, level) for name, tags in metrics.items()}
+    panels = {name: agg for name, agg in panels.items() if agg is not None}
+    if not panels:
+        return None
+    fig, axes = plt.subplots(len(panels), 1, figsize=(10, 3.2 * len(panels)), sharex=True, squeeze=False)
+    for ax, (name, agg) in zip(axes[:, 0], panels.items()):
+        if len(runs) <= show_runs:
+            for run in runs.values():
+                curve = next((c for c in map(run.curve, metrics[name]) if c is not None), None)
+                if curve is not None:
+                    ax.plot(curve[0] + step_bin // 2, curve[1], color='gray', alpha=0.3, linewidth=0.8)
+        ax.plot(agg['step'], agg['mean'], color='C0', label=f"mean of {agg['n_runs'].max()} run(s)")
+        ax.fill_between(agg['step'], agg['mean'] - agg['half_width'], agg['mean'] + agg['half_width'],
+                        color='C0', alpha=0.25, label=f'{level:.0%} CI')
+        ax.set_ylabel({'reward': 'Reward', 'sinr': 'SINR (dB)', 'ber': 'BER'}.get(name, name))
+        ax.grid(True, alpha=0.4)
+        ax.legend(loc='best')
+    axes[-1, 0].set_xlabel('Timesteps')
+    fig.suptitle('PPO training curves across runs')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return list(panels)
+
+
+def self_check():
+    """
+    Lay out the logs of one train_and_evaluate_ppo.py training (tensorboard
+    run + logs/evaluations.npz) in a temporary folder and check that the
+    default sources count it as exactly one run. Returns True if it does.
+    """
+    import shutil
+    import tempfile
+    from tensorboard.compat.proto.event_pb2 import Event
+    from tensorboard.compat.proto.summary_pb2 import Summary
+    from tensorboard.summary.writer.event_file_writer import EventFileWriter
+
+    root = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(root)
+        writer = EventFileWriter(os.path.join('ppo_tensorboard', 'PPO_1'))
+        for step in range(1000, 5001, 1000):
+            for tag, value in (('eval/mean_reward', step / 100), ('rollout/sinr_mean', 10.0)):
+                writer.add_event(Event(step=step, summary=Summary(value=[Summary.Value(tag=tag, simple_value=value)])))
+        writer.close()
+        os.makedirs('logs')
+        timesteps = np.arange(1000, 5001, 1000)
+        np.savez(os.path.join('logs', 'evaluations.npz'), timesteps=timesteps,
+                 results=np.ones((5, 3)) * timesteps[:, None] / 100, ep_lengths=np.full((5, 3), 100))
+        store = LogStore('training_index')
+        store.refresh()
+        runs = store.runs()
+        agg = aggregate(runs, METRICS['reward'], store.step_bin)
+        passed = len(runs) == 1 and agg is not None and agg['n_runs'].max() == 1
+        print(f"[INFO] One training -> {len(runs)} run(s), n_runs={agg['n_runs'].max() if agg else 0}  "
+              f"{'OK' if passed else 'FAIL'}")
+        return passed
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incremental multi-run training log aggregator')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_SOURCES, help='log folders or files')
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--step-bin', type=int, default=1000, help='timesteps per bin (fixed when the store is created)')
+    parser.add_argument('--runs', default='*', help='glob over run ids (log folders) to plot')
+    parser.add_argument('--out', default='results/training_curves.png')
+    parser.add_argument('--watch', type=float, default=None, metavar='SECONDS', help='keep refreshing')
+    parser.add_argument('--self-check', action='store_true', help='check that one training counts as one run')
+    args = parser.parse_args(argv)
+    if args.self_check:
+        if not self_check():
+            raise SystemExit(1)
+        return
+
+    store = LogStore(args.store, args.step_bin)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    first = True
+    while True:
+        start = time.perf_counter()
+        n_sources, n_values = store.refresh(args.paths)
+        if first or n_sources:
+            runs = store.runs(args.runs)
+            panels = plot_curves(runs, store.step_bin, args.out)
+            print(f"[INFO] {n_sources} changed source(s), {n_values} new value(s); {len(runs)} run(s) in "
+                  f"{args.store}; {time.perf_counter() - start:.2f} s"
+                  + (f"; plotted {', '.join(panels)} to {args.out}" if panels else ''))
+        if args.watch is None:
+            break
+        first = False
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# metrics_viewer.py
+# Optional viewer for the control_service.py metrics stream: connects to the
+# metrics port and prints one line per snapshot.
+# Usage (from the Project folder): python metrics_viewer.py --port 8766
+
+import argparse
+import asyncio
+import json
+from control_service import format_metrics
+
+
+async def view(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for line in reader:
+            print(format_metrics(json.loads(line)))
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print the control service metrics stream')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(view(args.host, args.port))
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
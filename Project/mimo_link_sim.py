@@ -0,0 +1,199 @@
+# mimo_link_sim.py
+# Pure-NumPy port of the MATLAB link chain in main_simulation.m / mimo_channel_simulation.m
+# (Nt x Nr Rayleigh channel + AWGN + jammer + pinv/MRC nulling + Gray QAM demod),
+# batched over many channel realizations per call.
+
+import numpy as np
+from scipy.special import erfc
+from channel_stream import JAMMER_TYPES, complex_gaussian, make_jammer, symbol_stream
+
+# Action decoding used by main_simulation.m
+MOD_ORDERS = (4, 16, 64)            # QPSK, 16QAM, 64QAM
+TX_POWERS = (1.0, 2.0, 3.0)         # indexed by power_level
+NULLING_MODES = ('none', 'partial', 'full')
+
+
+def gray_pam_levels(L):
+    """Gray label -> amplitude for an L-ary PAM axis on the odd-integer grid."""
+    positions = np.arange(L)
+    gray = positions ^ (positions >> 1)
+    levels = np.empty(L)
+    levels[gray] = 2*positions - (L - 1)
+    return levels
+
+
+def gray_qam_constellation(M):
+    """
+    Square Gray-coded M-QAM constellation indexed by symbol value, on the
+    odd-integer grid used by MATLAB's qammod (no unit average power).
+    The high half of the bits selects the in-phase level, the low half the quadrature.
+    """
+    L = int(np.sqrt(M))
+    half = int(np.log2(L))
+    levels = gray_pam_levels(L)
+    ints = np.arange(M)
+    return levels[ints >> half] + 1j*levels[ints & (L - 1)]
+
+
+def qam_modulate(ints, M):
+    return gray_qam_constellation(M)[ints]
+
+
+def qam_demodulate(rx, M):
+    """Hard-decision Gray demapping of received symbols back to symbol values."""
+    L = int(np.sqrt(M))
+    half = int(np.log2(L))
+    positions = np.arange(L)
+    gray = positions ^ (positions >> 1)
+    p_i = np.clip(np.rint((rx.real + (L - 1)) / 2), 0, L - 1).astype(np.int64)
+    p_q = np.clip(np.rint((rx.imag + (L - 1)) / 2), 0, L - 1).astype(np.int64)
+    return (gray[p_i] << half) | gray[p_q]
+
+
+def bit_errors(tx_ints, rx_ints, M):
+    """Number of differing bits between two arrays of symbol values (summed over the last axis)."""
+    popcount = np.array([bin(v).count('1') for v in range(M)])
+    return popcount[np.bitwise_xor(tx_ints, rx_ints)].sum(axis=-1)
+
+
+def qfunc(x):
+    return 0.5 * erfc(x / np.sqrt(2))
+
+
+def qam_ber_awgn(ebn0_db, M):
+    """Closed-form (nearest-neighbour) Gray M-QAM bit error rate in AWGN; exact for QPSK."""
+    k = np.log2(M)
+    ebn0 = 10 ** (np.asarray(ebn0_db, dtype=float) / 10)
+    return (4/k) * (1 - 1/np.sqrt(M)) * qfunc(np.sqrt(3*k*ebn0 / (M - 1)))
+
+
+def expected_sinr_db(modulation, power_level, jammer_label, Nt=4, noise_factor=1.0):
+    """
+    Closed-form mean of the pre-filter SINR estimate in simulate(): every Tx antenna
+    sends the same symbol, so each Rx antenna sees Nt*Es of signal power against
+    the noise (1/noise_factor) plus the jammer.
+    """
+    M = MOD_ORDERS[modulation]
+    Es = np.mean(np.abs(gray_qam_constellation(M))**2)
+    jam_pow = TX_POWERS[power_level] if jammer_label == 1 else 0.0
+    return 10*np.log10(Nt*Es / (1/noise_factor + jam_pow))
+
+
+class MIMOLinkSimulator:
+    """
+    Monte-Carlo MIMO link simulator matching main_simulation.m.
+    simulate() accepts scalars or equal-length arrays of action/jammer settings and
+    runs n_realizations independent channel draws for each, returning the
+    pre-filter SINR (dB) and the BER after nulling and Gray QAM demodulation.
+    As in main_simulation.m, power_level scales the jammer power. noise_factor
+    divides the AWGN power (1.0 reproduces main_simulation.m).
+    jammer_type selects the waveform of active jammers (see channel_stream.py);
+    'broadband' is the main_simulation.m jammer. simulate() can override it
+    with one type for all rows or one type per row.
+    """
+
+    def __init__(self, Nt=4, Nr=4, num_symbols=1000, seed=None, jammer_type='broadband'):
+        if jammer_type not in JAMMER_TYPES:
+            raise ValueError(f"Unsupported jammer type: {jammer_type}")
+        self.Nt = Nt
+        self.Nr = Nr
+        self.num_symbols = num_symbols
+        self.jammer_type = jammer_type
+        self.rng = np.random.default_rng(seed)
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def simulate(self, modulation, power_level, nulling, jammer_label, n_realizations=1, noise_factor=1.0,
+                 jammer_type=None):
+        modulation, power_level, nulling, jammer_label, noise_factor, jammer_type = np.broadcast_arrays(
+            np.atleast_1d(modulation), np.atleast_1d(power_level),
+            np.atleast_1d(nulling), np.atleast_1d(jammer_label), np.atleast_1d(noise_factor),
+            np.atleast_1d(self.jammer_type if jammer_type is None else jammer_type))
+
+        sinr_db = np.empty((len(modulation), n_realizations))
+        ber = np.empty((len(modulation), n_realizations))
+        for mod in np.unique(modulation):
+            for jtype in np.unique(jammer_type[modulation == mod]):
+                rows = np.flatnonzero((modulation == mod) & (jammer_type == jtype))
+                jam_pow = np.asarray(TX_POWERS)[power_level[rows]] * (jammer_label[rows] == 1)
+                sinr_db[rows], ber[rows] = self._simulate_group(
+                    MOD_ORDERS[mod], np.repeat(jam_pow, n_realizations),
+                    np.repeat(1.0 / noise_factor[rows], n_realizations),
+                    np.repeat(nulling[rows], n_realizations), n_realizations, str(jtype))
+        return sinr_db, ber
+
+    def _simulate_group(self, M, jam_pow, noise_pow, nulling, n_realizations, jammer_type='broadband'):
+        B, N, Nt, Nr = len(jam_pow), self.num_symbols, self.Nt, self.Nr
+
+        # Random symbols, repeated on every Tx antenna
+        tx_ints = self.rng.integers(0, M, size=(B, N))
+        symbols = qam_modulate(tx_ints, M)
+
+        # Channel, noise and jammer
+        H = complex_gaussian(self.rng, (B, Nr, Nt))
+        rx_clean = H.sum(axis=2)[:, :, None] * symbols[:, None, :]
+        noise = complex_gaussian(self.rng, (B, Nr, N)) * np.sqrt(noise_pow)[:, None, None]
+        jammer = make_jammer(jammer_type)(self.rng, rx_clean, jam_pow)
+        rx = rx_clean + noise + jammer
+
+        # Estimate SINR
+        signal_power = np.mean(np.abs(rx_clean)**2, axis=(1, 2))
+        noise_power = np.mean(np.abs(noise)**2, axis=(1, 2)) + np.mean(np.abs(jammer)**2, axis=(1, 2))
+        sinr_db = 10*np.log10(signal_power / noise_power)
+
+        # Nulling filter (simplified), then collapse antennas
+        rx_flat = np.empty((B, N), dtype=complex)
+        for mode in np.unique(nulling):
+            rows = np.flatnonzero(nulling == mode)
+            if NULLING_MODES[mode] == 'full':
+                rx_filtered = np.linalg.pinv(H[rows]) @ rx[rows]
+            elif NULLING_MODES[mode] == 'partial':
+                rx_filtered = H[rows].conj().transpose(0, 2, 1) @ rx[rows]
+            else:
+                rx_filtered = rx[rows]
+            rx_flat[rows] = rx_filtered.mean(axis=1)
+
+        # Demodulate and BER
+        rx_ints = qam_demodulate(rx_flat, M)
+        ber = bit_errors(tx_ints, rx_ints, M) / (N * np.log2(M))
+
+        return sinr_db.reshape(-1, n_realizations), ber.reshape(-1, n_realizations)
+
+
+def stream_link(modulation, power_level, nulling, jammer_label, n_symbols, chunk_size=65536,
+                noise_factor=1.0, Nt=4, Nr=4, jammer_type='broadband', seed=None):
+    """
+    One main_simulation.m channel realization over n_symbols symbols, processed in
+    chunks so memory stays bounded by chunk_size. The jammer keeps its state
+    (tone phase, reactive threshold) across chunks. Returns (sinr_db, ber).
+    """
+    rng = np.random.default_rng(seed)
+    M = MOD_ORDERS[modulation]
+    k = int(np.log2(M))
+    jam_pow = TX_POWERS[power_level] if jammer_label == 1 else 0.0
+    jammer = make_jammer(jammer_type)
+
+    H = complex_gaussian(rng, (Nr, Nt))
+    if NULLING_MODES[nulling] == 'full':
+        P = np.linalg.pinv(H)
+    elif NULLING_MODES[nulling] == 'partial':
+        P = H.conj().T
+    else:
+        P = None
+
+    signal_sum = noise_sum = 0.0
+    errors = 0
+    for tx_ints in symbol_stream(rng, M, n_symbols, chunk_size):
+        rx_clean = H.sum(axis=1)[:, None] * qam_modulate(tx_ints, M)[None, :]
+        noise = complex_gaussian(rng, rx_clean.shape, 1.0 / noise_factor)
+        jam = jammer(rng, rx_clean, jam_pow)
+        rx = rx_clean + noise + jam
+
+        signal_sum += np.sum(np.abs(rx_clean)**2)
+        noise_sum += np.sum(np.abs(noise)**2) + np.sum(np.abs(jam)**2)
+
+        rx_flat = (rx if P is None else P @ rx).mean(axis=0)
+        errors += int(bit_errors(tx_ints, qam_demodulate(rx_flat, M), M))
+
+    return 10*np.log10(signal_sum / noise_sum), errors / (n_symbols * k)
@@ -0,0 +1,170 @@
+# offline_dataset.py
+# Offline transition dataset built from recorded trajectories (trajectory_recorder.py):
+# one uncompressed .npy per column, memory-mapped for minibatch sampling, with
+# SINR/BER kept so rewards can be relabeled when the reward model changes.
+# Usage (from the Project folder):
+#   python offline_dataset.py --episodes 2000 --out offline_data            # collect + build
+#   python offline_dataset.py --from-dirs results/trajectories/compare/* --out offline_data
+
+import argparse
+import json
+import os
+import numpy as np
+
+DATASET_VERSION = 1
+DATASET_COLUMNS = ('obs', 'action', 'reward', 'next_obs', 'done', 'sinr', 'ber', 'idx')
+
+
+def env_reward(sinr, ber, action):
+    """MIMOAIAntiJammingEnv.step reward: SINR minus power and BER penalties."""
+    return sinr - np.asarray(action)[:, 1] * 0.1 - ber * 10
+
+
+def _transitions(reader):
+    """Columns of one trajectory log ordered by (episode, step), with next_obs filled in."""
+    episode = reader.column('episode')
+    step = reader.column('step')
+    order = np.lexsort((step, episode))
+    cols = {name: reader.column(name)[order] for name in ('obs', 'action', 'reward', 'done', 'sinr', 'ber', 'idx')}
+    # the logs keep reward/SINR/BER in float64; float32 is plenty for training batches
+    cols.update({name: cols[name].astype(np.float32) for name in ('reward', 'sinr', 'ber')})
+    same_episode = episode[order][1:] == episode[order][:-1]
+    next_obs = cols['obs'].copy()
+    next_obs[:-1][same_episode] = cols['obs'][1:][same_episode]
+    cols['next_obs'] = next_obs
+    return cols
+
+
+def build_offline_dataset(trajectory_dirs, out_dir):
+    """
+    Concatenate trajectory logs into out_dir/<column>.npy (written through
+    open_memmap, one log at a time) plus manifest.json.
+    """
+    from trajectory_recorder import TrajectoryReader
+
+    readers = [TrajectoryReader(d) for d in trajectory_dirs]
+    n_total = sum(len(r) for r in readers)
+    os.makedirs(out_dir, exist_ok=True)
+
+    first = _transitions(readers[0])
+    arrays = {name: np.lib.format.open_memmap(os.path.join(out_dir, f'{name}.npy'), mode='w+',
+                                              dtype=first[name].dtype, shape=(n_total,) + first[name].shape[1:])
+              for name in DATASET_COLUMNS}
+    offset = 0
+    sources = []
+    for i, reader in enumerate(readers):
+        cols = first if i == 0 else _transitions(reader)
+        n = len(cols['obs'])
+        for name in DATASET_COLUMNS:
+            arrays[name][offset:offset + n] = cols[name]
+        sources.append({'path': reader.path, 'rows': n, 'metadata': reader.metadata})
+        offset += n
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump({'version': DATASET_VERSION, 'rows': n_total, 'sources': sources}, f, indent=2)
+    return ReplayDataset(out_dir)
+
+
+class ReplayDataset:
+    """
+    Memory-mapped transition dataset. Minibatches gather rows straight from
+    the .npy files, so the working set is one batch regardless of dataset size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                        for name in DATASET_COLUMNS}
+        self.rewards = self.columns['reward']
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def relabel(self, reward_fn=env_reward, chunk_size=1 << 20):
+        """Recompute rewards from the stored SINR/BER/action (in memory, chunk by chunk)."""
+        rewards = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), chunk_size):
+            sl = slice(start, start + chunk_size)
+            rewards[sl] = reward_fn(self.columns['sinr'][sl].astype(np.float64),
+                                    self.columns['ber'][sl].astype(np.float64), self.columns['action'][sl])
+        self.rewards = rewards
+        return rewards
+
+    def best_action_mask(self, tolerance=0.0):
+        """Rows whose reward is within `tolerance` of the best logged reward for their dataset row."""
+        idx = np.asarray(self.columns['idx'])
+        best = np.full(idx.max() + 1, -np.inf)
+        np.maximum.at(best, idx, self.rewards)
+        return self.rewards >= best[idx] - tolerance
+
+    def batch(self, rows):
+        rows = np.sort(rows)     # ascending gathers read the memory map sequentially
+        out = {name: np.asarray(col[rows]) for name, col in self.columns.items()}
+        out['reward'] = np.asarray(self.rewards[rows])
+        return out
+
+    def sample(self, batch_size, rng):
+        return self.batch(rng.integers(0, len(self), size=batch_size))
+
+    def iter_batches(self, batch_size, rng=None, rows=None, block_size=65536):
+        """
+        One epoch of minibatches over `rows` (default: all). Blocks of
+        block_size consecutive rows are visited in random order and shuffled
+        inside, which keeps memory-map reads local while still mixing batches.
+        """
+        rng = rng or np.random.default_rng()
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        blocks = [rows[i:i + block_size] for i in range(0, len(rows), block_size)]
+        for b in rng.permutation(len(blocks)):
+            block = rng.permutation(blocks[b])
+            for start in range(0, len(block), batch_size):
+                yield self.batch(block[start:start + batch_size])
+
+
+BASELINES = ('fixed_qpsk', 'fixed_16qam', 'random', 'ppo')
+
+
+def collect_baselines(names, record_dir, n_episodes=1000, seed=0, n_workers=None, env_kwargs=None):
+    """Roll out the compare_policies.py strategies with step recording; returns the log folders."""
+    from policy_eval import FixedPolicy, RandomPolicy, PPOPolicy, evaluate_policies, record_name
+
+    strategies = {
+        'fixed_qpsk': ('Fixed QPSK', FixedPolicy([0, 1, 0])),
+        'fixed_16qam': ('Fixed 16-QAM', FixedPolicy([1, 1, 0])),
+        'random': ('Random', RandomPolicy(seed=seed)),
+        'ppo': ('PPO Agent', PPOPolicy('ppo_mimo_anti_jamming')),
+    }
+    policies = dict(strategies[n] for n in names)
+    evaluate_policies(policies, n_episodes=n_episodes, seed=seed, n_workers=n_workers,
+                      env_kwargs=env_kwargs, record_dir=record_dir)
+    return [os.path.join(record_dir, record_name(label)) for label in policies]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an offline transition dataset')
+    parser.add_argument('--from-dirs', nargs='+', default=None,
+                        help='existing trajectory logs (skip collection)')
+    parser.add_argument('--policies', nargs='+', choices=BASELINES, default=list(BASELINES))
+    parser.add_argument('--episodes', type=int, default=1000, help='episodes per policy')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic')
+    parser.add_argument('--record-dir', default='results/trajectories/offline')
+    parser.add_argument('--out', default='offline_data')
+    args = parser.parse_args(argv)
+
+    dirs = args.from_dirs or collect_baselines(args.policies, args.record_dir, args.episodes, args.seed,
+                                               args.workers, {'backend': args.backend})
+    dataset = build_offline_dataset(dirs, args.out)
+    size = sum(os.path.getsize(os.path.join(args.out, f'{n}.npy')) for n in DATASET_COLUMNS)
+    print(f"[INFO] Offline dataset: {len(dataset)} transitions from {len(dirs)} logs "
+          f"in {args.out} ({size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# offline_train.py
+# Trains the SB3 PPO actor from an offline dataset (offline_dataset.py) without
+# touching the env: behavior cloning on all logged transitions, or on the
+# best-rewarded logged action per dataset row ('best'), optionally after
+# relabeling rewards. The saved model can be evaluated directly or fine-tuned
+# online with train_and_evaluate_ppo.py --init-model.
+# Usage (from the Project folder):
+#   python offline_train.py --data offline_data --epochs 5 --save-path ppo_offline
+
+import argparse
+import time
+import numpy as np
+from offline_dataset import ReplayDataset, env_reward
+
+
+def make_model(seed=None):
+    """PPO over the env's spaces (as in ppo_env.py), built without loading the dataset/RF model."""
+    import gymnasium as gym
+    from stable_baselines3 import PPO
+
+    class SpacesOnly(gym.Env):
+        observation_space = gym.spaces.Box(low=np.array([-np.inf] * 8 + [0], dtype=np.float32),
+                                           high=np.array([np.inf] * 8 + [1], dtype=np.float32),
+                                           dtype=np.float32)
+        action_space = gym.spaces.MultiDiscrete([3, 3, 3])
+
+    return PPO('MlpPolicy', SpacesOnly(), verbose=0, seed=seed)
+
+
+def pretrain_policy(model, dataset, rows=None, epochs=5, batch_size=1024, lr=1e-3, seed=0, verbose=True):
+    """Maximize the log-likelihood of the logged actions under model.policy."""
+    import torch
+
+    policy = model.policy
+    policy.set_training_mode(True)
+    optimizer = torch.optim.Adam(policy.parameters(), lr=lr)
+    rng = np.random.default_rng(seed)
+    history = []
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        losses, n = 0.0, 0
+        for batch in dataset.iter_batches(batch_size, rng=rng, rows=rows):
+            obs = torch.as_tensor(batch['obs'], device=policy.device)
+            actions = torch.as_tensor(batch['action'].astype(np.int64), device=policy.device)
+            _, log_prob, _ = policy.evaluate_actions(obs, actions)
+            loss = -log_prob.mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses += loss.item() * len(obs)
+            n += len(obs)
+        elapsed = time.perf_counter() - start
+        history.append(losses / n)
+        if verbose:
+            print(f"[INFO] Epoch {epoch + 1}/{epochs}: NLL {losses / n:.4f} "
+                  f"({n / elapsed:.0f} transitions/s)")
+    policy.set_training_mode(False)
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline (behavior cloning) training of the PPO actor')
+    parser.add_argument('--data', default='offline_data')
+    parser.add_argument('--target', choices=['all', 'best'], default='best',
+                        help="clone every logged action, or only the best logged action per dataset row")
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help="with --target best, also keep actions within this reward of the best")
+    parser.add_argument('--relabel', action='store_true',
+                        help='recompute rewards from the logged SINR/BER with offline_dataset.env_reward')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--lr', type=float, default=1e-3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--eval-episodes', type=int, default=200, help='0 to skip the env evaluation')
+    parser.add_argument('--save-path', default='ppo_offline')
+    args = parser.parse_args(argv)
+
+    dataset = ReplayDataset(args.data)
+    if args.relabel:
+        dataset.relabel(env_reward)
+    rows = np.flatnonzero(dataset.best_action_mask(args.tolerance)) if args.target == 'best' else None
+    print(f"[INFO] Training on {len(dataset) if rows is None else len(rows)} of {len(dataset)} transitions")
+
+    model = make_model(args.seed)
+    start = time.perf_counter()
+    pretrain_policy(model, dataset, rows, args.epochs, args.batch_size, args.lr, args.seed)
+    print(f"[INFO] Offline training took {time.perf_counter() - start:.1f} s")
+    model.save(args.save_path)
+    print(f"Model saved as {args.save_path}.zip")
+
+    if args.eval_episodes:
+        from policy_eval import PPOPolicy, rollout_policy
+        res = rollout_policy(PPOPolicy(args.save_path), n_episodes=args.eval_episodes, seed=args.seed)
+        print(f"[INFO] Offline policy over {args.eval_episodes} episodes: "
+              f"reward {res['total_reward'].mean():.2f}, SINR {res['avg_sinr'].mean():.2f} dB, "
+              f"BER {res['avg_ber'].mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# oracle.py
+# Exact solver for the 27-action space under the analytic SINR/BER model of
+# MIMOAIAntiJammingEnv: every action is scored for every dataset row in one
+# broadcasted computation, giving the reward-optimal action table, per-row
+# regret of any action, and a lookup policy over (jammer label, noise-factor bin).
+# Usage (from the Project folder): python oracle.py
+
+import itertools
+import os
+import numpy as np
+from ppo_vec_env import MOD_FACTOR, MOD_ORDER
+
+# All [modulation, power, nulling] actions; row k is action index k = 9*mod + 3*power + nulling
+ACTIONS = np.array(list(itertools.product(range(3), repeat=3)))
+
+NOISE_RANGE = (0.5, 1.5)
+
+
+def action_index(actions):
+    actions = np.asarray(actions)
+    return actions[..., 0] * 9 + actions[..., 1] * 3 + actions[..., 2]
+
+
+def noise_factor(features_scaled):
+    return np.clip(np.sum(features_scaled, axis=-1) / 1000, *NOISE_RANGE)
+
+
+def analytic_rewards(base_sinr, noise):
+    """(sinr, ber, reward) of all 27 actions, each (n, 27), for per-row base SINR and noise factor."""
+    mod, power, nulling = ACTIONS.T
+    sinr = (np.asarray(base_sinr)[:, None] * MOD_FACTOR[mod] * (1 + 0.2*power) * (1 + 0.3*nulling)
+            * np.asarray(noise)[:, None])
+    ber = 0.5 * np.exp(-sinr / (MOD_ORDER[mod] * 2))
+    reward = sinr - power * 0.1 - ber * 10
+    return sinr, ber, reward
+
+
+class Oracle:
+    """
+    Reward of every action for every dataset row (rewards[i, k]) with the
+    optimal action and the regret table best_reward[i] - rewards[i, k].
+    """
+
+    def __init__(self, features_scaled, labels):
+        self.labels = np.asarray(labels)
+        self.noise = noise_factor(features_scaled)
+        self.sinr, self.ber, self.rewards = analytic_rewards(np.where(self.labels == 0, 20, 5), self.noise)
+        self.best_index = self.rewards.argmax(axis=1)
+        self.best_reward = self.rewards.max(axis=1)
+        self.regret_table = self.best_reward[:, None] - self.rewards
+
+    @property
+    def best_actions(self):
+        return ACTIONS[self.best_index]
+
+    def regret(self, idx, actions):
+        """Per-step regret of playing `actions` on dataset rows `idx`."""
+        return self.regret_table[idx, action_index(actions)]
+
+    def policy(self, n_bins=20):
+        """Lookup policy: best total reward over the dataset rows in each (label, noise bin)."""
+        bins = _noise_bin(self.noise, n_bins)
+        totals = np.zeros((2, n_bins, len(ACTIONS)))
+        np.add.at(totals, (self.labels, bins), self.rewards)
+        counts = np.bincount(self.labels * n_bins + bins, minlength=2 * n_bins).reshape(2, n_bins)
+
+        # bins without dataset rows are solved at their centre
+        centers = NOISE_RANGE[0] + (np.arange(n_bins) + 0.5) * (NOISE_RANGE[1] - NOISE_RANGE[0]) / n_bins
+        for label, base in ((0, 20), (1, 5)):
+            empty = counts[label] == 0
+            totals[label, empty] = analytic_rewards(np.full(empty.sum(), base), centers[empty])[2]
+        return OraclePolicy(totals.argmax(axis=2), n_bins)
+
+
+def _noise_bin(noise, n_bins):
+    lo, hi = NOISE_RANGE
+    return np.clip(((noise - lo) / (hi - lo) * n_bins).astype(np.int64), 0, n_bins - 1)
+
+
+class OraclePolicy:
+    """Table lookup from the observation (scaled features + jammer label) to the oracle action."""
+
+    def __init__(self, table, n_bins):
+        self.table = table          # (2, n_bins) action indices
+        self.n_bins = n_bins
+
+    def __call__(self, obs):
+        obs = np.asarray(obs)
+        batch = np.atleast_2d(obs)
+        label = (batch[:, 8] >= 0.5).astype(np.int64)
+        actions = ACTIONS[self.table[label, _noise_bin(noise_factor(batch[:, :8]), self.n_bins)]]
+        return actions if obs.ndim == 2 else actions[0]
+
+
+def build_oracle(data_csv_path='balanced_dataset_20000.csv', rf_scaler_path='rf_scaler.pkl', cache_dir=None):
+    """Oracle over the same (cached) scaled dataset the envs use."""
+    from artifact_cache import default_cache_dir as artifact_cache_dir, load_scaler
+    from dataset_cache import default_cache_dir, load_dataset, scaled_features
+    from rf_incremental import active_rf_paths
+
+    cache_dir = cache_dir or default_cache_dir(data_csv_path)
+    features, labels, _ = load_dataset(data_csv_path, cache_dir)
+    _, active_scaler_path = active_rf_paths(os.path.join(os.path.dirname(rf_scaler_path), 'rf_model.pkl'),
+                                            rf_scaler_path)
+    scaler = load_scaler(active_scaler_path, artifact_cache_dir(rf_scaler_path))
+    return Oracle(scaled_features(features, scaler, cache_dir), labels)
+
+
+def main():
+    import pandas as pd
+
+    oracle = build_oracle()
+    best = oracle.best_actions
+    table = pd.DataFrame({
+        'label': oracle.labels,
+        'noise_factor': oracle.noise,
+        'modulation': best[:, 0],
+        'power': best[:, 1],
+        'nulling': best[:, 2],
+        'best_reward': oracle.best_reward,
+        'best_sinr': oracle.sinr[np.arange(len(best)), oracle.best_index],
+    })
+    os.makedirs('results', exist_ok=True)
+    table.to_csv('results/oracle_actions.csv', index=False)
+    print("[INFO] Optimal action table saved to results/oracle_actions.csv")
+
+    print("\nOptimal actions (rows per [modulation, power, nulling]):")
+    print(table.groupby(['label', 'modulation', 'power', 'nulling']).size().to_string())
+    print(f"\nOptimal reward per step: {oracle.best_reward.mean():.3f}")
+    for name, action in (('Fixed QPSK', [0, 1, 0]), ('Fixed 16-QAM', [1, 1, 0])):
+        print(f"Regret per step of {name}: {oracle.regret(slice(None), action).mean():.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,51 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+# plot_ppo_reward_curve.py
+# Plot per-episode PPO evaluation metrics (from evaluate_trained_ppo.py)
+# (training curves from the tensorboard / evaluations.npz logs of all runs: log_aggregator.py)
+
+import argparse
 import os
 
-# Load your PPO evaluation log
-df = pd.read_csv("results/ppo_evaluation_log.csv")
+TRAJECTORY_DIR = "results/trajectories/ppo_evaluation"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plot PPO evaluation metrics over episodes')
+    parser.add_argument('--no-show', action='store_true')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    # Load your PPO evaluation log (per-episode means from the step log when it exists)
+    if os.path.exists(os.path.join(TRAJECTORY_DIR, "manifest.json")):
+        from trajectory_recorder import TrajectoryReader
+        df = TrajectoryReader(TRAJECTORY_DIR).episode_summary()
+    else:
+        df = pd.read_csv("results/ppo_evaluation_log.csv")
+
+    # Create the plot
+    plt.figure(figsize=(12, 6))
 
-# Create the plot
-plt.figure(figsize=(12, 6))
+    # Plot each metric
+    plt.plot(df["episode"], df["avg_sinr"], label="Avg SINR (dB)", color="blue", marker='o')
+    plt.plot(df["episode"], df["avg_ber"], label="Avg BER", color="red", marker='s')
+    plt.plot(df["episode"], df["total_reward"], label="Total Reward", color="green", marker='x')
 
-# Plot each metric
-plt.plot(df["episode"], df["avg_sinr"], label="Avg SINR (dB)", color="blue", marker='o')
-plt.plot(df["episode"], df["avg_ber"], label="Avg BER", color="red", marker='s')
-plt.plot(df["episode"], df["total_reward"], label="Total Reward", color="green", marker='x')
+    # Customize plot
+    plt.title("PPO Evaluation Metrics Over Episodes")
+    plt.xlabel("Episode")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
 
-# Customize plot
-plt.title("PPO Evaluation Metrics Over Episodes")
-plt.xlabel("Episode")
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
+    # Save plot
+    os.makedirs("results", exist_ok=True)
+    output_path = "results/ppo_training_reward_curve.png"
+    plt.savefig(output_path, dpi=300)
+    print(f"[INFO] Plot saved to {output_path}")
 
-# Save plot
-os.makedirs("results", exist_ok=True)
-output_path = "results/ppo_training_reward_curve.png"
-plt.savefig(output_path, dpi=300)
-print(f"[INFO] Plot saved to {output_path}")
+    # Display plot
+    if not args.no_show:
+        plt.show()
 
-# Display plot
-plt.show()
+if __name__ == "__main__":
+    main()
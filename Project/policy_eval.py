@@ -0,0 +1,162 @@
+# policy_eval.py
+# Batched policy evaluation: every episode of a policy is rolled out at once in
+# MIMOAIAntiJammingBatch (ppo_vec_env.py), and policies are fanned out over a process pool.
+
+import multiprocessing as mp
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from ppo_vec_env import MIMOAIAntiJammingBatch
+
+ENV_PATHS = {
+    'data_csv_path': 'balanced_dataset_20000.csv',
+    'rf_model_path': 'rf_model.pkl',
+    'rf_scaler_path': 'rf_scaler.pkl',
+}
+
+
+class FixedPolicy:
+    """Always plays the same [modulation, power, nulling] action."""
+
+    def __init__(self, action):
+        self.action = np.asarray(action)
+
+    def __call__(self, obs):
+        return np.tile(self.action, (len(obs), 1))
+
+
+class RandomPolicy:
+    """Uniformly random actions from a seeded generator."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, obs):
+        return self.rng.integers(0, 3, size=(len(obs), 3))
+
+
+class PPOPolicy:
+    """Deterministic SB3 PPO policy; the model is loaded on first call (picklable by path)."""
+
+    def __init__(self, model_path='ppo_mimo_anti_jamming'):
+        self.model_path = model_path
+        self.model = None
+
+    def __getstate__(self):
+        return {'model_path': self.model_path, 'model': None}
+
+    def __call__(self, obs):
+        if self.model is None:
+            from stable_baselines3 import PPO
+            self.model = PPO.load(self.model_path)
+        return self.model.predict(obs, deterministic=True)[0]
+
+
+def rollout_policy(policy, n_episodes=100, seed=0, max_steps=100, env_kwargs=None, record_path=None):
+    """
+    Roll out n_episodes episodes of `policy` in lockstep. `policy` maps an
+    (n_episodes, 9) observation batch to (n_episodes, 3) actions. The env is
+    seeded with `seed`, so every policy evaluated with the same seed sees the
+    same dataset rows (common random numbers).
+    With record_path, every step is also logged there (see trajectory_recorder.py).
+    Returns per-episode arrays: avg_sinr, avg_ber, total_reward.
+    """
+    env = MIMOAIAntiJammingBatch(n_episodes, max_steps=max_steps, **{**ENV_PATHS, **(env_kwargs or {})})
+    env.seed(seed)
+    obs = env.reset()
+    writer = None
+    if record_path is not None:
+        from trajectory_recorder import TrajectoryWriter
+        writer = TrajectoryWriter(record_path, metadata={'seed': seed, 'env_kwargs': env_kwargs or {}})
+    episode_ids = np.arange(n_episodes)
+
+    sum_sinr = np.zeros(n_episodes)
+    sum_ber = np.zeros(n_episodes)
+    total_reward = np.zeros(n_episodes)
+    for step in range(max_steps):
+        idx = env.current_idx.copy()
+        actions = policy(obs)
+        next_obs, _, dones, _ = env.step(actions)
+        sum_sinr += env.step_sinr
+        sum_ber += env.step_ber
+        total_reward += env.step_reward
+        if writer is not None:
+            writer.append_batch(episode=episode_ids, step=step, idx=idx, obs=obs, action=actions,
+                                reward=env.step_reward, sinr=env.step_sinr, ber=env.step_ber, done=dones)
+        obs = next_obs
+    env.close()
+    if writer is not None:
+        writer.close()
+
+    return {
+        'avg_sinr': sum_sinr / max_steps,
+        'avg_ber': sum_ber / max_steps,
+        'total_reward': total_reward,
+    }
+
+
+def confidence_interval(values, level=0.95):
+    """Half-width of the Student-t confidence interval of the mean."""
+    from scipy import stats
+
+    values = np.asarray(values)
+    if len(values) < 2:
+        return np.nan
+    return stats.t.ppf(0.5 + level/2, len(values) - 1) * values.std(ddof=1) / np.sqrt(len(values))
+
+
+def _picklable(obj):
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+def record_name(policy_name):
+    """Folder name of a policy's trajectory log, e.g. 'Fixed 16-QAM' -> 'fixed_16-qam'."""
+    return policy_name.lower().replace(' ', '_')
+
+
+def evaluate_policies(policies, n_episodes=100, seed=0, max_steps=100, n_workers=None,
+                      env_kwargs=None, level=0.95, record_dir=None):
+    """
+    Evaluate a {name: policy} dict with common random numbers.
+    Picklable policies run in parallel worker processes (n_workers=1 keeps
+    everything in this process). With record_dir, each policy's steps are logged
+    to record_dir/<record_name(name)>. Returns (summary DataFrame, {name: per-episode arrays}).
+    """
+    args = (n_episodes, seed, max_steps, env_kwargs)
+    names = list(policies)
+    paths = {n: None if record_dir is None else os.path.join(record_dir, record_name(n)) for n in names}
+    parallel = [n for n in names if _picklable(policies[n])] if n_workers != 1 else []
+
+    episodes = {}
+    if parallel:
+        ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+            futures = {n: pool.submit(rollout_policy, policies[n], *args, paths[n]) for n in parallel}
+            for name in names:
+                if name not in futures:
+                    episodes[name] = rollout_policy(policies[name], *args, paths[name])
+            episodes.update({n: f.result() for n, f in futures.items()})
+    else:
+        for name in names:
+            print(f"[INFO] Evaluating: {name}")
+            episodes[name] = rollout_policy(policies[name], *args, paths[name])
+
+    rows = []
+    for name in names:
+        ep = episodes[name]
+        rows.append({
+            'Policy': name,
+            'Avg SINR': ep['avg_sinr'].mean(),
+            'Avg BER': ep['avg_ber'].mean(),
+            'Avg Reward': ep['total_reward'].mean(),
+            'SINR CI': confidence_interval(ep['avg_sinr'], level),
+            'BER CI': confidence_interval(ep['avg_ber'], level),
+            'Reward CI': confidence_interval(ep['total_reward'], level),
+        })
+    return pd.DataFrame(rows), {name: episodes[name] for name in names}
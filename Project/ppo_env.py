@@ -1,10 +1,83 @@
+import copy
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 import joblib
-import pandas as pd
+from artifact_cache import default_cache_dir as artifact_cache_dir, load_scaler
+from dataset_cache import default_cache_dir, load_dataset, scaled_features
+from mimo_link_sim import MIMOLinkSimulator
+from channel_stream import JAMMER_TYPES
+from link_table import load_link_table
+from rf_compiled import load_compiled_rf
+from rf_incremental import active_rf_paths
+
+class EnvData:
+    """
+    Setup shared by MIMOAIAntiJammingEnv and MIMOAIAntiJammingBatch
+    (ppo_vec_env.py): dataset and scaled features, link backend, jammer
+    waveform check and detector observation, plus the lazily unpickled RF
+    classifier.
+    """
 
-class MIMOAIAntiJammingEnv(gym.Env):
+    def _load_env_data(self, data_csv_path, rf_model_path, rf_scaler_path, cache_dir, backend, link_seed,
+                       link_table_dir, detector, jammer_type):
+        # Map the dataset read-only from its .npy conversion (see dataset_cache.py)
+        cache_dir = cache_dir or default_cache_dir(data_csv_path)
+        self.features, self.labels, self.feature_names = load_dataset(data_csv_path, cache_dir)
+        self.n_samples = len(self.labels)
+
+        # RF model and scaler of the active rf_versions/ version, if any (see
+        # rf_incremental.py); scaler statistics come from artifact_cache/ (no
+        # sklearn import) and the classifier is only unpickled when first used
+        scaler_cache_dir = artifact_cache_dir(rf_scaler_path)
+        rf_model_path, rf_scaler_path = active_rf_paths(rf_model_path, rf_scaler_path)
+        self.rf_model_path = rf_model_path
+        self._rf_model = None
+        self.rf_scaler = load_scaler(rf_scaler_path, scaler_cache_dir)
+
+        # Scale all rows once; reset/step only index into this matrix
+        self.features_scaled = scaled_features(self.features, self.rf_scaler, cache_dir)
+
+        # SINR/BER backend
+        if backend == 'analytic':
+            self.link_sim = None
+        elif backend == 'montecarlo':
+            self.link_sim = MIMOLinkSimulator(seed=link_seed)
+        elif backend == 'table':
+            self.link_sim = load_link_table(link_table_dir, seed=link_seed)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.backend = backend
+        self.last_ber = None
+
+        # Waveform of active jammers; 'mixed' draws one of the four per episode (set by the env)
+        if jammer_type != 'mixed' and jammer_type not in JAMMER_TYPES[1:]:
+            raise ValueError(f"Unsupported jammer type: {jammer_type}")
+        if jammer_type != 'broadband' and backend != 'montecarlo':
+            raise ValueError("jammer_type other than 'broadband' needs backend='montecarlo'")
+        self.jammer_type = jammer_type
+
+        # Jammer entry of the observation: true label, or the RF detector's
+        # predicted label / P(active) for every row (compiled forest, see rf_compiled.py)
+        if detector is None:
+            self.obs_labels = self.labels
+        elif detector in ('label', 'proba'):
+            self.rf_compiled = load_compiled_rf(rf_model_path)
+            proba = self.rf_compiled.predict_proba(self.features_scaled)
+            self.obs_labels = (self.rf_compiled.classes_.take(proba.argmax(axis=1)) if detector == 'label'
+                               else proba[:, 1]).astype(np.float32)
+        else:
+            raise ValueError(f"Unknown detector: {detector}")
+        self.detector = detector
+
+    @property
+    def rf_model(self):
+        if self._rf_model is None:
+            self._rf_model = joblib.load(self.rf_model_path)
+        return self._rf_model
+
+
+class MIMOAIAntiJammingEnv(EnvData, gym.Env):
     """
     Gymnasium-compatible environment for MIMO anti-jamming adaptive control.
     Observation:
@@ -17,19 +90,28 @@ class MIMOAIAntiJammingEnv(gym.Env):
     Reward:
       - Positive reward proportional to simulated SINR
       - Penalty for power use and BER (simulated)
+    The dataset is memory-mapped from its .npy conversion in cache_dir
+    (default: dataset_cache/ next to the CSV) and scaled once, with the
+    scaled matrix cached there too, so reset/step only look up a row of
+    features_scaled.
+    backend='montecarlo' replaces the analytic SINR/BER formulas with the
+    NumPy port of main_simulation.m (see mimo_link_sim.py); backend='table'
+    samples precomputed statistics of that simulator (see link_table.py).
+    detector='label'/'proba' puts the RF classifier's predicted jammer label or
+    P(active) in the observation; rewards still use the true label.
+    jammer_type ('broadband', 'tone', 'partial', 'reactive' or 'mixed', one of
+    the four drawn per episode) sets the waveform of active jammers in the
+    Monte-Carlo backend (see channel_stream.py).
     """
 
-    def __init__(self, data_csv_path, rf_model_path, rf_scaler_path):
+    def __init__(self, data_csv_path, rf_model_path, rf_scaler_path, cache_dir=None,
+                 backend='analytic', link_seed=None, link_table_dir='link_tables', detector=None,
+                 jammer_type='broadband'):
         super().__init__()
 
-        # Load dataset
-        self.df = pd.read_csv(data_csv_path)
-        self.features = self.df.drop(columns=['label']).values.astype(np.float32)
-        self.labels = self.df['label'].values.astype(int)
-
-        # Load RF classifier & scaler
-        self.rf_model = joblib.load(rf_model_path)
-        self.rf_scaler = joblib.load(rf_scaler_path)
+        self._load_env_data(data_csv_path, rf_model_path, rf_scaler_path, cache_dir, backend, link_seed,
+                            link_table_dir, detector, jammer_type)
+        self.episode_jammer_type = JAMMER_TYPES[1] if jammer_type == 'mixed' else jammer_type
 
         # Action space: Modulation(3) x Power(3) x Nulling(3)
         self.action_space = spaces.MultiDiscrete([3, 3, 3])
@@ -46,13 +128,15 @@ class MIMOAIAntiJammingEnv(gym.Env):
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
         self.current_step = 0
-        self.current_idx = np.random.randint(0, len(self.df))
+        if seed is not None and self.link_sim is not None:
+            self.link_sim.seed(seed)
+        self.current_idx = int(self.np_random.integers(0, self.n_samples))
+        if self.jammer_type == 'mixed':
+            self.episode_jammer_type = JAMMER_TYPES[1 + int(self.np_random.integers(0, 4))]
 
-        feat_raw = self.features[self.current_idx].reshape(1, -1)
-        feat_scaled = self.rf_scaler.transform(feat_raw).flatten()
-        jammer_label = self.labels[self.current_idx]
+        feat_scaled = self._scaled_row(self.current_idx)
 
-        obs = np.append(feat_scaled, jammer_label).astype(np.float32)
+        obs = np.append(feat_scaled, self.obs_labels[self.current_idx]).astype(np.float32)
         info = {}
         return obs, info
 
@@ -61,8 +145,7 @@ class MIMOAIAntiJammingEnv(gym.Env):
 
         modulation, power_level, nulling = action
 
-        feat_raw = self.features[self.current_idx].reshape(1, -1)
-        feat_scaled = self.rf_scaler.transform(feat_raw).flatten()
+        feat_scaled = self._scaled_row(self.current_idx)
         jammer_label = self.labels[self.current_idx]
 
         sinr = self.simulate_sinr(modulation, power_level, nulling, feat_scaled, jammer_label)
@@ -73,7 +156,7 @@ class MIMOAIAntiJammingEnv(gym.Env):
 
         reward = sinr - power_penalty - ber_penalty
 
-        obs = np.append(feat_scaled, jammer_label).astype(np.float32)
+        obs = np.append(feat_scaled, self.obs_labels[self.current_idx]).astype(np.float32)
 
         terminated = self.current_step >= self.max_steps
         truncated = False
@@ -82,7 +165,32 @@ class MIMOAIAntiJammingEnv(gym.Env):
 
         return obs, reward, terminated, truncated, info
 
+    def clone(self):
+        """
+        New env that shares this env's dataset arrays, scaler and RF model instead
+        of reloading them. Clones made in a parent process are shared
+        copy-on-write by forked workers.
+        """
+        env = copy.copy(self)
+        env.link_sim = copy.deepcopy(self.link_sim)
+        env._np_random = None
+        env._np_random_seed = None
+        env.current_step = 0
+        env.current_idx = None
+        return env
+
+    def _scaled_row(self, idx):
+        return self.features_scaled[idx]
+
     def simulate_sinr(self, modulation, power_level, nulling, features, jammer_label):
+        if self.link_sim is not None:
+            # Link simulation (or its lookup table); the BER comes from the same run
+            noise_factor = np.clip(np.sum(features)/1000, 0.5, 1.5)
+            sinr, ber = self.link_sim.simulate(modulation, power_level, nulling, jammer_label,
+                                               noise_factor=noise_factor, jammer_type=self.episode_jammer_type)
+            self.last_ber = float(ber[0, 0])
+            return float(sinr[0, 0])
+
         base_sinr = 20 if jammer_label == 0 else 5
         mod_factor = {0:1.0, 1:0.8, 2:0.5}[modulation]
         power_factor = 1 + 0.2*power_level
@@ -93,6 +201,9 @@ class MIMOAIAntiJammingEnv(gym.Env):
         return sinr
 
     def simulate_ber(self, sinr, modulation):
+        if self.link_sim is not None:
+            return self.last_ber
+
         mod_order = {0:2, 1:4, 2:6}[modulation]
         ber = 0.5 * np.exp(-sinr / (mod_order * 2))
         return ber
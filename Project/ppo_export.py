@@ -0,0 +1,127 @@
+# ppo_export.py
+# Export the deterministic PPO actor to a NumPy-only inference object.
+# Usage (from the Project folder):
+#   python ppo_export.py --model ppo_mimo_anti_jamming --out ppo_actor.npz
+
+import argparse
+import time
+import numpy as np
+
+ACTIVATIONS = {
+    'Tanh': np.tanh,
+    'ReLU': lambda x: np.maximum(x, 0),
+    'Identity': lambda x: x,
+}
+
+
+class NumpyPolicy:
+    """
+    Deterministic MultiDiscrete actor as plain NumPy matmuls: the MLP policy
+    network, the action head, then an argmax per action dimension.
+    act() takes a single (9,) observation or an (N, 9) batch.
+    """
+
+    def __init__(self, weights, biases, activations, nvec):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.nvec = np.asarray(nvec)
+        self._splits = np.cumsum(self.nvec)[:-1]
+        self._uniform = bool(np.all(self.nvec == self.nvec[0]))
+
+    def logits(self, obs):
+        x = np.asarray(obs, dtype=np.float32)
+        for w, b, act in zip(self.weights, self.biases, self.activations):
+            x = ACTIVATIONS[act](x @ w + b)
+        return x
+
+    def act(self, obs):
+        logits = self.logits(obs)
+        if self._uniform:
+            # e.g. MultiDiscrete([3, 3, 3]): one reshape + argmax instead of a split per dimension
+            return logits.reshape(logits.shape[:-1] + (len(self.nvec), -1)).argmax(axis=-1)
+        return np.stack([part.argmax(axis=-1) for part in np.split(logits, self._splits, axis=-1)], axis=-1)
+
+    __call__ = act
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Drop-in for the SB3 predict(obs, deterministic=True) calls in the scripts."""
+        return self.act(obs), state
+
+    def save(self, path):
+        arrays = {f'w{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, activations=np.array(self.activations), nvec=self.nvec, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n = len(data['activations'])
+            return cls([data[f'w{i}'] for i in range(n)], [data[f'b{i}'] for i in range(n)],
+                       [str(a) for a in data['activations']], data['nvec'])
+
+
+def export_ppo(model):
+    """Build a NumpyPolicy from a loaded SB3 PPO model with a MultiDiscrete action space."""
+    import torch.nn as nn
+
+    policy = model.policy
+    weights, biases, activations = [], [], []
+    for module in policy.mlp_extractor.policy_net:
+        if isinstance(module, nn.Linear):
+            weights.append(module.weight.detach().cpu().numpy().T)
+            biases.append(module.bias.detach().cpu().numpy())
+            activations.append('Identity')
+        elif type(module).__name__ in ACTIVATIONS:
+            activations[-1] = type(module).__name__
+        else:
+            raise ValueError(f"Unsupported layer in policy_net: {module}")
+    weights.append(policy.action_net.weight.detach().cpu().numpy().T)
+    biases.append(policy.action_net.bias.detach().cpu().numpy())
+    activations.append('Identity')
+    return NumpyPolicy(weights, biases, activations, model.action_space.nvec)
+
+
+def check_parity(model, actor, obs):
+    """Fraction of observations where the exported actor picks the same action as SB3."""
+    expected = model.predict(obs, deterministic=True)[0]
+    return np.mean(np.all(actor.act(obs) == expected, axis=1))
+
+
+def single_latency_us(fn, obs, repeats=2000):
+    start = time.perf_counter()
+    for i in range(repeats):
+        fn(obs[i % len(obs)])
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the PPO actor to NumPy')
+    parser.add_argument('--model', default='ppo_mimo_anti_jamming')
+    parser.add_argument('--out', default='ppo_actor.npz')
+    args = parser.parse_args(argv)
+
+    from stable_baselines3 import PPO
+    from ppo_env import MIMOAIAntiJammingEnv
+
+    model = PPO.load(args.model)
+    actor = export_ppo(model)
+    actor.save(args.out)
+    print(f"[INFO] Actor exported to {args.out}")
+
+    # Parity on every dataset row (with its true label) plus random observations
+    env = MIMOAIAntiJammingEnv('balanced_dataset_20000.csv', 'rf_model.pkl', 'rf_scaler.pkl')
+    obs = np.hstack([env.features_scaled, env.labels[:, None]]).astype(np.float32)
+    rand_obs = np.random.default_rng(0).normal(size=(20000, 9)).astype(np.float32)
+    rand_obs[:, 8] = rand_obs[:, 8] > 0
+    actor = NumpyPolicy.load(args.out)
+    print(f"[INFO] Action parity: dataset {check_parity(model, actor, obs):.4%}, "
+          f"random {check_parity(model, actor, rand_obs):.4%}")
+
+    sb3_us = single_latency_us(lambda o: model.predict(o, deterministic=True), obs, repeats=500)
+    np_us = single_latency_us(actor.act, obs)
+    print(f"[INFO] Single-decision latency: SB3 {sb3_us:.1f} us, NumPy {np_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
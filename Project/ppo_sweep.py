@@ -0,0 +1,258 @@
+# ppo_sweep.py
+# Parallel PPO hyperparameter sweep: seeded random configs (learning rate,
+# n_steps, batch size) are trained in a fork process pool on the batched env,
+# evaluated every eval_freq steps into per-trial evaluations.npz files, pruned
+# against the median of the other trials, and ranked in leaderboard.csv.
+# Usage (from the Project folder):
+#   python ppo_sweep.py --trials 16 --workers 8 --total-timesteps 50000
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+SEARCH_SPACE = {
+    'learning_rate': ('log', 1e-5, 1e-3),
+    'n_steps': ('choice', [256, 512, 1024, 2048]),
+    'batch_size': ('choice', [32, 64, 128, 256]),
+}
+
+
+def sample_configs(n_trials, seed=0, space=SEARCH_SPACE):
+    """n_trials random configs; trial i is reproducible from (seed, i) alone."""
+    configs = []
+    for trial in range(n_trials):
+        rng = np.random.default_rng([seed, trial])
+        config = {'trial': trial, 'seed': int(rng.integers(0, 2**31 - 1))}
+        for name, (kind, *spec) in space.items():
+            if kind == 'log':
+                config[name] = float(math.exp(rng.uniform(math.log(spec[0]), math.log(spec[1]))))
+            else:
+                config[name] = spec[0][int(rng.integers(0, len(spec[0])))]
+        configs.append(config)
+    return configs
+
+
+def trial_dir(sweep_dir, trial):
+    return os.path.join(sweep_dir, f'trial_{trial:04d}')
+
+
+def _atomic_savez(path, **arrays):
+    tmp_path = path + f'.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _atomic_json(path, obj):
+    tmp_path = path + f'.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class MedianPruner:
+    """
+    Prunes a trial whose mean evaluation reward is below the median of the
+    other trials at the same timestep, read from their evaluations.npz files.
+    Nothing is pruned before n_warmup_evals evaluations and n_warmup_updates
+    PPO updates of the trial (so large-n_steps configs are not judged on their
+    initial weights), or while fewer than n_startup_trials other trials have
+    reached that timestep.
+    """
+
+    def __init__(self, sweep_dir, n_startup_trials=4, n_warmup_evals=3, n_warmup_updates=2):
+        self.sweep_dir = sweep_dir
+        self.n_startup_trials = n_startup_trials
+        self.n_warmup_evals = n_warmup_evals
+        self.n_warmup_updates = n_warmup_updates
+
+    def _others_at(self, trial, timestep):
+        values = []
+        for name in os.listdir(self.sweep_dir):
+            path = os.path.join(self.sweep_dir, name, 'evaluations.npz')
+            if name == f'trial_{trial:04d}' or not os.path.exists(path):
+                continue
+            with np.load(path) as data:
+                timesteps, results = data['timesteps'], data['results']
+            i = np.searchsorted(timesteps, timestep, side='right') - 1
+            if i >= 0 and timesteps[-1] >= timestep:
+                values.append(results[i].mean())
+        return values
+
+    def should_prune(self, trial, n_evals, n_updates, timestep, value):
+        if n_evals < self.n_warmup_evals or n_updates < self.n_warmup_updates:
+            return False
+        others = self._others_at(trial, timestep)
+        return len(others) >= self.n_startup_trials and value < np.median(others)
+
+
+class SweepEvalCallback(BaseCallback):
+    """
+    Every eval_freq timesteps: batched deterministic evaluation on a fixed seed
+    (the same episodes for every trial), appended to evaluations.npz in the
+    EvalCallback layout (timesteps, results, ep_lengths, plus per-episode sinr
+    and ber); stops training when the pruner says so.
+    """
+
+    def __init__(self, path, trial, eval_freq, n_eval_episodes=50, eval_seed=0, env_kwargs=None, pruner=None):
+        super().__init__()
+        self.path = path
+        self.trial = trial
+        self.eval_freq = eval_freq
+        self.n_eval_episodes = n_eval_episodes
+        self.eval_seed = eval_seed
+        self.env_kwargs = env_kwargs
+        self.pruner = pruner
+        self.next_eval = eval_freq
+        self.timesteps, self.results, self.sinr, self.ber = [], [], [], []
+        self.pruned = False
+
+    def evaluate(self):
+        from policy_eval import rollout_policy
+
+        res = rollout_policy(lambda obs: self.model.predict(obs, deterministic=True)[0],
+                             n_episodes=self.n_eval_episodes, seed=self.eval_seed, env_kwargs=self.env_kwargs)
+        self.timesteps.append(self.num_timesteps)
+        self.results.append(res['total_reward'])
+        self.sinr.append(res['avg_sinr'])
+        self.ber.append(res['avg_ber'])
+        _atomic_savez(self.path, timesteps=np.array(self.timesteps), results=np.array(self.results),
+                      ep_lengths=np.full((len(self.results), self.n_eval_episodes), 100),
+                      sinr=np.array(self.sinr), ber=np.array(self.ber))
+        return res['total_reward'].mean()
+
+    def n_updates(self):
+        """PPO updates done so far (the update of a rollout runs after its last step)."""
+        return max(self.num_timesteps - 1, 0) // (self.model.n_steps * self.model.n_envs)
+
+    def _on_step(self):
+        if self.num_timesteps < self.next_eval:
+            return True
+        self.next_eval += self.eval_freq
+        value = self.evaluate()
+        if self.pruner is not None and self.pruner.should_prune(self.trial, len(self.results), self.n_updates(),
+                                                                self.num_timesteps, value):
+            self.pruned = True
+            return False
+        return True
+
+
+def run_trial(config, sweep_dir, total_timesteps=50000, n_envs=8, eval_freq=5000, n_eval_episodes=50,
+              backend='analytic', pruner_kwargs=None):
+    """Train one config on MIMOAIAntiJammingVecEnv; writes result.json (and model.zip if not pruned)."""
+    import torch
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import VecMonitor
+    from policy_eval import ENV_PATHS
+    from ppo_vec_env import MIMOAIAntiJammingVecEnv
+
+    torch.set_num_threads(1)    # one trial per core
+    path = trial_dir(sweep_dir, config['trial'])
+    os.makedirs(path, exist_ok=True)
+    start = time.perf_counter()
+
+    env = VecMonitor(MIMOAIAntiJammingVecEnv(n_envs, backend=backend, **ENV_PATHS))
+    model = PPO('MlpPolicy', env, verbose=0, seed=config['seed'], learning_rate=config['learning_rate'],
+                n_steps=config['n_steps'], batch_size=config['batch_size'])
+    pruner = None if pruner_kwargs is None else MedianPruner(sweep_dir, **pruner_kwargs)
+    callback = SweepEvalCallback(os.path.join(path, 'evaluations.npz'), config['trial'], eval_freq,
+                                 n_eval_episodes, env_kwargs={'backend': backend}, pruner=pruner)
+    model.learn(total_timesteps=total_timesteps, callback=callback)
+    if not callback.results:
+        callback.evaluate()
+    env.close()
+
+    means = [r.mean() for r in callback.results]
+    result = {
+        **config,
+        'status': 'pruned' if callback.pruned else 'complete',
+        'timesteps': int(model.num_timesteps),
+        'final_reward': float(means[-1]),
+        'best_reward': float(max(means)),
+        'wall_s': time.perf_counter() - start,
+    }
+    if not callback.pruned:
+        model.save(os.path.join(path, 'model'))
+    _atomic_json(os.path.join(path, 'result.json'), result)
+    return result
+
+
+def write_leaderboard(sweep_dir):
+    """leaderboard.csv from every trial's result.json: completed trials first, by final reward."""
+    import pandas as pd
+
+    rows = []
+    for name in sorted(os.listdir(sweep_dir)):
+        path = os.path.join(sweep_dir, name, 'result.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                rows.append(json.load(f))
+    df = pd.DataFrame(rows)
+    if len(df):
+        df = df.sort_values(['status', 'final_reward'], ascending=[True, False], ignore_index=True)
+    df.to_csv(os.path.join(sweep_dir, 'leaderboard.csv'), index=False)
+    return df
+
+
+def run_sweep(sweep_dir, n_trials=16, seed=0, n_workers=None, prune=True, **trial_kwargs):
+    """
+    Run (or resume: trials with a result.json are skipped) a sweep in a fork
+    process pool. The dataset and its scaled matrix are converted/cached here
+    first, so every worker memory-maps the same files.
+    """
+    from policy_eval import ENV_PATHS
+    from ppo_vec_env import MIMOAIAntiJammingBatch
+
+    os.makedirs(sweep_dir, exist_ok=True)
+    MIMOAIAntiJammingBatch(1, **ENV_PATHS)     # warm dataset_cache/ before forking
+    configs = [c for c in sample_configs(n_trials, seed)
+               if not os.path.exists(os.path.join(trial_dir(sweep_dir, c['trial']), 'result.json'))]
+    _atomic_json(os.path.join(sweep_dir, 'sweep.json'),
+                 {'n_trials': n_trials, 'seed': seed, 'space': SEARCH_SPACE, **trial_kwargs})
+    pruner_kwargs = {} if prune else None
+
+    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count(), mp_context=ctx) as pool:
+        futures = [pool.submit(run_trial, c, sweep_dir, pruner_kwargs=pruner_kwargs, **trial_kwargs)
+                   for c in configs]
+        for future in as_completed(futures):
+            r = future.result()
+            print(f"[INFO] Trial {r['trial']} {r['status']} at {r['timesteps']} steps: "
+                  f"reward {r['final_reward']:.1f} (lr={r['learning_rate']:.2e}, n_steps={r['n_steps']}, "
+                  f"batch_size={r['batch_size']}, {r['wall_s']:.0f} s)")
+            write_leaderboard(sweep_dir)
+    return write_leaderboard(sweep_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parallel PPO hyperparameter sweep with median pruning')
+    parser.add_argument('--trials', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=None, help='trials run at once (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='sweep seed (configs and their training seeds)')
+    parser.add_argument('--total-timesteps', type=int, default=50000)
+    parser.add_argument('--n-envs', type=int, default=8, help='batched envs per trial')
+    parser.add_argument('--eval-freq', type=int, default=5000)
+    parser.add_argument('--eval-episodes', type=int, default=50)
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic')
+    parser.add_argument('--no-prune', action='store_true')
+    parser.add_argument('--out', default='sweeps/ppo_sweep')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = run_sweep(args.out, args.trials, args.seed, args.workers, prune=not args.no_prune,
+                   total_timesteps=args.total_timesteps, n_envs=args.n_envs, eval_freq=args.eval_freq,
+                   n_eval_episodes=args.eval_episodes, backend=args.backend)
+    print(f"\n[INFO] Sweep finished in {time.perf_counter() - start:.0f} s; "
+          f"leaderboard saved to {os.path.join(args.out, 'leaderboard.csv')}\n")
+    print(df[['trial', 'status', 'learning_rate', 'n_steps', 'batch_size', 'timesteps', 'final_reward']]
+          .head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
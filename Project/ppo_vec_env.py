@@ -0,0 +1,222 @@
+# ppo_vec_env.py
+# Native batched version of MIMOAIAntiJammingEnv for Stable-Baselines3
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from channel_stream import JAMMER_TYPES
+from ppo_env import EnvData
+
+# Attributes holding one entry per env (get_attr/set_attr index into them)
+PER_ENV_ATTRS = ('current_step', 'current_idx', 'episode_jammer_type', 'actions',
+                 'step_sinr', 'step_ber', 'step_reward', 'last_ber')
+
+# Lookup tables matching the dicts used by MIMOAIAntiJammingEnv
+MOD_FACTOR = np.array([1.0, 0.8, 0.5])
+MOD_ORDER = np.array([2, 4, 6])
+
+
+class MIMOAIAntiJammingBatch(EnvData):
+    """
+    Runs N MIMOAIAntiJammingEnv episodes as NumPy arrays with the SB3 VecEnv
+    API (seed/reset/step); MIMOAIAntiJammingVecEnv adds the VecEnv base class.
+    Kept free of stable_baselines3 so batched rollouts do not import torch.
+    SINR, BER, reward and termination are computed for all N episodes in one
+    vectorized call. Env i seeded with `seed + i` draws the same dataset rows
+    and returns the same rewards as a scalar env reset with that seed
+    (rewards are stored as float32, like DummyVecEnv).
+    backend='montecarlo' runs one main_simulation.m channel realization per
+    episode and step through a single batched MIMOLinkSimulator call;
+    backend='table' samples the precomputed statistics in link_table.py.
+    detector and jammer_type work as in MIMOAIAntiJammingEnv.
+    get_attr/set_attr index the per-env arrays in PER_ENV_ATTRS; any other
+    attribute is shared by the batch, so it can only be set for all envs.
+    env_method runs a batch method once and only for all envs.
+    """
+
+    def __init__(self, num_envs, data_csv_path, rf_model_path, rf_scaler_path, max_steps=100, cache_dir=None,
+                 backend='analytic', link_seed=None, link_table_dir='link_tables', detector=None,
+                 jammer_type='broadband'):
+        self._load_env_data(data_csv_path, rf_model_path, rf_scaler_path, cache_dir, backend, link_seed,
+                            link_table_dir, detector, jammer_type)
+        self.episode_jammer_type = np.full(num_envs, JAMMER_TYPES[1] if jammer_type == 'mixed' else jammer_type,
+                                           dtype=object)
+
+        action_space = spaces.MultiDiscrete([3, 3, 3])
+        obs_low = np.array([-np.inf]*8 + [0], dtype=np.float32)
+        obs_high = np.array([np.inf]*8 + [1], dtype=np.float32)
+        observation_space = spaces.Box(low=obs_low, high=obs_high, dtype=np.float32)
+
+        self.max_steps = max_steps
+        self.current_step = np.zeros(num_envs, dtype=np.int64)
+        self.current_idx = np.zeros(num_envs, dtype=np.int64)
+        self._np_randoms = [None] * num_envs
+        self.actions = None
+        self.step_sinr = self.step_ber = self.step_reward = None
+
+        # Same attributes as VecEnv.__init__
+        self.num_envs = num_envs
+        self.observation_space = observation_space
+        self.action_space = action_space
+        self.reset_infos = [{} for _ in range(num_envs)]
+        self._seeds = [None] * num_envs
+        self._options = [{} for _ in range(num_envs)]
+        self.render_mode = None
+        self.metadata = {'render_modes': []}
+
+    def seed(self, seed=None):
+        # As VecEnv.seed: env i is seeded with seed + i at the next reset
+        if seed is None:
+            seed = int(np.random.randint(0, np.iinfo(np.uint32).max, dtype=np.uint32))
+        self._seeds = [seed + idx for idx in range(self.num_envs)]
+        return self._seeds
+
+    def _reset_seeds(self):
+        self._seeds = [None] * self.num_envs
+
+    def _reset_options(self):
+        self._options = [{} for _ in range(self.num_envs)]
+
+    def _reset_env(self, env_idx, seed=None):
+        # Mirrors gym.Env.reset: reseed only when asked, otherwise continue the stream
+        if seed is not None or self._np_randoms[env_idx] is None:
+            self._np_randoms[env_idx], _ = seeding.np_random(seed)
+        self.current_step[env_idx] = 0
+        self.current_idx[env_idx] = self._np_randoms[env_idx].integers(0, self.n_samples)
+        if self.jammer_type == 'mixed':
+            self.episode_jammer_type[env_idx] = JAMMER_TYPES[1 + int(self._np_randoms[env_idx].integers(0, 4))]
+
+    def _get_obs(self, indices=slice(None)):
+        idx = self.current_idx[indices]
+        obs = np.empty((len(idx), 9), dtype=np.float32)
+        obs[:, :8] = self.features_scaled[idx]
+        obs[:, 8] = self.obs_labels[idx]
+        return obs
+
+    def reset(self):
+        if self.link_sim is not None and self._seeds[0] is not None:
+            self.link_sim.seed(self._seeds[0])
+        for env_idx in range(self.num_envs):
+            self._reset_env(env_idx, self._seeds[env_idx])
+        self._reset_seeds()
+        self._reset_options()
+        return self._get_obs()
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(self.num_envs, 3)
+
+    def step_wait(self):
+        self.current_step += 1
+
+        modulation, power_level, nulling = self.actions.T
+        feat_scaled = self.features_scaled[self.current_idx]
+        jammer_label = self.labels[self.current_idx]
+
+        sinr = self.simulate_sinr(modulation, power_level, nulling, feat_scaled, jammer_label)
+        ber = self.simulate_ber(sinr, modulation)
+
+        power_penalty = power_level * 0.1
+        ber_penalty = ber * 10
+
+        reward = sinr - power_penalty - ber_penalty
+        # Same values as the infos below, kept as arrays for batched evaluation
+        self.step_sinr, self.step_ber, self.step_reward = sinr, ber, reward
+
+        obs = self._get_obs()
+        dones = self.current_step >= self.max_steps
+
+        infos = [
+            {'sinr': sinr[i], 'ber': ber[i], 'reward': reward[i], 'TimeLimit.truncated': False}
+            for i in range(self.num_envs)
+        ]
+
+        # Save terminal observations and auto-reset finished episodes, as DummyVecEnv does
+        for env_idx in np.flatnonzero(dones):
+            infos[env_idx]['terminal_observation'] = obs[env_idx].copy()
+            self._reset_env(env_idx)
+            obs[env_idx] = self._get_obs([env_idx])[0]
+
+        return obs, reward.astype(np.float32), dones, infos
+
+    def simulate_sinr(self, modulation, power_level, nulling, features, jammer_label):
+        if self.link_sim is not None:
+            noise_factor = np.clip(np.sum(features, axis=1)/1000, 0.5, 1.5)
+            sinr, ber = self.link_sim.simulate(modulation, power_level, nulling, jammer_label,
+                                               noise_factor=noise_factor, jammer_type=self.episode_jammer_type)
+            self.last_ber = ber[:, 0]
+            return sinr[:, 0]
+
+        base_sinr = np.where(jammer_label == 0, 20, 5)
+        mod_factor = MOD_FACTOR[modulation]
+        power_factor = 1 + 0.2*power_level
+        nulling_factor = 1 + 0.3*nulling
+        noise_factor = np.clip(np.sum(features, axis=1)/1000, 0.5, 1.5)
+
+        sinr = base_sinr * mod_factor * power_factor * nulling_factor * noise_factor
+        return sinr
+
+    def simulate_ber(self, sinr, modulation):
+        if self.link_sim is not None:
+            return self.last_ber
+
+        mod_order = MOD_ORDER[modulation]
+        ber = 0.5 * np.exp(-sinr / (mod_order * 2))
+        return ber
+
+    def close(self):
+        pass
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, (int, np.integer)):
+            return [int(indices)]
+        return indices
+
+    def _all_envs(self, indices, what):
+        if sorted(self._indices(indices)) != list(range(self.num_envs)):
+            raise ValueError(f"{what} applies to the whole batch; it cannot target env(s) {list(self._indices(indices))}")
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        if attr_name in PER_ENV_ATTRS and value is not None:
+            return [value[i] for i in self._indices(indices)]
+        return [value for _ in self._indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        if attr_name in PER_ENV_ATTRS and getattr(self, attr_name) is not None:
+            target = getattr(self, attr_name)
+            for i in self._indices(indices):
+                target[i] = value
+            return
+        self._all_envs(indices, f"Shared attribute {attr_name!r}")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """Call a batch method once; a result with one entry per env is split per env, any other is repeated."""
+        self._all_envs(indices, f"Batch method {method_name!r}")
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        if isinstance(result, (list, np.ndarray)) and len(result) == self.num_envs:
+            return list(result)
+        return [result] * self.num_envs
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
+
+
+def __getattr__(name):
+    # The SB3 subclass is built on first access, so importing this module stays torch-free
+    if name != 'MIMOAIAntiJammingVecEnv':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+    class MIMOAIAntiJammingVecEnv(MIMOAIAntiJammingBatch, VecEnv):
+        """SB3 VecEnv that runs N MIMOAIAntiJammingEnv episodes as NumPy arrays (see MIMOAIAntiJammingBatch)."""
+
+    MIMOAIAntiJammingVecEnv.__qualname__ = name
+    globals()[name] = MIMOAIAntiJammingVecEnv
+    return MIMOAIAntiJammingVecEnv
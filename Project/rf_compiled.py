@@ -0,0 +1,160 @@
+# rf_compiled.py
+# Compiled Random Forest jammer classifier: every tree of the sklearn forest is
+# flattened into shared node arrays and all trees are traversed at once with NumPy.
+# Usage (from the Project folder): python rf_compiled.py  (compile rf_model.pkl + parity check)
+
+import os
+import time
+import numpy as np
+from artifact_cache import file_fingerprint
+
+
+class CompiledForest:
+    """
+    Flattened RandomForestClassifier with the same predictions as sklearn.
+    Nodes of all trees live in one set of arrays (leaves point to themselves),
+    so a batch is classified by at most max_depth vectorized gather/compare
+    steps over the (sample, tree) pairs that have not reached a leaf yet.
+    Thresholds are stored as float32 rounded down, which gives identical
+    decisions for the float32 inputs sklearn compares against.
+    source_fingerprint is the file_fingerprint of the pickle it was compiled
+    from (None if unknown), saved with the arrays.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, max_depth, classes,
+                 source_fingerprint=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.source_fingerprint = source_fingerprint
+
+    @classmethod
+    def from_sklearn(cls, rf_model, source_fingerprint=None):
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        for est in rf_model.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            ids = np.arange(n)
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            # largest float32 <= threshold: x32 <= t32 exactly when x32 <= t64
+            t32 = tree.threshold.astype(np.float32)
+            t32 = np.where(t32.astype(np.float64) > tree.threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+            thresholds.append(np.where(is_leaf, np.float32(np.inf), t32))
+            lefts.append(np.where(is_leaf, ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, ids, tree.children_right) + offset)
+            # same per-tree normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer)
+            offset += n
+        max_depth = max(est.tree_.max_depth for est in rf_model.estimators_)
+        return cls(np.concatenate(features).astype(np.int8 if rf_model.n_features_in_ < 128 else np.int32),
+                   np.concatenate(thresholds).astype(np.float32),
+                   np.concatenate(lefts).astype(np.int32), np.concatenate(rights).astype(np.int32),
+                   np.concatenate(probas), np.array(roots, dtype=np.int32), max_depth, rf_model.classes_,
+                   source_fingerprint)
+
+    def apply(self, X):
+        """Leaf index of every sample in every tree, shape (n_samples, n_trees)."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        n_samples, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_X = X.ravel()
+        node = np.tile(self.roots, n_samples)
+        # offset of each (sample, tree) pair's sample row in flat_X
+        row = np.repeat(np.arange(n_samples) * n_features, n_trees)
+        # only pairs that have not reached a leaf are advanced each level
+        active = np.arange(len(node))
+        for _ in range(self.max_depth):
+            if len(active) == 0:
+                break
+            cur = node[active]
+            go_left = flat_X[row[active] + self.feature[cur]] <= self.threshold[cur]
+            nxt = np.where(go_left, self.left[cur], self.right[cur])
+            node[active] = nxt
+            active = active[self.left[nxt] != nxt]
+        return node.reshape(n_samples, n_trees)
+
+    def predict_proba(self, X):
+        # cumsum adds the trees in order, like sklearn's accumulation, so ties resolve identically
+        proba = np.cumsum(self.leaf_proba[self.apply(X)], axis=1)[:, -1]
+        return proba / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        np.savez_compressed(path, feature=self.feature, threshold=self.threshold, left=self.left,
+                            right=self.right, leaf_proba=self.leaf_proba, roots=self.roots,
+                            max_depth=self.max_depth, classes=self.classes_,
+                            source_fingerprint=self.source_fingerprint or '')
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as d:
+            source = str(d['source_fingerprint']) if 'source_fingerprint' in d else ''
+            return cls(d['feature'], d['threshold'], d['left'], d['right'], d['leaf_proba'],
+                       d['roots'], d['max_depth'], d['classes'], source or None)
+
+
+def compiled_path(rf_model_path):
+    return os.path.splitext(rf_model_path)[0] + '_compiled.npz'
+
+
+def load_compiled_rf(rf_model_path):
+    """
+    Load <model>_compiled.npz, (re)compiling it from the pickle when missing or
+    compiled from different pickle contents (checked by content hash, so file
+    timestamps from checkouts or copies do not matter).
+    """
+    path = compiled_path(rf_model_path)
+    fingerprint = file_fingerprint(rf_model_path)
+    if os.path.exists(path):
+        forest = CompiledForest.load(path)
+        if forest.source_fingerprint == fingerprint:
+            return forest
+    import joblib
+    forest = CompiledForest.from_sklearn(joblib.load(rf_model_path), fingerprint)
+    tmp_path = path + f'.{os.getpid()}.tmp.npz'
+    forest.save(tmp_path)
+    os.replace(tmp_path, path)
+    return forest
+
+
+if __name__ == "__main__":
+    import joblib
+    import warnings
+    from dataset_cache import load_dataset, scaled_features
+
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    rf_model = joblib.load('rf_model.pkl')
+    forest = CompiledForest.from_sklearn(rf_model, file_fingerprint('rf_model.pkl'))
+    forest.save(compiled_path('rf_model.pkl'))
+    print(f"[INFO] Saved {compiled_path('rf_model.pkl')} "
+          f"({os.path.getsize(compiled_path('rf_model.pkl'))} bytes vs {os.path.getsize('rf_model.pkl')} pickled)")
+
+    features, labels, _ = load_dataset('balanced_dataset_20000.csv')
+    X = scaled_features(features, joblib.load('rf_scaler.pkl'))
+    same_label = np.mean(forest.predict(X) == rf_model.predict(X))
+    same_proba = np.array_equal(forest.predict_proba(X), rf_model.predict_proba(X))
+    print(f"[INFO] Label parity: {same_label:.4%}, identical probabilities: {same_proba}")
+
+    n = 200
+    start = time.perf_counter()
+    for i in range(n):
+        rf_model.predict_proba(X[i:i+1])
+    sk_us = (time.perf_counter() - start) / n * 1e6
+    start = time.perf_counter()
+    for i in range(n):
+        forest.predict_proba(X[i:i+1])
+    np_us = (time.perf_counter() - start) / n * 1e6
+    print(f"[INFO] Per-sample latency: sklearn {sk_us:.0f} us, compiled {np_us:.0f} us")
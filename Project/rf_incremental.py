@@ -0,0 +1,310 @@
+# rf_incremental.py
+# Incremental refresh of the jammer RF classifier from new labelled feature
+# batches, instead of the full retrain in train_rf_classifier.py:
+#   - scaler statistics are updated in streaming fashion (StandardScaler.partial_fit)
+#     and the existing trees' thresholds are remapped to the new scaling,
+#   - new trees are grown (warm_start, n_jobs) on the new rows plus a reservoir
+#     sample of everything seen before, optionally replacing the oldest trees,
+#   - every update is published as a versioned folder rf_versions/vNNNN/ and
+#     activated by atomically rewriting rf_versions/current.json. Loaders resolve
+#     that single pointer (active_rf_paths), so they always get a model and the
+#     scaler it was remapped to; rf_model.pkl / rf_scaler.pkl / the compiled
+#     forest are refreshed afterwards as copies for tools that open them directly.
+# A full retrain (train_rf_classifier.py) deactivates the versions. An update
+# starts from the active version only while the live files are still that
+# version's; otherwise the live artifacts become the parent of the next version.
+# Usage (from the Project folder):
+#   python rf_incremental.py field_batch.csv [more.csv ...] --trees 20 [--replace]
+#   python rf_incremental.py --rollback 3
+
+import argparse
+import copy
+import json
+import os
+import shutil
+import time
+import warnings
+import numpy as np
+import joblib
+from artifact_cache import file_fingerprint
+from rf_compiled import CompiledForest, compiled_path
+
+FEATURE_COLUMNS = ['freq1', 'noise', 'max_magnitude', 'total_gain_db', 'base_pwr_db', 'rssi',
+                   'relpwr_db', 'avgpwr_db']
+VERSIONS_DIR = 'rf_versions'
+
+
+class Reservoir:
+    """Uniform sample (Algorithm R) of at most `capacity` raw (features, label) rows."""
+
+    def __init__(self, capacity, n_features=len(FEATURE_COLUMNS)):
+        self.capacity = capacity
+        self.X = np.empty((capacity, n_features), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+        self.n_seen = 0
+
+    def add(self, X, y, rng):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        fill = min(self.capacity - self.size, len(X))
+        self.X[self.size:self.size + fill] = X[:fill]
+        self.y[self.size:self.size + fill] = y[:fill]
+        self.size += fill
+        # row k of the stream (0-based) replaces a random slot with probability capacity / (k + 1)
+        k = self.n_seen + np.arange(fill, len(X))
+        slot = (rng.random(len(k)) * (k + 1)).astype(np.int64)
+        keep = slot < self.capacity
+        self.X[slot[keep]] = X[fill:][keep]
+        self.y[slot[keep]] = y[fill:][keep]
+        self.n_seen += len(X)
+
+    def data(self):
+        return self.X[:self.size], self.y[:self.size]
+
+    def save(self, path):
+        np.savez_compressed(path, X=self.X[:self.size], y=self.y[:self.size],
+                            capacity=self.capacity, n_seen=self.n_seen)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as d:
+            reservoir = cls(int(d['capacity']), d['X'].shape[1])
+            reservoir.size = len(d['y'])
+            reservoir.X[:reservoir.size] = d['X']
+            reservoir.y[:reservoir.size] = d['y']
+            reservoir.n_seen = int(d['n_seen'])
+        return reservoir
+
+
+def remap_thresholds(rf_model, old_scaler, new_scaler):
+    """
+    Rewrite every split threshold t (in old_scaler units) as the same raw
+    feature value in new_scaler units, so the trees make the same decisions
+    on new_scaler.transform(X) as before on old_scaler.transform(X) (except
+    for float32 rounding of samples lying exactly on a split).
+    """
+    for est in rf_model.estimators_:
+        tree = est.tree_
+        split = tree.children_left != -1
+        f = tree.feature[split]
+        raw = tree.threshold[split] * old_scaler.scale_[f] + old_scaler.mean_[f]
+        tree.threshold[split] = (raw - new_scaler.mean_[f]) / new_scaler.scale_[f]
+
+
+def iter_batches(csv_paths, chunk_size=50000):
+    """(features, labels) chunks of labelled CSVs with the dataset's 8 feature columns."""
+    import pandas as pd
+
+    for path in csv_paths:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield chunk[FEATURE_COLUMNS].to_numpy(np.float32), chunk['label'].to_numpy(np.int64)
+
+
+def update_forest(rf_model, scaler, reservoir, batches, n_new_trees=20, replace=False, n_jobs=-1,
+                  new_capacity=50000, seed=0):
+    """
+    Stream `batches` into the scaler and reservoir, then grow n_new_trees trees
+    on (a reservoir sample of) the new rows plus the reservoir of older rows.
+    rf_model, scaler and reservoir are updated in place; returns a stats dict.
+    """
+    rng = np.random.default_rng(seed)
+    old_scaler = copy.deepcopy(scaler)
+    new_rows = Reservoir(new_capacity, reservoir.X.shape[1])
+    X_old, y_old = (a.copy() for a in reservoir.data())
+    n_correct = 0
+    for X, y in batches:
+        # accuracy of the detector before this refresh, on rows it has not seen
+        n_correct += int(np.sum(rf_model.predict(old_scaler.transform(X).astype(np.float32)) == y))
+        scaler.partial_fit(X)
+        new_rows.add(X, y, rng)
+        reservoir.add(X, y, rng)
+    if new_rows.n_seen == 0:
+        raise ValueError("No new rows to train on")
+    remap_thresholds(rf_model, old_scaler, scaler)
+
+    X_new, y_new = new_rows.data()
+    X_train = scaler.transform(np.concatenate([X_new, X_old]))
+    y_train = np.concatenate([y_new, y_old])
+    if replace:
+        rf_model.estimators_ = rf_model.estimators_[n_new_trees:]
+    start = time.perf_counter()
+    saved = {name: rf_model.get_params()[name] for name in ('warm_start', 'n_jobs')}
+    rf_model.set_params(warm_start=True, n_estimators=len(rf_model.estimators_) + n_new_trees,
+                        n_jobs=n_jobs, random_state=int(rng.integers(0, 2**31 - 1)))
+    rf_model.fit(X_train, y_train)
+    # the published model serves single-row predicts: no warm start or worker pool left switched on
+    rf_model.set_params(**saved)
+    return {
+        'new_rows': new_rows.n_seen,
+        'pre_update_accuracy': n_correct / new_rows.n_seen,
+        'train_rows': len(y_train),
+        'fit_s': time.perf_counter() - start,
+        'n_trees': len(rf_model.estimators_),
+    }
+
+
+def _atomic_copy(src, dst):
+    tmp_path = dst + f'.{os.getpid()}.tmp'
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def current_version(root=VERSIONS_DIR):
+    path = os.path.join(root, 'current.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['version']
+
+
+def version_dir(version, root=VERSIONS_DIR):
+    return os.path.join(root, f'v{version:04d}')
+
+
+def active_rf_paths(model_path='rf_model.pkl', scaler_path='rf_scaler.pkl'):
+    """
+    (model, scaler) paths to load: those of the version named by the
+    rf_versions/current.json next to model_path, or the given files when no
+    version is active. current.json is read once, so the pair always matches.
+    """
+    root = os.path.join(os.path.dirname(model_path), VERSIONS_DIR)
+    version = current_version(root)
+    if version is None:
+        return model_path, scaler_path
+    vdir = version_dir(version, root)
+    return os.path.join(vdir, 'rf_model.pkl'), os.path.join(vdir, 'rf_scaler.pkl')
+
+
+def deactivate(root=VERSIONS_DIR):
+    """Point loaders back at the live rf_model.pkl / rf_scaler.pkl (after a full retrain)."""
+    path = os.path.join(root, 'current.json')
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def activate(version, root=VERSIONS_DIR, model_path='rf_model.pkl', scaler_path='rf_scaler.pkl'):
+    """
+    Switch to a published version: current.json, the pointer loaders resolve,
+    is replaced in one atomic step; the live files are then refreshed as
+    copies (each replaced atomically) for tools that open them directly.
+    """
+    vdir = version_dir(version, root)
+    if not os.path.exists(os.path.join(vdir, 'manifest.json')):
+        published = sorted(int(n[1:]) for n in os.listdir(root) if n.startswith('v') and n[1:].isdigit()) \
+            if os.path.isdir(root) else []
+        raise ValueError(f"No published RF version {version} in {root}/ (available: {published or 'none'})")
+    tmp_path = os.path.join(root, f'current.json.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': version}, f)
+    os.replace(tmp_path, os.path.join(root, 'current.json'))
+    _atomic_copy(os.path.join(vdir, 'rf_model.pkl'), model_path)
+    _atomic_copy(os.path.join(vdir, 'rf_model_compiled.npz'), compiled_path(model_path))
+    _atomic_copy(os.path.join(vdir, 'rf_scaler.pkl'), scaler_path)
+
+
+def read_manifest(version, root=VERSIONS_DIR):
+    with open(os.path.join(version_dir(version, root), 'manifest.json')) as f:
+        return json.load(f)
+
+
+def live_is_version(version, root=VERSIONS_DIR, model_path='rf_model.pkl', scaler_path='rf_scaler.pkl'):
+    """True if the live model and scaler files are the ones published as `version`."""
+    vdir = version_dir(version, root)
+    manifest = read_manifest(version, root)
+    for name, live_path in (('model', model_path), ('scaler', scaler_path)):
+        expected = manifest.get(f'{name}_fingerprint') or file_fingerprint(os.path.join(vdir, f'rf_{name}.pkl'))
+        if not os.path.exists(live_path) or file_fingerprint(live_path) != expected:
+            return False
+    return True
+
+
+def publish(rf_model, scaler, reservoir, info, root=VERSIONS_DIR, model_path='rf_model.pkl',
+            scaler_path='rf_scaler.pkl', parent=None):
+    """
+    Write rf_versions/vNNNN/ (renamed into place when complete) and activate it.
+    `parent` is the version the update started from (None: the live artifacts
+    of a full retrain); the manifest keeps the fingerprints of the model and
+    scaler so load_state can tell whether the live files are still this version.
+    """
+    os.makedirs(root, exist_ok=True)
+    existing = [int(n[1:]) for n in os.listdir(root) if n.startswith('v') and n[1:].isdigit()]
+    version = max(existing, default=0) + 1
+    vdir = version_dir(version, root)
+    tmp_dir = vdir + f'.{os.getpid()}.tmp'
+    os.makedirs(tmp_dir)
+    joblib.dump(rf_model, os.path.join(tmp_dir, 'rf_model.pkl'))
+    joblib.dump(scaler, os.path.join(tmp_dir, 'rf_scaler.pkl'))
+    fingerprints = {f'{name}_fingerprint': file_fingerprint(os.path.join(tmp_dir, f'rf_{name}.pkl'))
+                    for name in ('model', 'scaler')}
+    CompiledForest.from_sklearn(rf_model, fingerprints['model_fingerprint']).save(
+        os.path.join(tmp_dir, 'rf_model_compiled.npz'))
+    reservoir.save(os.path.join(tmp_dir, 'rf_reservoir.npz'))
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump({'version': version, 'parent': parent, 'created': time.time(), **fingerprints, **info}, f,
+                  indent=2)
+    os.rename(tmp_dir, vdir)
+    activate(version, root, model_path, scaler_path)
+    return version
+
+
+def load_state(root=VERSIONS_DIR, model_path='rf_model.pkl', scaler_path='rf_scaler.pkl',
+               init_csv='balanced_dataset_20000.csv', capacity=100000, seed=0):
+    """
+    (rf_model, scaler, reservoir, parent) to update: the current version while
+    the live files are still that version's (parent = its number), otherwise
+    the live artifacts (parent None) with a reservoir seeded from init_csv,
+    e.g. before the first update or after a full retrain replaced them.
+    """
+    version = current_version(root)
+    if version is not None:
+        if live_is_version(version, root, model_path, scaler_path):
+            vdir = version_dir(version, root)
+            return (joblib.load(os.path.join(vdir, 'rf_model.pkl')), joblib.load(os.path.join(vdir, 'rf_scaler.pkl')),
+                    Reservoir.load(os.path.join(vdir, 'rf_reservoir.npz')), version)
+        print(f"[INFO] Live {model_path} / {scaler_path} differ from active version {version}; "
+              f"updating the live artifacts instead")
+    reservoir = Reservoir(capacity)
+    rng = np.random.default_rng(seed)
+    for X, y in iter_batches([init_csv]):
+        reservoir.add(X, y, rng)
+    return joblib.load(model_path), joblib.load(scaler_path), reservoir, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incremental RF jammer-classifier refresh')
+    parser.add_argument('batches', nargs='*', help='labelled CSVs with the 8 feature columns + label')
+    parser.add_argument('--trees', type=int, default=20, help='trees grown per update')
+    parser.add_argument('--replace', action='store_true', help='drop as many of the oldest trees as are grown')
+    parser.add_argument('--jobs', type=int, default=-1, help='n_jobs for tree growing')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='CSV rows read at a time')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rollback', type=int, default=None, metavar='VERSION',
+                        help='re-activate a published version instead of updating')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+    if args.rollback is not None:
+        try:
+            activate(args.rollback)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"[INFO] Live RF artifacts switched to version {args.rollback}")
+        return
+    if not args.batches:
+        parser.error('no batches given')
+
+    start = time.perf_counter()
+    rf_model, scaler, reservoir, parent = load_state(seed=args.seed)
+    stats = update_forest(rf_model, scaler, reservoir, iter_batches(args.batches, args.chunk_size),
+                          n_new_trees=args.trees, replace=args.replace, n_jobs=args.jobs,
+                          seed=args.seed + (current_version() or 0))
+    version = publish(rf_model, scaler, reservoir, {'batches': args.batches, **stats}, parent=parent)
+    print(f"[INFO] {stats['new_rows']} new rows (accuracy before update {stats['pre_update_accuracy']:.2%}); "
+          f"{stats['n_trees']} trees after growing on {stats['train_rows']} rows in {stats['fit_s']:.1f} s")
+    print(f"[INFO] Published version {version} to {version_dir(version)} and activated it "
+          f"({time.perf_counter() - start:.1f} s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+# sjnr_sweep.py
+# Post-filter SJNR sweep engine: antenna configs x JSR x SNR x number of jammers,
+# evaluated as batched channel tensors (Python version of plot_sjnr_vs_jsr.m and
+# plot_multi_jammer_vs_antennas.m). Grid chunks run in a process pool and every
+# finished chunk is written to an on-disk store, so an interrupted sweep resumes
+# where it stopped.
+# Usage (from the Project folder):
+#   python sjnr_sweep.py --preset jsr
+#   python sjnr_sweep.py --preset multi_jammer --jammer-model spatial --filter whitened
+#   python sjnr_sweep.py --preset jsr --realizations 20000 --workers 4
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+SWEEP_VERSION = 1
+JAMMER_MODELS = ('white', 'spatial')
+FILTERS = ('zf', 'whitened')
+
+# Grids of the MATLAB scripts
+PRESETS = {
+    'jsr': {   # plot_sjnr_vs_jsr.m
+        'antennas': [(2, 2), (4, 4), (8, 8)],
+        'jsr_db': list(range(-60, 101, 10)),
+        'n_jammers': [1],
+        'snr_db': [20],
+    },
+    'multi_jammer': {   # plot_multi_jammer_vs_antennas.m
+        'antennas': [(2, nr) for nr in (2, 3, 4, 6, 8)],
+        'jsr_db': [20],
+        'n_jammers': [1, 2, 3],
+        'snr_db': [20],
+    },
+}
+
+GRID_COLUMNS = ['Nt', 'Nr', 'K', 'SNR_dB', 'JSR_dB']
+
+
+def sweep_params(antennas, jsr_db, n_jammers, snr_db, realizations=2000, jammer_model='white',
+                 rx_filter='zf', seed=0, chunk_points=64, batch_size=1024):
+    if jammer_model not in JAMMER_MODELS:
+        raise ValueError(f"Unknown jammer model: {jammer_model}")
+    if rx_filter not in FILTERS:
+        raise ValueError(f"Unknown filter: {rx_filter}")
+    return {
+        'version': SWEEP_VERSION,
+        'antennas': [[int(nt), int(nr)] for nt, nr in antennas],
+        'jsr_db': [float(j) for j in jsr_db], 'n_jammers': [int(k) for k in n_jammers],
+        'snr_db': [float(s) for s in snr_db], 'realizations': int(realizations),
+        'jammer_model': jammer_model, 'filter': rx_filter, 'seed': int(seed),
+        'chunk_points': int(chunk_points), 'batch_size': int(batch_size),
+    }
+
+
+def params_hash(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def sweep_grid(params):
+    """Grid points as a (P, 5) array of GRID_COLUMNS, antenna config outermost."""
+    return np.array([(nt, nr, k, snr, jsr)
+                     for nt, nr in params['antennas']
+                     for k in params['n_jammers']
+                     for snr in params['snr_db']
+                     for jsr in params['jsr_db']], dtype=float)
+
+
+def sweep_chunks(grid, chunk_points):
+    """
+    Split the grid into chunks of at most chunk_points points that share
+    (Nt, Nr, K), so a chunk is one stack of equally shaped channel matrices.
+    """
+    chunks = []
+    _, group = np.unique(grid[:, :3], axis=0, return_inverse=True)
+    for g in range(group.max() + 1):
+        rows = np.flatnonzero(group.ravel() == g)
+        chunks.extend(np.array_split(rows, -(-len(rows) // chunk_points)))
+    return chunks
+
+
+def post_filter_sjnr_db(H, G, snr_db, jsr_db, jammer_model='white', rx_filter='zf'):
+    """
+    Post-filter SJNR (dB) for a stack of channels, shape (R, P).
+
+    H: (R, Nr, Nt) desired channels, G: (R, Nr, K) jammer channels (used by the
+    'spatial' model). Every Tx antenna sends the same unit-power symbol, as in
+    the MATLAB scripts, and noise/jammer powers are set relative to the received
+    signal power of each realization. 'white' adds the jammers as independent
+    noise on every Rx antenna (plot_multi_jammer_vs_antennas.m); 'spatial' sends
+    each jammer through its own channel column of G. The symbol averages of
+    mean(|s_des|^2) / mean(|err|^2) are taken in closed form.
+    """
+    R, Nr, Nt = H.shape
+    K = G.shape[2]
+    snr = 10 ** (np.asarray(snr_db, dtype=float) / 10)
+    jsr = 10 ** (np.asarray(jsr_db, dtype=float) / 10)
+
+    a = H.sum(axis=2)                                   # (R, Nr) received signal direction
+    sig_pow = np.mean(np.abs(a)**2, axis=1)[:, None]    # (R, 1)
+    noise_pow = sig_pow / snr                           # (R, P)
+    jam_pow = sig_pow * jsr                             # total over the K jammers
+
+    eye = np.eye(Nr)
+    if jammer_model == 'white':
+        cov = (noise_pow + jam_pow)[:, :, None, None] * eye
+    else:
+        GG = G @ G.conj().transpose(0, 2, 1)            # (R, Nr, Nr)
+        cov = noise_pow[:, :, None, None] * eye + (jam_pow / K)[:, :, None, None] * GG[:, None]
+
+    if rx_filter == 'zf':
+        W = np.linalg.pinv(H)[:, None]                  # (R, 1, Nt, Nr), shared by all points
+    else:
+        # interference-whitened ZF: (H^H C^-1 H)^-1 H^H C^-1, nulls up to Nr - Nt jammers
+        CiH = np.linalg.solve(cov, np.broadcast_to(H[:, None], cov.shape[:2] + H.shape[1:]))
+        HCiH = H.conj().transpose(0, 2, 1)[:, None] @ CiH
+        W = np.linalg.pinv(HCiH) @ CiH.conj().transpose(0, 1, 3, 2)
+
+    signal = np.sum(np.abs(W @ a[:, None, :, None])**2, axis=(2, 3))
+    interference = np.einsum('rpij,rpjk,rpik->rp', W, cov, W.conj(), optimize=True).real
+    return 10*np.log10(signal / interference)
+
+
+def run_chunk(params, grid, chunk_id, rows, store_dir):
+    """Simulate one chunk and write its running sums to <store_dir>/chunk_XXXXX.npz."""
+    Nt, Nr, K = (int(v) for v in grid[rows[0], :3])
+    snr_db, jsr_db = grid[rows, 3], grid[rows, 4]
+    rng = np.random.default_rng([params['seed'], chunk_id])
+
+    n = 0
+    sum_db = np.zeros(len(rows))
+    sumsq_db = np.zeros(len(rows))
+    sum_lin = np.zeros(len(rows))
+    while n < params['realizations']:
+        B = min(params['batch_size'], params['realizations'] - n)
+        H = (rng.standard_normal((B, Nr, Nt)) + 1j*rng.standard_normal((B, Nr, Nt))) / np.sqrt(2)
+        G = (rng.standard_normal((B, Nr, K)) + 1j*rng.standard_normal((B, Nr, K))) / np.sqrt(2)
+        sjnr_db = post_filter_sjnr_db(H, G, snr_db, jsr_db, params['jammer_model'], params['filter'])
+        sum_db += sjnr_db.sum(axis=0)
+        sumsq_db += (sjnr_db**2).sum(axis=0)
+        sum_lin += (10 ** (sjnr_db / 10)).sum(axis=0)
+        n += B
+
+    path = os.path.join(store_dir, f'chunk_{chunk_id:05d}.npz')
+    tmp_path = path + f'.{os.getpid()}.tmp.npz'
+    np.savez(tmp_path, rows=rows, n=n, sum_db=sum_db, sumsq_db=sumsq_db, sum_lin=sum_lin)
+    os.replace(tmp_path, path)
+    return chunk_id
+
+
+def open_store(params, store_root='sweeps', name='sweep'):
+    """Create (or reopen) the store directory for these parameters."""
+    store_dir = os.path.join(store_root, f'{name}_{params_hash(params)}')
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = os.path.join(store_dir, 'manifest.json')
+    if not os.path.exists(manifest):
+        with open(manifest, 'w') as f:
+            json.dump(params, f, indent=2)
+    return store_dir
+
+
+def run_sweep(params, store_dir, n_workers=None, verbose=True):
+    """Run every chunk that is not in the store yet, in parallel unless n_workers == 1."""
+    grid = sweep_grid(params)
+    chunks = sweep_chunks(grid, params['chunk_points'])
+    todo = [i for i in range(len(chunks))
+            if not os.path.exists(os.path.join(store_dir, f'chunk_{i:05d}.npz'))]
+    if verbose:
+        print(f"[INFO] {len(grid)} grid points in {len(chunks)} chunks, "
+              f"{len(chunks) - len(todo)} already done")
+
+    if n_workers == 1 or len(todo) <= 1:
+        for done, i in enumerate(todo, 1):
+            run_chunk(params, grid, i, chunks[i], store_dir)
+            if verbose:
+                print(f"[INFO] Chunk {i} done ({done}/{len(todo)})")
+    else:
+        ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+            futures = [pool.submit(run_chunk, params, grid, i, chunks[i], store_dir) for i in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                i = future.result()
+                if verbose:
+                    print(f"[INFO] Chunk {i} done ({done}/{len(todo)})")
+    return load_sweep(store_dir)
+
+
+def load_sweep(store_dir, level=0.95):
+    """Per-point statistics of the finished chunks in a store as a DataFrame."""
+    from scipy import stats
+
+    with open(os.path.join(store_dir, 'manifest.json')) as f:
+        params = json.load(f)
+    grid = sweep_grid(params)
+    n = np.zeros(len(grid))
+    sum_db = np.zeros(len(grid))
+    sumsq_db = np.zeros(len(grid))
+    sum_lin = np.zeros(len(grid))
+    for fname in sorted(os.listdir(store_dir)):
+        if fname.startswith('chunk_') and fname.endswith('.npz') and '.tmp' not in fname:
+            with np.load(os.path.join(store_dir, fname)) as d:
+                rows = d['rows']
+                n[rows] += d['n']
+                sum_db[rows] += d['sum_db']
+                sumsq_db[rows] += d['sumsq_db']
+                sum_lin[rows] += d['sum_lin']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_db = sum_db / n
+        std_db = np.sqrt(np.maximum(sumsq_db / n - mean_db**2, 0) * n / (n - 1))
+        ci_db = stats.t.ppf(0.5 + level/2, n - 1) * std_db / np.sqrt(n)
+        avg_lin_db = 10*np.log10(sum_lin / n)
+
+    df = pd.DataFrame(grid, columns=GRID_COLUMNS).astype({'Nt': int, 'Nr': int, 'K': int})
+    df['Realizations'] = n.astype(int)
+    df['SJNR_dB'] = mean_db
+    df['SJNR_dB std'] = std_db
+    df['SJNR_dB CI'] = ci_db
+    df['SJNR of mean (dB)'] = avg_lin_db
+    return df[df['Realizations'] > 0].reset_index(drop=True)
+
+
+def plot_sweep(df, x, group, title, path):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 5))
+    for key, sub in df.groupby(group):
+        key = key if isinstance(key, tuple) else (key,)
+        label = ', '.join(f'{g}={v}' for g, v in zip(group, key))
+        plt.errorbar(sub[x], sub['SJNR_dB'], yerr=sub['SJNR_dB CI'], marker='o', capsize=3, label=label)
+    plt.xlabel(x)
+    plt.ylabel('Post-filter SJNR (dB)')
+    plt.title(title)
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batched post-filter SJNR sweep')
+    parser.add_argument('--preset', choices=list(PRESETS), default='jsr')
+    parser.add_argument('--realizations', type=int, default=2000, help='channel realizations per grid point')
+    parser.add_argument('--jammer-model', choices=JAMMER_MODELS, default='white')
+    parser.add_argument('--filter', choices=FILTERS, default='zf')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (1 = serial)')
+    parser.add_argument('--chunk-points', type=int, default=64, help='grid points per pool task')
+    parser.add_argument('--batch-size', type=int, default=1024, help='realizations per batched tensor')
+    parser.add_argument('--store', default='sweeps', help='root folder of the resumable stores')
+    args = parser.parse_args(argv)
+
+    params = sweep_params(**PRESETS[args.preset], realizations=args.realizations,
+                          jammer_model=args.jammer_model, rx_filter=args.filter, seed=args.seed,
+                          chunk_points=args.chunk_points, batch_size=args.batch_size)
+    store_dir = open_store(params, args.store, args.preset)
+    print(f"[INFO] Sweep store: {store_dir}")
+    df = run_sweep(params, store_dir, n_workers=args.workers)
+
+    os.makedirs('results', exist_ok=True)
+    name = f'sjnr_{args.preset}_{args.jammer_model}_{args.filter}'
+    df.to_csv(f'results/{name}.csv', index=False)
+    if args.preset == 'jsr':
+        plot_sweep(df, 'JSR_dB', ['Nt', 'Nr'], 'SJNR vs. JSR for Different MIMO Configurations',
+                   f'results/{name}.png')
+    else:
+        plot_sweep(df, 'Nr', ['K'], 'SJNR vs. Rx Antennas for K = 1-3 Jammers',
+                   f'results/{name}.png')
+    print(f"[INFO] Saved results/{name}.csv and results/{name}.png")
+
+
+if __name__ == "__main__":
+    main()
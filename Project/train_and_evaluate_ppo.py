@@ -1,35 +1,134 @@
-import gym
+import argparse
+import multiprocessing as mp
+import time
 from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import EvalCallback
+from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
 from ppo_env import MIMOAIAntiJammingEnv
+from ppo_vec_env import MIMOAIAntiJammingVecEnv
+from instrumentation import InstrumentedEnv, Profiler, ProfilerCallback, instrument_batch, instrument_stages
 import os
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train PPO on the MIMO anti-jamming environment')
+    parser.add_argument('--n-envs', type=int, default=1, help='number of parallel environments')
+    parser.add_argument('--total-timesteps', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--vec-env', choices=['subproc', 'dummy', 'batched'], default='subproc',
+                        help='subproc: one worker process per env; dummy: all envs in this process; '
+                             'batched: native NumPy MIMOAIAntiJammingVecEnv')
+    parser.add_argument('--backend', choices=['analytic', 'montecarlo', 'table'], default='analytic')
+    parser.add_argument('--jammer-type', choices=['broadband', 'tone', 'partial', 'reactive', 'mixed'],
+                        default='broadband', help='active jammer waveform (non-broadband needs --backend montecarlo)')
+    parser.add_argument('--eval-freq', type=int, default=1000, help='evaluate every N timesteps')
+    parser.add_argument('--log-dir', default='./logs/')
+    parser.add_argument('--tensorboard-log', default='./ppo_tensorboard/')
+    parser.add_argument('--save-path', default='ppo_mimo_anti_jamming')
+    parser.add_argument('--init-model', default=None,
+                        help='start from the policy weights of a saved model (e.g. offline_train.py output)')
+    parser.add_argument('--profile', action='store_true',
+                        help='time env stages, policy forward passes and PPO updates (see instrumentation.py); '
+                             'logged to the tensorboard run and <log-dir>/profile.json/.prom')
+    return parser.parse_args(argv)
+
+class LinkStatsCallback(BaseCallback):
+    """Logs the mean step SINR and BER of every rollout (rollout/sinr_mean, rollout/ber_mean)."""
+
+    def _on_rollout_start(self):
+        self.sinr_sum = self.ber_sum = 0.0
+        self.n = 0
+
+    def _on_step(self):
+        for info in self.locals['infos']:
+            self.sinr_sum += info['sinr']
+            self.ber_sum += info['ber']
+        self.n += len(self.locals['infos'])
+        return True
+
+    def _on_rollout_end(self):
+        if self.n:
+            self.logger.record('rollout/sinr_mean', self.sinr_sum / self.n)
+            self.logger.record('rollout/ber_mean', self.ber_sum / self.n)
+
+def make_envs(args, data_csv_path, rf_model_path, rf_scaler_path, profiler=None):
+    """
+    Training VecEnv with args.n_envs environments, plus a scalar eval env.
+    With a profiler, the batched env records into it; other training envs are
+    wrapped in InstrumentedEnv with one profiler each (see profile_source).
+    """
+    if args.vec_env == 'batched':
+        env = MIMOAIAntiJammingVecEnv(args.n_envs, data_csv_path, rf_model_path, rf_scaler_path,
+                                      backend=args.backend, jammer_type=args.jammer_type)
+        if profiler is not None:
+            instrument_batch(env, profiler)
+        env = VecMonitor(env)  # For logging
+        eval_env = MIMOAIAntiJammingEnv(data_csv_path, rf_model_path, rf_scaler_path, backend=args.backend,
+                                        jammer_type=args.jammer_type)
+    else:
+        # Load the CSV and RF artifacts once; every worker gets a clone sharing the arrays
+        # (copy-on-write after fork, pickled once per worker with spawn)
+        base_env = MIMOAIAntiJammingEnv(data_csv_path, rf_model_path, rf_scaler_path, backend=args.backend,
+                                        jammer_type=args.jammer_type)
+        wrap = (lambda e: e) if profiler is None else InstrumentedEnv
+        env_fns = [lambda: Monitor(wrap(base_env.clone())) for _ in range(args.n_envs)]
+        if args.vec_env == 'subproc' and args.n_envs > 1:
+            start_method = 'fork' if 'fork' in mp.get_all_start_methods() else None
+            env = SubprocVecEnv(env_fns, start_method=start_method)
+        else:
+            env = DummyVecEnv(env_fns)
+        eval_env = base_env.clone()
+
+    env.seed(args.seed)
+    return env, Monitor(eval_env)
+
+def profile_source(args, env, profiler):
+    """Callable returning the training profile: `profiler` plus the envs' own profilers."""
+    if args.vec_env == 'batched':
+        return lambda: profiler
+    return lambda: Profiler.merged([profiler.state()] + env.env_method('profile_state'))
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Paths to data and models
     data_csv_path = 'balanced_dataset_20000.csv'
     rf_model_path = 'rf_model.pkl'
     rf_scaler_path = 'rf_scaler.pkl'
-    
+
     # Create environment
-    env = MIMOAIAntiJammingEnv(data_csv_path, rf_model_path, rf_scaler_path)
-    env = Monitor(env)  # For logging
-    
+    profiler = Profiler() if args.profile else None
+    env, eval_env = make_envs(args, data_csv_path, rf_model_path, rf_scaler_path, profiler)
+
     # Create PPO model
-    model = PPO('MlpPolicy', env, verbose=1, tensorboard_log='./ppo_tensorboard/')
-    
-    # Eval callback (optional)
-    eval_env = MIMOAIAntiJammingEnv(data_csv_path, rf_model_path, rf_scaler_path)
-    eval_callback = EvalCallback(eval_env, best_model_save_path='./logs/',
-                                 log_path='./logs/', eval_freq=1000,
+    model = PPO('MlpPolicy', env, verbose=1, seed=args.seed, tensorboard_log=args.tensorboard_log)
+    if args.init_model:
+        model.policy.load_state_dict(PPO.load(args.init_model, device=model.device).policy.state_dict())
+        print(f"[INFO] Initialized policy from {args.init_model}")
+
+    # Eval callback (optional); eval_freq counts vectorized steps, so divide by n_envs
+    eval_callback = EvalCallback(eval_env, best_model_save_path=args.log_dir,
+                                 log_path=args.log_dir, eval_freq=max(args.eval_freq // args.n_envs, 1),
                                  deterministic=True, render=False)
-    
+    callbacks = [eval_callback, LinkStatsCallback()]
+    if profiler is not None:
+        instrument_stages(model.policy, profiler, {'forward': 'policy_forward'})
+        callbacks.append(ProfilerCallback(profile_source(args, env, profiler), os.path.join(args.log_dir, 'profile'),
+                                          profiler))
+
     # Train model
-    model.learn(total_timesteps=100000, callback=eval_callback)
-    
+    start = time.perf_counter()
+    model.learn(total_timesteps=args.total_timesteps, callback=callbacks)
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Trained {model.num_timesteps} steps with {args.n_envs} {args.vec_env} env(s) "
+          f"in {elapsed:.1f} s ({model.num_timesteps / elapsed:.0f} steps/s)")
+    if profiler is not None:
+        print(profile_source(args, env, profiler)().report())
+    env.close()
+
     # Save model
-    model.save('ppo_mimo_anti_jamming')
-    print("Model saved as ppo_mimo_anti_jamming.zip")
+    model.save(args.save_path)
+    print(f"Model saved as {args.save_path}.zip")
 
 if __name__ == "__main__":
     main()
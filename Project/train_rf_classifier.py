@@ -8,6 +8,9 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
+from artifact_cache import file_fingerprint
+from rf_compiled import CompiledForest, compiled_path
+from rf_incremental import deactivate
 
 # Load dataset
 csv_path = 'balanced_dataset_20000.csv'  # update path if needed
@@ -45,3 +48,10 @@ print(confusion_matrix(y_test, y_pred))
 joblib.dump(clf, 'rf_model.pkl')
 joblib.dump(scaler, 'rf_scaler.pkl')
 print("[INFO] Model and scaler saved as 'rf_model.pkl' and 'rf_scaler.pkl'")
+
+# Loaders follow rf_versions/current.json; point them back at the retrained files
+deactivate()
+
+# Save the compiled forest used by the env's detector and live loops
+CompiledForest.from_sklearn(clf, file_fingerprint('rf_model.pkl')).save(compiled_path('rf_model.pkl'))
+print(f"[INFO] Compiled forest saved as '{compiled_path('rf_model.pkl')}'")
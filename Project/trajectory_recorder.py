@@ -0,0 +1,220 @@
+# trajectory_recorder.py
+# Full-resolution step logs: a gymnasium wrapper (and a batched writer for the VecEnv
+# rollouts) appends obs, action, reward, SINR, BER and dataset index into
+# preallocated column chunks that are flushed to compressed columnar files
+# (one .npz per chunk, one array per column; .parquet when pyarrow is installed).
+# TrajectoryReader loads only the columns and chunks that are asked for.
+
+import json
+import os
+import shutil
+import gymnasium as gym
+import numpy as np
+
+# name: (dtype, per-step shape); reward/SINR/BER stay float64 so per-episode
+# summaries match the values the env returned
+COLUMNS = {
+    'episode': (np.int32, ()),
+    'step': (np.int32, ()),
+    'idx': (np.int32, ()),
+    'obs': (np.float32, (9,)),
+    'action': (np.int8, (3,)),
+    'reward': (np.float64, ()),
+    'sinr': (np.float64, ()),
+    'ber': (np.float64, ()),
+    'done': (np.bool_, ()),
+}
+
+FORMATS = ('npz', 'parquet')
+
+
+class TrajectoryWriter:
+    """
+    Columnar step log in <path>/chunk_XXXXX.<format>. Rows go into preallocated
+    chunk_size arrays; a full chunk is written and the arrays reused. Chunks go
+    to a fresh <path>.<pid>.tmp folder; close() flushes the last partial chunk,
+    writes manifest.json and only then swaps the folder in for any previous
+    log at <path>, so a crashed run never leaves old and new chunks mixed.
+    """
+
+    def __init__(self, path, chunk_size=65536, format='npz', compress=True, metadata=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown trajectory format: {format}")
+        if format == 'parquet':
+            import pyarrow  # noqa: F401  (fail early when the optional dependency is missing)
+        self.path = path
+        self.tmp_path = path.rstrip('/\\') + f'.{os.getpid()}.tmp'
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.chunk_size = chunk_size
+        self.format = format
+        self.compress = compress
+        self.metadata = metadata or {}
+        self.columns = {name: np.zeros((chunk_size,) + shape, dtype=dtype)
+                        for name, (dtype, shape) in COLUMNS.items()}
+        self.fill = 0
+        self.chunk_rows = []
+        self.closed = False
+
+    def append(self, **row):
+        i = self.fill
+        for name, value in row.items():
+            self.columns[name][i] = value
+        self.fill += 1
+        if self.fill == self.chunk_size:
+            self.flush()
+
+    def append_batch(self, **rows):
+        """Append n rows at once; every value is an (n, ...) array (or a scalar broadcast to n)."""
+        n = max(len(v) for v in rows.values() if np.ndim(v) > 0)
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_size - self.fill)
+            for name, value in rows.items():
+                value = np.asarray(value)
+                self.columns[name][self.fill:self.fill + take] = value[start:start + take] if value.ndim else value
+            self.fill += take
+            start += take
+            if self.fill == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        if self.fill == 0:
+            return
+        n = self.fill
+        chunk_id = len(self.chunk_rows)
+        path = os.path.join(self.tmp_path, f'chunk_{chunk_id:05d}.{self.format}')
+        tmp_path = path + '.tmp'
+        data = {name: col[:n] for name, col in self.columns.items()}
+        if self.format == 'npz':
+            with open(tmp_path, 'wb') as f:
+                (np.savez_compressed if self.compress else np.savez)(f, **data)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({name: list(col) if col.ndim > 1 else col for name, col in data.items()})
+            pq.write_table(table, tmp_path, compression='zstd' if self.compress else 'none')
+        os.replace(tmp_path, path)
+        self.chunk_rows.append(n)
+        self.fill = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        manifest = {
+            'format': self.format,
+            'chunk_rows': self.chunk_rows,
+            'columns': {name: [np.dtype(dtype).str, list(shape)] for name, (dtype, shape) in COLUMNS.items()},
+            'metadata': self.metadata,
+        }
+        with open(os.path.join(self.tmp_path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        old_path = self.tmp_path[:-len('.tmp')] + '.old'
+        if os.path.exists(self.path):
+            os.rename(self.path, old_path)
+        os.rename(self.tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordTrajectory(gym.Wrapper):
+    """
+    Records every step of a MIMOAIAntiJammingEnv into a TrajectoryWriter.
+    `obs` is the observation the action was chosen from and `idx` the dataset
+    row of the step; the next observation is the obs of the following row of
+    the same episode (done marks the last step).
+    """
+
+    def __init__(self, env, writer):
+        super().__init__(env)
+        self.writer = writer
+        self.episode = -1
+        self.step_count = 0
+        self.last_obs = None
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self.episode += 1
+        self.step_count = 0
+        self.last_obs = obs
+        return obs, info
+
+    def step(self, action):
+        idx = self.env.unwrapped.current_idx
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.writer.append(episode=self.episode, step=self.step_count, idx=idx, obs=self.last_obs,
+                           action=action, reward=reward, sinr=info['sinr'], ber=info['ber'],
+                           done=terminated or truncated)
+        self.step_count += 1
+        self.last_obs = obs
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+
+class TrajectoryReader:
+    """Lazy access to a trajectory directory: only requested columns/chunks are read."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.format = self.manifest['format']
+        self.chunk_rows = self.manifest['chunk_rows']
+        self.metadata = self.manifest['metadata']
+
+    def __len__(self):
+        return sum(self.chunk_rows)
+
+    @property
+    def column_names(self):
+        return list(self.manifest['columns'])
+
+    def _chunk_path(self, i):
+        return os.path.join(self.path, f'chunk_{i:05d}.{self.format}')
+
+    def read_chunk(self, i, columns=None):
+        columns = columns or self.column_names
+        if self.format == 'npz':
+            with np.load(self._chunk_path(i)) as data:
+                return {name: data[name] for name in columns}
+        import pyarrow.parquet as pq
+        table = pq.read_table(self._chunk_path(i), columns=columns)
+        out = {}
+        for name in columns:
+            dtype, shape = self.manifest['columns'][name]
+            values = table.column(name).to_numpy(zero_copy_only=False)
+            out[name] = (np.stack(values) if shape else values).astype(dtype)
+        return out
+
+    def iter_chunks(self, columns=None):
+        for i in range(len(self.chunk_rows)):
+            yield self.read_chunk(i, columns)
+
+    def column(self, name):
+        return np.concatenate([chunk[name] for chunk in self.iter_chunks([name])])
+
+    def episode_summary(self):
+        """Per-episode avg_sinr, avg_ber, total_reward (same columns as ppo_evaluation_log.csv)."""
+        import pandas as pd
+
+        episode = self.column('episode')
+        episodes, inverse = np.unique(episode, return_inverse=True)
+        lengths = np.bincount(inverse)
+        sums = {name: np.bincount(inverse, weights=self.column(name).astype(np.float64))
+                for name in ('sinr', 'ber', 'reward')}
+        return pd.DataFrame({
+            'episode': episodes + 1,
+            'avg_sinr': sums['sinr'] / lengths,
+            'avg_ber': sums['ber'] / lengths,
+            'total_reward': sums['reward'],
+        })
@@ -0,0 +1,76 @@
+# validate_link_sim.py
+# Check the NumPy MIMO link simulator against closed-form curves:
+#  1) Gray QAM modem BER in AWGN vs. the closed-form QAM BER
+#  2) Mean pre-filter SINR of MIMOLinkSimulator vs. its closed-form expectation
+#  3) The scalar env and the batched env step with every link backend
+#     (analytic, montecarlo, table; builds link_tables/ if missing)
+# Exits with status 1 if any check fails.
+
+import sys
+import numpy as np
+from mimo_link_sim import (MOD_ORDERS, TX_POWERS, MIMOLinkSimulator, complex_gaussian,
+                           expected_sinr_db, gray_qam_constellation, qam_ber_awgn,
+                           qam_demodulate, bit_errors)
+
+rng = np.random.default_rng(0)
+ok = True
+
+# 1) Modem BER in AWGN
+print("[INFO] Gray QAM BER in AWGN (Monte-Carlo vs closed form)")
+num_symbols = 200000
+ebn0_grid = {4: [0, 3, 6], 16: [4, 7, 10], 64: [6, 9, 12]}
+for M in MOD_ORDERS:
+    k = np.log2(M)
+    Es = np.mean(np.abs(gray_qam_constellation(M))**2)
+    for ebn0_db in ebn0_grid[M]:
+        ebn0 = 10**(ebn0_db/10)
+        noise_pow = Es / (k*ebn0)
+        tx = rng.integers(0, M, num_symbols)
+        rx = gray_qam_constellation(M)[tx] + complex_gaussian(rng, num_symbols, noise_pow)
+        ber_mc = bit_errors(tx, qam_demodulate(rx, M), M) / (num_symbols*k)
+        ber_th = qam_ber_awgn(ebn0_db, M)
+        # 3-sigma binomial spread plus 5% for the nearest-neighbour approximation
+        tol = 3*np.sqrt(ber_th / (num_symbols*k)) + 0.05*ber_th
+        passed = abs(ber_mc - ber_th) < tol
+        ok &= passed
+        print(f"  {M:2d}-QAM Eb/N0={ebn0_db:2d} dB  MC={ber_mc:.3e}  theory={ber_th:.3e}  {'OK' if passed else 'FAIL'}")
+
+# 2) Pre-filter SINR statistics
+print("[INFO] Mean pre-filter SINR (Monte-Carlo vs closed form)")
+sim = MIMOLinkSimulator(seed=1)
+for modulation in range(len(MOD_ORDERS)):
+    for power_level in range(len(TX_POWERS)):
+        for jammer_label in (0, 1):
+            sinr_db, _ = sim.simulate(modulation, power_level, 2, jammer_label, n_realizations=500)
+            mean_db = 10*np.log10(np.mean(10**(sinr_db/10)))
+            expected = expected_sinr_db(modulation, power_level, jammer_label, sim.Nt)
+            passed = abs(mean_db - expected) < 0.3
+            ok &= passed
+            print(f"  mod={modulation} pwr={power_level} jam={jammer_label}  "
+                  f"MC={mean_db:6.2f} dB  theory={expected:6.2f} dB  {'OK' if passed else 'FAIL'}")
+
+# 3) Env steps with every backend
+print("[INFO] Env steps with each link backend")
+from policy_eval import ENV_PATHS
+from ppo_env import MIMOAIAntiJammingEnv
+from ppo_vec_env import MIMOAIAntiJammingBatch
+
+for backend in ('analytic', 'montecarlo', 'table'):
+    try:
+        env = MIMOAIAntiJammingEnv(**ENV_PATHS, backend=backend, link_seed=0)
+        env.reset(seed=0)
+        obs, reward, _, _, info = env.step(env.action_space.sample())
+        batch = MIMOAIAntiJammingBatch(4, **ENV_PATHS, backend=backend, link_seed=0)
+        batch.seed(0)
+        batch.reset()
+        batch_obs, batch_reward, _, _ = batch.step(np.zeros((4, 3), dtype=np.int64))
+        passed = bool(np.all(np.isfinite(obs)) and np.isfinite(reward)
+                      and np.all(np.isfinite(batch_obs)) and np.all(np.isfinite(batch_reward)))
+        detail = f"SINR={info['sinr']:6.2f} dB"
+    except Exception as e:
+        passed, detail = False, f"{type(e).__name__}: {e}"
+    ok &= passed
+    print(f"  backend={backend:10s}  {detail}  {'OK' if passed else 'FAIL'}")
+
+print("[INFO] All checks passed" if ok else "[FAIL] Some checks failed")
+sys.exit(0 if ok else 1)